@@ -0,0 +1,421 @@
+"""
+Analisis batch asinkron dengan konkurensi adaptif.
+
+Setiap lembar dianalisis dengan client aio SDK (`azure.ai.documentintelligence.aio`); jumlah analisis yang
+berjalan bersamaan diatur oleh PengaturKonkurensi (AIMD):
+- naik satu setelah sejumlah analisis berturut-turut selesai dengan latensi wajar,
+- turun satu jika latensi rata-rata (EWMA) melebihi faktor_latensi x latensi terbaik yang pernah terlihat,
+- turun setengah dan semua pengiriman berhenti selama Retry-After saat menerima HTTP 429.
+
+Retry bawaan SDK untuk status HTTP dimatikan per permintaan (retry_status=0; retry koneksi tetap aktif),
+sehingga sinyal throttling sampai ke pengatur. Jika 429 terjadi saat polling, operasi dilanjutkan dengan continuation
+token poller setelah jeda, tanpa mengunggah ulang. Dengan JurnalOperasi, token juga disimpan di disk sehingga batch
+yang terhenti melanjutkan operasinya saat dijalankan ulang. Throughput dicatat dalam lembar per menit.
+
+Contoh (lihat endpoint_palsu.py untuk pengujian tanpa Azure):
+    python analisis_async.py lembar/*.jpg --awal 4 --maks 32 --output hasil.jsonl
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import email.utils
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient
+
+from cache_analisis import body_unggahan, cache_dari_lingkungan, kunci_dokumen
+from ekspor_hasil import buka_penulis_hasil
+from jurnal_operasi import jurnal_dari_lingkungan, polling_interval_dari_lingkungan
+from masukan_dokumen import DokumenFile
+from penilaian import KUNCI_JAWABAN, nilai_lembar
+from penyimpanan_hasil import PenyimpananHasil, id_ujian_dari_path
+from profil_lembar import JUMLAH_LEMBAR_DEFAULT, ProfilLembar
+from skema_ujian import SKEMA_DEFAULT, muat_ujian
+from template_lembar import cache_template_dari_lingkungan
+
+KONKURENSI_AWAL = 4
+KONKURENSI_MIN = 1
+KONKURENSI_MAKS = 32
+FAKTOR_LATENSI = 2.0
+MAKS_PERCOBAAN = 6
+JEDA_429_DEFAULT = 1.0
+
+
+def detik_retry_after(response, default=JEDA_429_DEFAULT):
+    """Lama jeda dari header retry-after-ms, x-ms-retry-after-ms, atau Retry-After (detik atau tanggal HTTP)."""
+    header = getattr(response, "headers", None) or {}
+    for nama in ("retry-after-ms", "x-ms-retry-after-ms"):
+        nilai = header.get(nama)
+        if nilai:
+            try:
+                return float(nilai) / 1000
+            except ValueError:
+                pass
+    nilai = header.get("Retry-After")
+    if not nilai:
+        return default
+    try:
+        return float(nilai)
+    except ValueError:
+        waktu = email.utils.parsedate_to_datetime(nilai)
+        return max(0.0, waktu.timestamp() - time.time()) if waktu else default
+
+
+class PengaturKonkurensi:
+    """Batas konkurensi adaptif (AIMD) beserta jeda global setelah throttling."""
+
+    def __init__(self, awal=KONKURENSI_AWAL, minimum=KONKURENSI_MIN, maksimum=KONKURENSI_MAKS,
+                 faktor_latensi=FAKTOR_LATENSI):
+        self.batas = max(minimum, min(awal, maksimum))
+        self.minimum = minimum
+        self.maksimum = maksimum
+        self.faktor_latensi = faktor_latensi
+        self.aktif = 0
+        self.latensi_ewma = None
+        self.latensi_terbaik = None
+        self.jumlah_throttle = 0
+        self._sukses_beruntun = 0
+        self._jeda_sampai = 0.0
+        self._kondisi = asyncio.Condition()
+
+    async def masuk(self):
+        """Tunggu jeda throttling dan slot konkurensi yang kosong."""
+        async with self._kondisi:
+            while True:
+                sisa_jeda = self._jeda_sampai - time.monotonic()
+                if sisa_jeda > 0:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._kondisi.wait(), sisa_jeda)
+                    continue
+                if self.aktif < self.batas:
+                    self.aktif += 1
+                    return
+                await self._kondisi.wait()
+
+    async def keluar(self):
+        async with self._kondisi:
+            self.aktif -= 1
+            self._kondisi.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.masuk()
+        try:
+            yield
+        finally:
+            await self.keluar()
+
+    def catat_sukses(self, latensi):
+        """Perbarui latensi EWMA lalu naikkan atau turunkan batas."""
+        self.latensi_ewma = latensi if self.latensi_ewma is None else 0.8 * self.latensi_ewma + 0.2 * latensi
+        self.latensi_terbaik = latensi if self.latensi_terbaik is None else min(self.latensi_terbaik, latensi)
+
+        if self.latensi_ewma > self.faktor_latensi * self.latensi_terbaik:
+            # Layanan melambat karena beban: kurangi satu dan mulai hitung ulang
+            self.batas = max(self.minimum, self.batas - 1)
+            self._sukses_beruntun = 0
+            return
+        self._sukses_beruntun += 1
+        if self._sukses_beruntun >= self.batas:
+            self.batas = min(self.maksimum, self.batas + 1)
+            self._sukses_beruntun = 0
+
+    async def catat_throttle(self, jeda):
+        """429: batas dibagi dua dan semua pengiriman baru menunggu jeda detik."""
+        async with self._kondisi:
+            self.jumlah_throttle += 1
+            self.batas = max(self.minimum, self.batas // 2)
+            self._sukses_beruntun = 0
+            self._jeda_sampai = max(self._jeda_sampai, time.monotonic() + jeda)
+
+
+class MetrikThroughput:
+    """Jumlah lembar selesai/gagal dan throughput (lembar per menit) keseluruhan dan 60 detik terakhir."""
+
+    def __init__(self, jendela=60.0):
+        self.jendela = jendela
+        self.mulai = time.monotonic()
+        self.selesai = 0
+        self.gagal = 0
+        self.dari_cache = 0
+        # Lembar yang isinya sama dengan lembar lain yang sedang dianalisis dalam batch yang sama
+        self.duplikat = 0
+        self._waktu_selesai = collections.deque()
+
+    def catat_selesai(self):
+        sekarang = time.monotonic()
+        self.selesai += 1
+        self._waktu_selesai.append(sekarang)
+        while self._waktu_selesai and self._waktu_selesai[0] < sekarang - self.jendela:
+            self._waktu_selesai.popleft()
+
+    def lembar_per_menit(self):
+        durasi = time.monotonic() - self.mulai
+        return self.selesai * 60.0 / durasi if durasi > 0 else 0.0
+
+    def lembar_per_menit_terakhir(self):
+        sekarang = time.monotonic()
+        durasi = min(self.jendela, sekarang - self.mulai)
+        jumlah = sum(1 for waktu in self._waktu_selesai if waktu >= sekarang - self.jendela)
+        return jumlah * 60.0 / durasi if durasi > 0 else 0.0
+
+    def ringkasan(self, pengatur=None):
+        data = {
+            "selesai": self.selesai,
+            "gagal": self.gagal,
+            "dari_cache": self.dari_cache,
+            "duplikat": self.duplikat,
+            "durasi_detik": round(time.monotonic() - self.mulai, 2),
+            "lembar_per_menit": round(self.lembar_per_menit(), 1),
+            "lembar_per_menit_terakhir": round(self.lembar_per_menit_terakhir(), 1),
+        }
+        if pengatur is not None:
+            data.update({
+                "konkurensi": pengatur.batas,
+                "aktif": pengatur.aktif,
+                "throttle": pengatur.jumlah_throttle,
+                "latensi_ewma": round(pengatur.latensi_ewma, 3) if pengatur.latensi_ewma is not None else None,
+            })
+        return data
+
+
+async def analisis_async(client, dokumen, pengatur, model_id="prebuilt-layout", cache=None, metrik=None,
+                         polling_interval=None, maks_percobaan=MAKS_PERCOBAAN, jurnal=None, kunci=None):
+    """
+    Analisis satu dokumen (bytes atau DokumenFile) dengan client aio di bawah pengatur konkurensi, memakai cache
+    jika ada. 429 saat pengiriman diulang setelah Retry-After; 429 saat polling dilanjutkan dengan continuation
+    token. Dengan jurnal, operasi yang tertinggal dari proses sebelumnya dilanjutkan. Galat lain diteruskan.
+    kunci dapat diberikan jika sudah dihitung pemanggil.
+    """
+    if kunci is None and (cache is not None or jurnal is not None):
+        kunci = await asyncio.to_thread(
+            kunci_dokumen, dokumen, model_id, getattr(getattr(client, "_config", None), "api_version", "")
+        )
+    if cache is not None:
+        result = cache.ambil(kunci)
+        if result is not None:
+            if metrik is not None:
+                metrik.dari_cache += 1
+                metrik.catat_selesai()
+            return result
+
+    opsi = {"retry_status": 0}
+    if polling_interval is not None:
+        opsi["polling_interval"] = polling_interval
+    entri = jurnal.ambil(kunci) if jurnal is not None else None
+    token = entri.get("token") if entri is not None else None
+    dari_jurnal = token is not None
+
+    # Hanya percobaan yang gagal yang dihitung; operasi jurnal yang kedaluwarsa tidak memakai jatah percobaan
+    percobaan = 0
+    while True:
+        async with pengatur.slot():
+            mulai = time.monotonic()
+            # Latensi operasi yang dilanjutkan hanya sebagian dari latensi sebenarnya: tidak dipakai pengatur
+            diukur = token is None
+            try:
+                if token is None:
+                    # File dibuka ulang setiap percobaan dan ditutup setelah unggahan selesai
+                    with body_unggahan(dokumen) as body:
+                        poller = await client.begin_analyze_document(model_id, body, **opsi)
+                    token = poller.continuation_token()
+                    if jurnal is not None:
+                        jurnal.catat(kunci, token, model_id, poller.details["operation_id"])
+                else:
+                    poller = await client.begin_analyze_document(model_id, None, continuation_token=token, **opsi)
+                result = await poller.result()
+            except HttpResponseError as e:
+                if dari_jurnal and e.status_code != 429:
+                    # Operasi di jurnal kedaluwarsa atau gagal: unggah ulang
+                    jurnal.hapus(kunci)
+                    token = None
+                    dari_jurnal = False
+                    continue
+                percobaan += 1
+                if e.status_code != 429 or percobaan >= maks_percobaan:
+                    raise
+                await pengatur.catat_throttle(detik_retry_after(e.response))
+                continue
+            if diukur:
+                pengatur.catat_sukses(time.monotonic() - mulai)
+            break
+
+    if cache is not None:
+        cache.simpan(kunci, result)
+    if jurnal is not None:
+        jurnal.hapus(kunci)
+    if metrik is not None:
+        metrik.catat_selesai()
+    return result
+
+
+async def analisis_batch(client, daftar_path, pengatur, model_id="prebuilt-layout", cache=None, metrik=None,
+                         polling_interval=None, jurnal=None):
+    """
+    Async generator: analisis semua file dan hasilkan (path, result, galat) sesuai urutan selesai.
+    Jumlah task pekerja tetap (pengatur.maksimum), sehingga memori tidak tumbuh dengan jumlah file;
+    konkurensi sebenarnya dibatasi oleh pengatur. File dialirkan dari disk (DokumenFile), dan file dengan isi
+    yang sama dengan file yang sedang dianalisis menunggu hasil analisis tersebut alih-alih diunggah lagi.
+    """
+    api_version = getattr(getattr(client, "_config", None), "api_version", "")
+    # kunci cache -> Future hasil analisis yang sedang berjalan
+    sedang_berjalan = {}
+    antrean_path = asyncio.Queue()
+    for path in daftar_path:
+        antrean_path.put_nowait(path)
+    antrean_hasil = asyncio.Queue(maxsize=pengatur.maksimum)
+
+    async def pekerja():
+        while True:
+            try:
+                path = antrean_path.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                dokumen = DokumenFile(path)
+                kunci = await asyncio.to_thread(dokumen.kunci_cache, model_id, api_version)
+                berjalan = sedang_berjalan.get(kunci)
+                if berjalan is not None:
+                    result = await asyncio.shield(berjalan)
+                    if metrik is not None:
+                        metrik.duplikat += 1
+                        metrik.catat_selesai()
+                else:
+                    berjalan = sedang_berjalan[kunci] = asyncio.get_running_loop().create_future()
+                    # Tandai galat sudah diambil agar tidak dilaporkan jika tidak ada duplikat yang menunggu
+                    berjalan.add_done_callback(lambda f: f.cancelled() or f.exception())
+                    try:
+                        result = await analisis_async(client, dokumen, pengatur, model_id, cache, metrik,
+                                                      polling_interval, jurnal=jurnal, kunci=kunci)
+                        berjalan.set_result(result)
+                    except asyncio.CancelledError:
+                        berjalan.cancel()
+                        raise
+                    except Exception as e:
+                        berjalan.set_exception(e)
+                        raise
+                    finally:
+                        del sedang_berjalan[kunci]
+                await antrean_hasil.put((path, result, None))
+            except Exception as e:
+                if metrik is not None:
+                    metrik.gagal += 1
+                await antrean_hasil.put((path, None, f"{type(e).__name__}: {e}"))
+
+    jumlah = antrean_path.qsize()
+    tasks = [asyncio.create_task(pekerja()) for _ in range(min(pengatur.maksimum, jumlah))]
+    try:
+        for _ in range(jumlah):
+            yield await antrean_hasil.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _nilai_lembar_senyap(result, kunci_jawaban, cache_template, skema, konteks_profil):
+    """Nilai satu lembar dengan log rinci dibuang; dijalankan di thread executor."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), konteks_profil:
+        return nilai_lembar(result, kunci_jawaban, bandingkan_himpunan=False,
+                            cache_template=cache_template, skema=skema)
+
+
+async def _jalankan(args):
+    skema, kunci_jawaban = muat_ujian(args.ujian) if args.ujian else (None, None)
+    id_ujian = id_ujian_dari_path(args.ujian)
+    cache = cache_dari_lingkungan()
+    polling_interval = args.polling_interval if args.polling_interval is not None else polling_interval_dari_lingkungan()
+    cache_template = cache_template_dari_lingkungan()
+    pengatur = PengaturKonkurensi(args.awal, args.min, args.maks, args.faktor_latensi)
+    metrik = MetrikThroughput()
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    penulis = buka_penulis_hasil(args.ekspor) if args.ekspor else None
+    penyimpanan = None
+    if args.db:
+        penyimpanan = PenyimpananHasil(args.db)
+        # Skema tanpa kunci: hasil disimpan tanpa skor, kunci disimpan nanti lewat --nilai-ulang
+        if skema is None:
+            penyimpanan.simpan_kunci(id_ujian, SKEMA_DEFAULT, KUNCI_JAWABAN)
+        elif kunci_jawaban is not None:
+            penyimpanan.simpan_kunci(id_ujian, skema, kunci_jawaban)
+    client = DocumentIntelligenceClient(
+        endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+    )
+    # Profil hanya dibuat dengan --profile; tanpa itu penilaian berjalan tanpa hook profil sama sekali
+    profil = ProfilLembar(args.profile, args.profile_lembar) if args.profile else None
+    try:
+        async with client:
+            async for path, result, galat in analisis_batch(
+                client, args.file, pengatur, "prebuilt-layout", cache, metrik, polling_interval, jurnal_dari_lingkungan()
+            ):
+                if galat is not None:
+                    print(f"{path}: GAGAL {galat}")
+                    if penyimpanan:
+                        penyimpanan.tambah(path, None, id_ujian, galat=galat)
+                    continue
+
+                # Penilaian CPU-bound dijalankan di thread executor agar event loop tetap melayani polling
+                # analisis lain; cProfile hanya memprofilkan thread itu, sehingga profil memuat lembar ini saja
+                konteks_profil = profil.lembar(path) if profil is not None else contextlib.nullcontext()
+                hasil = await asyncio.to_thread(
+                    _nilai_lembar_senyap, result, kunci_jawaban, cache_template, skema, konteks_profil
+                )
+                skor = "belum dinilai" if hasil["skor"] is None else f"skor {hasil['skor']}/{hasil['jumlah_soal']}"
+                print(f"{path}: {skor}, tidak terdeteksi {len(hasil['tidak_terdeteksi'])}")
+                if output:
+                    output.write(json.dumps(dict(hasil, lembar=path), ensure_ascii=False) + "\n")
+                if penulis:
+                    penulis.tulis(path, hasil)
+                if penyimpanan:
+                    penyimpanan.tambah(path, hasil, id_ujian)
+                if (metrik.selesai + metrik.gagal) % args.laporan_setiap == 0:
+                    print(f"Metrik: {json.dumps(metrik.ringkasan(pengatur))}")
+    finally:
+        if output:
+            output.close()
+        if penulis:
+            penulis.tutup()
+        if penyimpanan:
+            penyimpanan.tutup()
+        if profil:
+            terlambat = profil.tulis()
+            print(f"Profil {len(terlambat)} lembar terlambat ditulis ke {args.profile} (lihat ringkasan.txt)")
+
+    print(f"Selesai: {json.dumps(metrik.ringkasan(pengatur))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis dan nilai banyak lembar secara asinkron dengan konkurensi adaptif")
+    parser.add_argument("file", nargs="+", help="file lembar jawaban (gambar/PDF)")
+    parser.add_argument("--awal", type=int, default=KONKURENSI_AWAL, help="konkurensi awal")
+    parser.add_argument("--min", type=int, default=KONKURENSI_MIN, help="konkurensi minimum")
+    parser.add_argument("--maks", type=int, default=KONKURENSI_MAKS, help="konkurensi maksimum")
+    parser.add_argument("--faktor-latensi", type=float, default=FAKTOR_LATENSI,
+                        help="turunkan konkurensi jika latensi rata-rata melebihi faktor ini x latensi terbaik")
+    parser.add_argument("--polling-interval", type=float, help="jeda polling (detik) jika layanan tidak mengirim Retry-After (default AZURE_POLLING_INTERVAL)")
+    parser.add_argument("--laporan-setiap", type=int, default=20, help="cetak metrik throughput setiap N lembar")
+    parser.add_argument("--ujian", help="file ujian JSON berisi jumlah soal, pilihan, dan kunci jawaban")
+    parser.add_argument("--output", help="tambahkan hasil per lembar ke file JSON lines ini")
+    parser.add_argument("--ekspor", help="tulis satu baris per lembar ke file CSV atau .parquet ini")
+    parser.add_argument("--db", help="simpan hasil ke database SQLite ini")
+    parser.add_argument("--profile", metavar="DIREKTORI",
+                        help="profilkan penilaian setiap lembar (cProfile + tracemalloc), simpan yang terlambat di sini")
+    parser.add_argument("--profile-lembar", type=int, default=JUMLAH_LEMBAR_DEFAULT,
+                        help="jumlah lembar terlambat yang profilnya disimpan")
+    args = parser.parse_args()
+
+    # Muat variabel lingkungan dari file .env
+    load_dotenv()
+    asyncio.run(_jalankan(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark detektor jawaban pada hasil analisis sintetis (hasil_sintetis.py), sepenuhnya offline.
+
+Untuk setiap kombinasi tata letak dan jumlah soal, satu lembar sintetis dibangun lalu setiap tahap diukur
+(waktu terbaik dari --ulang kali, keluaran print dibuang):
+  indeks          buat_indeks_tabel + SheetGeometry
+  himpunan        get_jawaban_berbasis_himpunan
+  huruf_hilang    get_jawaban_dari_huruf_tidak_muncul
+  baris           get_jawaban_dari_baris
+  tanda           kumpulkan_tanda_silang
+  posisi          analisis_posisi_jawaban (pemetaan sel pilihan ke nomor soal)
+  skor_skalar     is_mark_in_cell untuk setiap pasangan tanda x sel pilihan
+  skor_matriks    skor_jawaban_per_soal (hitung_matriks_skor tervektorisasi)
+Untuk detektor jawaban dan skor dicetak juga jumlah soal yang jawabannya sama dengan jawaban sebenarnya.
+
+Sebelum benchmark, kaskade diperiksa pada lembar vertikal bersih (semua soal dijawab, huruf yang disilang
+tidak terbaca): detektor termurah harus menyelesaikan semua soal sehingga detektor lain tidak dijalankan.
+Pada lembar vertikal yang sama tanpa garis teks, detektor huruf yang tidak muncul, detektor baris, dan
+fallback tabel metode himpunan harus memberi jawaban yang sama dengan jawaban sebenarnya (penomoran soal sama).
+
+Contoh:
+    python benchmark_detektor.py --soal 40 100 200 --derau-garis 50 --tanda-tambahan 20
+    python benchmark_detektor.py --hasil proyeksi --tata-letak vertikal
+"""
+
+import argparse
+import contextlib
+import os
+import time
+
+from deteksi_jawaban import get_jawaban_dari_baris, get_jawaban_dari_huruf_tidak_muncul
+from geometri_lembar import SheetGeometry
+from get_jawaban_himpunan import get_jawaban_berbasis_himpunan
+from hasil_sintetis import TATA_LETAK, buat_lembar_sintetis
+from indeks_tabel import buat_indeks_tabel
+from penilaian import KonteksLembar, analisis_posisi_jawaban, buat_penjadwal_detektor, kumpulkan_tanda_silang
+from skema_ujian import SkemaUjian
+from skor_tanda import is_mark_in_cell, skor_jawaban_per_soal
+
+TAHAP = ("indeks", "himpunan", "huruf_hilang", "baris", "tanda", "posisi", "skor_skalar", "skor_matriks")
+
+
+def ukur(fungsi, ulang):
+    """Waktu terbaik (detik) dan hasil terakhir dari fungsi() tanpa argumen; print dibuang."""
+    terbaik = float("inf")
+    hasil = None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(ulang):
+            mulai = time.perf_counter()
+            hasil = fungsi()
+            terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik, hasil
+
+
+def skor_skalar(kumpulan_tanda, posisi_jawaban, skema):
+    """Acuan skalar skor_jawaban_per_soal: soal -> pilihan -> tanda, skor tertinggi pertama (> 0)."""
+    jawaban = ["-"] * skema.jumlah_soal
+    for nomor_soal, sel_soal in posisi_jawaban.items():
+        skor_terbaik = 0.0
+        for pilihan in skema.pilihan:
+            if pilihan not in sel_soal:
+                continue
+            for i, mark in enumerate(kumpulan_tanda.tanda):
+                di_dalam, skor = is_mark_in_cell(mark, kumpulan_tanda.pusat[i], sel_soal[pilihan]["kotak"])
+                if di_dalam and skor > skor_terbaik:
+                    skor_terbaik = skor
+                    jawaban[nomor_soal - 1] = pilihan
+    return jawaban
+
+
+def jumlah_benar(jawaban, lembar):
+    return sum(1 for a, b in zip(jawaban, lembar.jawaban) if a == b and b != "-")
+
+
+def cek_kaskade_lembar_bersih(jumlah_soal=40):
+    """Jalankan kaskade pada lembar bersih; gagal jika ada detektor selain yang pertama yang dijalankan."""
+    lembar = buat_lembar_sintetis(SkemaUjian(jumlah_soal), "vertikal")
+    result = lembar.hasil()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        indeks_tabel = buat_indeks_tabel(result)
+        geometri = SheetGeometry(result, indeks_tabel)
+        _, posisi_jawaban = analisis_posisi_jawaban(result, indeks_tabel, geometri, None, lembar.skema)
+        konteks = KonteksLembar(result, indeks_tabel, geometri, kumpulkan_tanda_silang(geometri), posisi_jawaban,
+                                lembar.skema)
+        penjadwal = buat_penjadwal_detektor()
+        pertama = penjadwal.urutan()[0]
+        jawaban, _, _ = penjadwal.jalankan(konteks, jumlah_soal)
+    dijalankan = [d.nama for d in penjadwal.urutan() if d.jumlah_panggilan]
+    if dijalankan != [pertama.nama] or jawaban != lembar.jawaban:
+        raise SystemExit(f"Kaskade pada lembar bersih menjalankan {dijalankan} (seharusnya hanya {pertama.nama}), "
+                         f"{jumlah_benar(jawaban, lembar)}/{jumlah_soal} soal benar")
+    return pertama.nama
+
+
+def cek_penomoran_vertikal(jumlah_soal=100):
+    """Gagal jika detektor tabel memberi nomor soal berbeda pada tabel vertikal berkolom banyak."""
+    lembar = buat_lembar_sintetis(SkemaUjian(jumlah_soal), "vertikal")
+    # Tanpa garis teks, metode himpunan memakai fallback tabel
+    lembar.data["pages"][0]["lines"] = []
+    result = lembar.hasil()
+    salah = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        indeks_tabel = buat_indeks_tabel(result)
+        geometri = SheetGeometry(result, indeks_tabel)
+        for detektor in (get_jawaban_dari_huruf_tidak_muncul, get_jawaban_dari_baris, get_jawaban_berbasis_himpunan):
+            jawaban = detektor(result, indeks_tabel, geometri, skema=lembar.skema)
+            if jawaban != lembar.jawaban:
+                salah.append(f"{detektor.__name__} {jumlah_benar(jawaban, lembar)}/{jumlah_soal}")
+    if salah:
+        raise SystemExit(f"Penomoran tabel vertikal tidak sama dengan jawaban sebenarnya: {', '.join(salah)} soal benar")
+
+
+def ukur_lembar(lembar, jenis_hasil, ulang):
+    """Ukur semua TAHAP pada satu lembar. Kembalikan {tahap: (detik, soal benar atau None)}."""
+    skema = lembar.skema
+    result = lembar.hasil() if jenis_hasil == "sdk" else lembar.proyeksi()
+
+    def bangun_indeks():
+        indeks_tabel = buat_indeks_tabel(result)
+        return indeks_tabel, SheetGeometry(result, indeks_tabel)
+
+    hasil = {}
+    hasil["indeks"] = (ukur(bangun_indeks, ulang)[0], None)
+    indeks_tabel, geometri = bangun_indeks()
+
+    for tahap, detektor in (("himpunan", get_jawaban_berbasis_himpunan),
+                            ("huruf_hilang", get_jawaban_dari_huruf_tidak_muncul),
+                            ("baris", get_jawaban_dari_baris)):
+        detik, jawaban = ukur(lambda: detektor(result, indeks_tabel, geometri, skema=skema), ulang)
+        hasil[tahap] = (detik, jumlah_benar(jawaban, lembar))
+
+    detik, kumpulan_tanda = ukur(lambda: kumpulkan_tanda_silang(geometri), ulang)
+    hasil["tanda"] = (detik, None)
+    detik, (_, posisi_jawaban) = ukur(
+        lambda: analisis_posisi_jawaban(result, indeks_tabel, geometri, None, skema), ulang
+    )
+    hasil["posisi"] = (detik, None)
+
+    detik, jawaban_skalar = ukur(lambda: skor_skalar(kumpulan_tanda, posisi_jawaban, skema), ulang)
+    hasil["skor_skalar"] = (detik, jumlah_benar(jawaban_skalar, lembar))
+    detik, (jawaban_matriks, _) = ukur(
+        lambda: skor_jawaban_per_soal(kumpulan_tanda, posisi_jawaban, skema.pilihan, skema.jumlah_soal), ulang
+    )
+    hasil["skor_matriks"] = (detik, jumlah_benar(jawaban_matriks, lembar))
+    if jawaban_skalar != jawaban_matriks:
+        raise SystemExit(f"Skor skalar dan matriks berbeda ({lembar.tata_letak}, {skema.jumlah_soal} soal)!")
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detektor jawaban pada hasil analisis sintetis")
+    parser.add_argument("--soal", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--pilihan", default="ABCD")
+    parser.add_argument("--tata-letak", choices=TATA_LETAK, nargs="+", default=list(TATA_LETAK))
+    parser.add_argument("--kolom", type=int, default=8, help="soal per baris blok (vertikal dan grid)")
+    parser.add_argument("--derau-garis", type=int, default=0, help="garis teks derau per lembar")
+    parser.add_argument("--tanda-tambahan", type=int, default=0, help="selection mark unselected per lembar")
+    parser.add_argument("--goresan", type=float, default=0.2, help="proporsi silang yang juga terbaca sebagai garis")
+    parser.add_argument("--kosong", type=float, default=0.05)
+    parser.add_argument("--huruf-terbaca", type=float, default=0.5, help="peluang huruf yang disilang tetap terbaca")
+    parser.add_argument("--hasil", choices=("sdk", "proyeksi"), default="sdk",
+                        help="AnalyzeResult SDK atau ProyeksiHasil")
+    parser.add_argument("--ulang", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Kaskade lembar bersih: hanya {cek_kaskade_lembar_bersih()} yang dijalankan")
+    cek_penomoran_vertikal()
+    print("Penomoran tabel vertikal: detektor huruf, baris, dan fallback himpunan sama\n")
+    print(f"{'Tata letak':<10} {'Soal':>5} | " + " | ".join(f"{t:>12}" for t in TAHAP))
+    print("-" * (19 + 15 * len(TAHAP)))
+    for tata_letak in args.tata_letak:
+        for jumlah_soal in args.soal:
+            lembar = buat_lembar_sintetis(
+                SkemaUjian(jumlah_soal, tuple(args.pilihan)), tata_letak, args.kolom, args.derau_garis,
+                tanda_tambahan=args.tanda_tambahan, rasio_goresan=args.goresan, kosong=args.kosong,
+                huruf_terbaca=args.huruf_terbaca, seed=args.seed,
+            )
+            hasil = ukur_lembar(lembar, args.hasil, args.ulang)
+            terjawab = sum(1 for j in lembar.jawaban if j != "-")
+            waktu = " | ".join(f"{hasil[t][0] * 1000:9.2f} ms" for t in TAHAP)
+            benar = " | ".join(f"{'' if hasil[t][1] is None else f'{hasil[t][1]}/{terjawab}':>12}" for t in TAHAP)
+            print(f"{tata_letak:<10} {jumlah_soal:5d} | {waktu}")
+            print(f"{'':<10} {'benar':>5} | {benar}")
+
+
+if __name__ == "__main__":
+    main()
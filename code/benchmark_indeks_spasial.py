@@ -0,0 +1,117 @@
+"""
+Benchmark pencocokan tanda silang ke sel tabel: pemindaian linear (cara lama di
+get_jawaban_dari_baris) dibandingkan dengan indeks spasial GridSpasial.
+
+Contoh:
+    python benchmark_indeks_spasial.py --soal 40 100 200 --tanda 500
+"""
+
+import argparse
+import random
+import time
+
+from indeks_spasial import GridSpasial, batas_polygon, perluas_kotak
+
+pilihan_jawaban = ["A", "B", "C", "D"]
+
+
+def buat_sel_sintetis(jumlah_soal, jumlah_kolom=8, lebar=40.0, tinggi=20.0):
+    """Buat sel tabel sintetis: setiap 4 baris berisi pilihan A-D untuk satu soal per kolom."""
+    sel = []
+    jumlah_blok = (jumlah_soal + jumlah_kolom - 1) // jumlah_kolom
+    for row_idx in range(jumlah_blok * 4):
+        for col_idx in range(jumlah_kolom):
+            x0 = col_idx * lebar
+            y0 = row_idx * tinggi
+            polygon = [[x0, y0], [x0 + lebar, y0], [x0 + lebar, y0 + tinggi], [x0, y0 + tinggi]]
+            sel.append({
+                "content": pilihan_jawaban[row_idx % 4],
+                "row": row_idx,
+                "col": col_idx,
+                "polygon": polygon,
+            })
+    return sel, jumlah_kolom
+
+
+def buat_tanda_sintetis(sel, jumlah_tanda, seed=0):
+    """Buat titik pusat tanda silang acak di area tabel."""
+    rng = random.Random(seed)
+    max_x = max(p[0] for c in sel for p in c["polygon"])
+    max_y = max(p[1] for c in sel for p in c["polygon"])
+    return [(rng.uniform(0, max_x), rng.uniform(0, max_y)) for _ in range(jumlah_tanda)]
+
+
+def cocokkan_linear(tanda, sel, jumlah_kolom, jumlah_soal):
+    """Pemindaian semua sel untuk setiap tanda, seperti implementasi lama."""
+    hasil = []
+    for mark_x, mark_y in tanda:
+        for cell in sel:
+            min_x, min_y, max_x, max_y = batas_polygon(cell["polygon"])
+            margin_x = (max_x - min_x) * 0.15
+            margin_y = (max_y - min_y) * 0.15
+            if min_x - margin_x <= mark_x <= max_x + margin_x and min_y - margin_y <= mark_y <= max_y + margin_y:
+                if cell["content"] in pilihan_jawaban:
+                    nomor_soal = (cell["row"] // 4) * jumlah_kolom + cell["col"] + 1
+                    if 1 <= nomor_soal <= jumlah_soal:
+                        hasil.append((nomor_soal, cell["row"] % 4))
+                        break
+    return hasil
+
+
+def cocokkan_indeks(tanda, sel, jumlah_kolom, jumlah_soal):
+    """Bangun GridSpasial sekali, lalu cari sel untuk setiap tanda."""
+    info = []
+    kotak = []
+    for cell in sel:
+        if cell["content"] not in pilihan_jawaban:
+            continue
+        nomor_soal = (cell["row"] // 4) * jumlah_kolom + cell["col"] + 1
+        if not 1 <= nomor_soal <= jumlah_soal:
+            continue
+        info.append((nomor_soal, cell["row"] % 4))
+        kotak.append(perluas_kotak(batas_polygon(cell["polygon"]), 0.15))
+    indeks = GridSpasial(kotak)
+
+    hasil = []
+    for mark_x, mark_y in tanda:
+        cocok = indeks.query_titik(mark_x, mark_y)
+        if cocok:
+            hasil.append(info[cocok[0]])
+    return hasil
+
+
+def ukur(fungsi, *args, ulang=3):
+    terbaik = float("inf")
+    hasil = None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi(*args)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik, hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pencocokan tanda silang ke sel tabel")
+    parser.add_argument("--soal", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--tanda", type=int, default=400)
+    parser.add_argument("--ulang", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Soal':>6} | {'Sel':>6} | {'Tanda':>6} | {'Linear (ms)':>12} | {'Indeks (ms)':>12} | {'Percepatan':>10}")
+    print("-" * 68)
+    for jumlah_soal in args.soal:
+        sel, jumlah_kolom = buat_sel_sintetis(jumlah_soal)
+        tanda = buat_tanda_sintetis(sel, args.tanda)
+
+        waktu_linear, hasil_linear = ukur(cocokkan_linear, tanda, sel, jumlah_kolom, jumlah_soal, ulang=args.ulang)
+        waktu_indeks, hasil_indeks = ukur(cocokkan_indeks, tanda, sel, jumlah_kolom, jumlah_soal, ulang=args.ulang)
+
+        if hasil_linear != hasil_indeks:
+            raise SystemExit(f"Hasil berbeda untuk {jumlah_soal} soal!")
+
+        print(f"{jumlah_soal:6d} | {len(sel):6d} | {len(tanda):6d} | {waktu_linear * 1000:12.2f} | "
+              f"{waktu_indeks * 1000:12.2f} | {waktu_linear / waktu_indeks:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
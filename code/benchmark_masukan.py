@@ -0,0 +1,122 @@
+"""
+Benchmark memori unggahan dokumen: seluruh file di memori dibandingkan dengan file yang dialirkan dari disk.
+
+File acak berukuran --ukuran-mb diunggah ke endpoint_palsu.py. Setiap mode dijalankan di proses terpisah
+sehingga puncak RSS (VmHWM) terukur bersih:
+  base64   f.read() + AnalyzeDocumentRequest(bytes_source=...) (cara lama: bytes, base64, dan body JSON)
+  bytes    f.read() lalu bytes dikirim langsung sebagai application/octet-stream
+  file     DokumenFile: kunci cache dihitung per blok, file dialirkan sebagai body unggahan
+  file-async  seperti file, dengan client aio
+Kunci cache dari DokumenFile diperiksa sama dengan buat_kunci_cache() atas seluruh isi file.
+
+Contoh:
+    python benchmark_masukan.py --ukuran-mb 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark_proyeksi import _puncak_rss_mb, _rss_mb
+
+MODE = ("base64", "bytes", "file", "file-async")
+API_VERSION = "2024-11-30"
+
+
+def _jalankan_mode(mode, path, endpoint):
+    """Dijalankan di proses anak: hitung kunci cache, unggah, tunggu hasil, cetak ringkasan JSON."""
+    from azure.core.credentials import AzureKeyCredential
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+    from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+    from cache_analisis import body_unggahan, buat_kunci_cache
+    from masukan_dokumen import DokumenFile
+
+    rss_awal = _rss_mb()
+    mulai = time.perf_counter()
+    if mode == "file-async":
+        from azure.ai.documentintelligence.aio import DocumentIntelligenceClient as ClientAio
+
+        async def unggah(dokumen):
+            async with ClientAio(endpoint=endpoint, credential=AzureKeyCredential("palsu")) as client:
+                with body_unggahan(dokumen) as body:
+                    poller = await client.begin_analyze_document("prebuilt-layout", body, polling_interval=0.1)
+                await poller.result()
+
+        dokumen = DokumenFile(path)
+        kunci = dokumen.kunci_cache("prebuilt-layout", API_VERSION)
+        asyncio.run(unggah(dokumen))
+    else:
+        client = DocumentIntelligenceClient(endpoint=endpoint, credential=AzureKeyCredential("palsu"))
+        if mode == "file":
+            dokumen = DokumenFile(path)
+            kunci = dokumen.kunci_cache("prebuilt-layout", API_VERSION)
+        else:
+            with open(path, "rb") as f:
+                dokumen = f.read()
+            kunci = buat_kunci_cache(dokumen, "prebuilt-layout", API_VERSION)
+        if mode == "base64":
+            body = AnalyzeDocumentRequest(bytes_source=dokumen)
+            client.begin_analyze_document("prebuilt-layout", body, polling_interval=0.1).result()
+        else:
+            with body_unggahan(dokumen) as body:
+                poller = client.begin_analyze_document("prebuilt-layout", body, polling_interval=0.1)
+            poller.result()
+
+    print(json.dumps({
+        "mode": mode,
+        "rss_awal_mb": round(rss_awal, 1),
+        "puncak_rss_mb": round(_puncak_rss_mb(), 1),
+        "detik": round(time.perf_counter() - mulai, 3),
+        "kunci": kunci[:16],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memori unggahan bytes vs file yang dialirkan")
+    parser.add_argument("--ukuran-mb", type=int, default=100, help="ukuran file dokumen sintetis (MB)")
+    parser.add_argument("--mode", choices=MODE, nargs="+", default=list(MODE))
+    parser.add_argument("--_anak", nargs=3, metavar=("MODE", "FILE", "ENDPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._anak:
+        _jalankan_mode(*args._anak)
+        return
+
+    from endpoint_palsu import buat_server_palsu
+
+    with tempfile.TemporaryDirectory() as direktori:
+        path = os.path.join(direktori, "dokumen.pdf")
+        with open(path, "wb") as f:
+            for _ in range(args.ukuran_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"Dokumen sintetis: {args.ukuran_mb} MB")
+
+        server = buat_server_palsu(rps=0, latensi_dasar=0.2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{server.server_port}"
+
+        hasil_mode = []
+        for mode in args.mode:
+            keluaran = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--_anak", mode, path, endpoint],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            hasil_mode.append(json.loads(keluaran.strip().splitlines()[-1]))
+        server.shutdown()
+
+    print(f"\n{'mode':11s} {'RSS awal':>9s} {'puncak':>8s} {'+puncak':>8s} {'detik':>7s}  kunci")
+    for h in hasil_mode:
+        print(f"{h['mode']:11s} {h['rss_awal_mb']:8.1f}M {h['puncak_rss_mb']:7.1f}M "
+              f"{h['puncak_rss_mb'] - h['rss_awal_mb']:7.1f}M {h['detik']:7.2f}  {h['kunci']}")
+    if len({h["kunci"] for h in hasil_mode}) > 1:
+        raise SystemExit("Kunci cache berbeda antar mode!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark pembaca lembar lokal (omr_lokal.py) pada formulir sintetis.
+
+Formulir satu tabel jawaban (kolom nomor soal dan pilihan A-D, satu soal per baris) digambar dengan Pillow,
+bersama hasil analisis Azure yang cocok untuk lembar referensi. Setiap lembar berikutnya mendapat tanda silang
+acak (sebagian kosong atau bertanda ganda), lalu "di-scan": digeser, diskalakan, diberi derau, dan disimpan
+sebagai JPEG. Sebagian kecil juga diputar sedikit. Dilaporkan: waktu baca per lembar, proporsi lembar yang
+dibaca lokal, ketepatan jawaban lembar yang dibaca lokal, dan apakah lembar bertanda ganda dikirim ke Azure.
+
+Contoh:
+    python benchmark_omr_lokal.py --lembar 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+import numpy as np
+
+from omr_lokal import TataLetakOMR, baca_gambar, baca_lembar
+from skema_ujian import SkemaUjian
+
+try:
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+except ImportError:  # Pillow dibutuhkan untuk menggambar formulir sintetis
+    Image = None
+
+LEBAR, TINGGI = 1700, 2200
+TABEL_X, TABEL_Y = 300, 300
+LEBAR_NOMOR, LEBAR_PILIHAN, TINGGI_BARIS = 100, 110, 42
+
+
+def _kolom_x(kolom):
+    # Tepi kiri kolom (0 = nomor soal, 1.. = pilihan)
+    return TABEL_X + (0 if kolom == 0 else LEBAR_NOMOR + (kolom - 1) * LEBAR_PILIHAN)
+
+
+def _kotak_sel(baris, kolom):
+    x0 = _kolom_x(kolom)
+    x1 = x0 + (LEBAR_NOMOR if kolom == 0 else LEBAR_PILIHAN)
+    y0 = TABEL_Y + baris * TINGGI_BARIS
+    return x0, y0, x1, y0 + TINGGI_BARIS
+
+
+def hasil_formulir(skema):
+    """Dict AnalyzeResult (format as_dict) untuk formulir kosong: satu tabel, kolom nomor dan pilihan."""
+    cells = []
+    for baris in range(skema.jumlah_soal):
+        for kolom in range(skema.jumlah_pilihan + 1):
+            x0, y0, x1, y1 = _kotak_sel(baris, kolom)
+            cells.append({
+                "rowIndex": baris, "columnIndex": kolom,
+                "content": str(baris + 1) if kolom == 0 else skema.pilihan[kolom - 1],
+                "boundingRegions": [{"pageNumber": 1, "polygon": [x0, y0, x1, y0, x1, y1, x0, y1]}],
+                "spans": [],
+            })
+    x1, y1 = _kotak_sel(skema.jumlah_soal - 1, skema.jumlah_pilihan)[2:]
+    return {
+        "apiVersion": "2024-11-30",
+        "modelId": "prebuilt-layout",
+        "content": "",
+        "pages": [{"pageNumber": 1, "width": LEBAR, "height": TINGGI, "unit": "pixel", "spans": [],
+                   "words": [], "lines": [], "selectionMarks": []}],
+        "tables": [{
+            "rowCount": skema.jumlah_soal, "columnCount": skema.jumlah_pilihan + 1, "cells": cells,
+            "boundingRegions": [{"pageNumber": 1, "polygon": [TABEL_X, TABEL_Y, x1, TABEL_Y, x1, y1, TABEL_X, y1]}],
+            "spans": [],
+        }],
+    }
+
+
+def gambar_formulir(skema, tanda, rng):
+    """Gambar lembar (PIL.Image mode L): kop, tabel, huruf pilihan, dan tanda silang per (soal, pilihan)."""
+    gambar = Image.new("L", (LEBAR, TINGGI), 255)
+    draw = ImageDraw.Draw(gambar)
+    font = ImageFont.load_default(size=22)
+    draw.text((TABEL_X, 120), "LEMBAR JAWABAN UJIAN TENGAH SEMESTER", fill=0, font=font)
+    draw.text((TABEL_X, 170), "Nama: ____________________   Kelas: ______", fill=0, font=font)
+    for baris in range(skema.jumlah_soal):
+        for kolom in range(skema.jumlah_pilihan + 1):
+            x0, y0, x1, y1 = _kotak_sel(baris, kolom)
+            draw.rectangle((x0, y0, x1, y1), outline=0, width=3)
+            teks = str(baris + 1) if kolom == 0 else skema.pilihan[kolom - 1]
+            draw.text((x0 + 12, y0 + 9), teks, fill=0, font=font)
+    for nomor_soal, pilihan in tanda:
+        x0, y0, x1, y1 = _kotak_sel(nomor_soal - 1, skema.pilihan.index(pilihan) + 1)
+        # Tanda silang tulisan tangan: dua garis miring dengan ujung acak
+        def acak(v):
+            return v + rng.uniform(-6, 6)
+        tebal = rng.randint(4, 7)
+        draw.line((acak(x0 + 20), acak(y0 + 8), acak(x1 - 20), acak(y1 - 8)), fill=rng.randint(0, 60), width=tebal)
+        draw.line((acak(x1 - 20), acak(y0 + 8), acak(x0 + 20), acak(y1 - 8)), fill=rng.randint(0, 60), width=tebal)
+    return gambar
+
+
+def scan(gambar, rng, sudut=0.0, geser=True):
+    """
+    Simulasi scan: skala dan geseran (kecuali geser False), rotasi opsional, blur, derau, lalu JPEG.
+    Kembalikan bytes JPEG.
+    """
+    skala = rng.uniform(0.98, 1.02) if geser else 1.0
+    dx, dy = (rng.uniform(-0.02, 0.02) * LEBAR, rng.uniform(-0.02, 0.02) * TINGGI) if geser else (0.0, 0.0)
+    # Transformasi affine dari piksel keluaran ke piksel masukan
+    hasil = gambar.transform(gambar.size, Image.AFFINE, (1 / skala, 0, -dx / skala, 0, 1 / skala, -dy / skala),
+                             resample=Image.BILINEAR, fillcolor=255)
+    if sudut:
+        hasil = hasil.rotate(sudut, resample=Image.BILINEAR, fillcolor=255)
+    hasil = hasil.filter(ImageFilter.GaussianBlur(0.8))
+    derau = np.random.default_rng(rng.randrange(1 << 30)).normal(0, 12, (hasil.height, hasil.width))
+    hasil = Image.fromarray(np.clip(np.asarray(hasil, dtype=np.float64) + derau, 0, 255).astype(np.uint8))
+    keluaran = io.BytesIO()
+    hasil.save(keluaran, format="JPEG", quality=75)
+    return keluaran.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pembaca lembar lokal pada formulir sintetis")
+    parser.add_argument("--lembar", type=int, default=100)
+    parser.add_argument("--soal", type=int, default=40)
+    parser.add_argument("--kosong", type=float, default=0.03, help="peluang soal tidak dijawab")
+    parser.add_argument("--ganda", type=float, default=0.003, help="peluang soal bertanda ganda")
+    parser.add_argument("--miring", type=float, default=0.05, help="proporsi lembar yang diputar 1-2 derajat")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if Image is None:
+        raise SystemExit("Benchmark ini membutuhkan Pillow: pip install pillow")
+
+    from azure.ai.documentintelligence.models import AnalyzeResult
+
+    rng = random.Random(args.seed)
+    skema = SkemaUjian(args.soal)
+    # Koordinat hasil Azure lembar referensi sesuai dengan gambar referensi itu sendiri: tanpa geseran
+    referensi = scan(gambar_formulir(skema, [], rng), random.Random(args.seed + 1), geser=False)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tata_letak = TataLetakOMR.dari_hasil(AnalyzeResult(hasil_formulir(skema)), baca_gambar(referensi), skema)
+    print(f"Tata letak: {len(tata_letak.soal)} soal, {len(tata_letak.garis_x)} garis vertikal, "
+          f"{len(tata_letak.garis_y)} garis horizontal")
+
+    jumlah = {"lokal": 0, "azure": 0, "lokal_benar": 0, "soal_salah_lokal": 0, "ganda": 0, "ganda_ke_azure": 0,
+              "miring": 0, "miring_ke_azure": 0}
+    durasi = []
+    for _ in range(args.lembar):
+        jawaban_benar, tanda, ganda = [], [], False
+        for nomor_soal in range(1, skema.jumlah_soal + 1):
+            acak = rng.random()
+            if acak < args.kosong:
+                jawaban_benar.append("-")
+                continue
+            pilihan = rng.choice(skema.pilihan)
+            tanda.append((nomor_soal, pilihan))
+            jawaban_benar.append(pilihan)
+            if acak < args.kosong + args.ganda:
+                tanda.append((nomor_soal, rng.choice([p for p in skema.pilihan if p != pilihan])))
+                ganda = True
+        miring = rng.random() < args.miring
+        data = scan(gambar_formulir(skema, tanda, rng), rng, rng.choice((-1, 1)) * rng.uniform(1, 2) if miring else 0.0)
+
+        mulai = time.perf_counter()
+        hasil = baca_lembar(baca_gambar(data), tata_letak, skema)
+        durasi.append(time.perf_counter() - mulai)
+
+        jumlah["ganda"] += ganda
+        jumlah["miring"] += miring
+        if hasil.ambigu:
+            jumlah["azure"] += 1
+            jumlah["ganda_ke_azure"] += ganda
+            jumlah["miring_ke_azure"] += miring
+            continue
+        jumlah["lokal"] += 1
+        salah = sum(1 for a, b in zip(hasil.jawaban, jawaban_benar) if a != b)
+        jumlah["soal_salah_lokal"] += salah
+        jumlah["lokal_benar"] += salah == 0
+
+    durasi = np.array(durasi) * 1000
+    print(f"Waktu baca per lembar: median {np.median(durasi):.1f} ms, p95 {np.percentile(durasi, 95):.1f} ms")
+    print(f"Dibaca lokal: {jumlah['lokal']}/{args.lembar}, dikirim ke Azure: {jumlah['azure']}")
+    print(f"Lembar lokal tanpa kesalahan: {jumlah['lokal_benar']}/{jumlah['lokal']} "
+          f"({jumlah['soal_salah_lokal']} soal salah)")
+    print(f"Lembar bertanda ganda ke Azure: {jumlah['ganda_ke_azure']}/{jumlah['ganda']}")
+    print(f"Lembar miring ke Azure: {jumlah['miring_ke_azure']}/{jumlah['miring']}")
+    if jumlah["soal_salah_lokal"] or jumlah["ganda_ke_azure"] < jumlah["ganda"]:
+        raise SystemExit("Pembaca lokal menerima jawaban yang salah!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark penilaian massal: loop per siswa per soal (seperti bandingkan_jawaban) dibandingkan dengan
+nilai_massal pada matriks uint8 N x Q.
+
+Contoh:
+    python benchmark_penilaian_massal.py --siswa 100000 --soal 40 --pilihan ABCD
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from penilaian_massal import matriks_jawaban, nilai_massal
+from skema_ujian import SkemaUjian
+
+
+def buat_jawaban_sintetis(jumlah_siswa, skema, kunci_kode, seed=0):
+    """Matriks kode jawaban acak: peluang benar berbeda per siswa, 5% tidak terdeteksi."""
+    rng = np.random.default_rng(seed)
+    kemampuan = rng.uniform(0.2, 0.95, size=(jumlah_siswa, 1))
+    acak = rng.integers(1, skema.jumlah_pilihan + 1, size=(jumlah_siswa, skema.jumlah_soal), dtype=np.uint8)
+    matriks = np.where(rng.random((jumlah_siswa, skema.jumlah_soal)) < kemampuan, kunci_kode, acak)
+    matriks[rng.random(matriks.shape) < 0.05] = 0
+    return matriks.astype(np.uint8)
+
+
+def nilai_loop(daftar_jawaban, kunci_jawaban):
+    """Hitung benar/salah/tidak terdeteksi per siswa dengan loop Python."""
+    hasil = []
+    for jawaban_siswa in daftar_jawaban:
+        benar = salah = tidak_terjawab = 0
+        for i in range(len(kunci_jawaban)):
+            if jawaban_siswa[i] == "-":
+                tidak_terjawab += 1
+            elif jawaban_siswa[i] == kunci_jawaban[i]:
+                benar += 1
+            else:
+                salah += 1
+        hasil.append((benar, salah, tidak_terjawab))
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark penilaian massal")
+    parser.add_argument("--siswa", type=int, default=100000)
+    parser.add_argument("--soal", type=int, default=40)
+    parser.add_argument("--pilihan", default="ABCD")
+    parser.add_argument("--tanpa-loop", action="store_true", help="lewati pengukuran loop Python")
+    args = parser.parse_args()
+
+    skema = SkemaUjian(args.soal, tuple(args.pilihan))
+    rng = np.random.default_rng(1)
+    kunci_kode = rng.integers(1, skema.jumlah_pilihan + 1, size=skema.jumlah_soal, dtype=np.uint8)
+    kunci_jawaban = skema.dari_kode(kunci_kode)
+    matriks = buat_jawaban_sintetis(args.siswa, skema, kunci_kode)
+    daftar_jawaban = [skema.dari_kode(baris) for baris in matriks]
+
+    mulai = time.perf_counter()
+    matriks_baru = matriks_jawaban(daftar_jawaban, skema)
+    waktu_konversi = time.perf_counter() - mulai
+    if not np.array_equal(matriks, matriks_baru):
+        raise SystemExit("Konversi huruf ke matriks berbeda!")
+
+    mulai = time.perf_counter()
+    hasil = nilai_massal(matriks, kunci_kode, skema)
+    waktu_massal = time.perf_counter() - mulai
+
+    print(f"{args.siswa} siswa x {args.soal} soal ({args.pilihan})")
+    print(f"Konversi list huruf -> matriks uint8: {waktu_konversi * 1000:9.1f} ms")
+    print(f"nilai_massal (skor + analisis butir): {waktu_massal * 1000:9.1f} ms")
+
+    if not args.tanpa_loop:
+        mulai = time.perf_counter()
+        hasil_loop = nilai_loop(daftar_jawaban, kunci_jawaban)
+        waktu_loop = time.perf_counter() - mulai
+        if hasil_loop != list(zip(hasil.benar.tolist(), hasil.salah.tolist(), hasil.tidak_terdeteksi.tolist())):
+            raise SystemExit("Hasil loop dan nilai_massal berbeda!")
+        print(f"Loop Python (hanya skor):             {waktu_loop * 1000:9.1f} ms ({waktu_loop / waktu_massal:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
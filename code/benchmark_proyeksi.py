@@ -0,0 +1,259 @@
+"""
+Benchmark memori: AnalyzeResult SDK lengkap dibandingkan dengan ProyeksiHasil yang diurai bertahap.
+
+Respons sintetis berisi banyak halaman (kata, garis, selection mark, satu tabel jawaban per halaman,
+paragraf, dan `content` seluruh dokumen) ditulis ke file sementara. Setiap mode dijalankan di proses
+terpisah sehingga puncak RSS-nya terukur bersih:
+  sdk            json.load + AnalyzeResult (seperti cache_analisis.ambil), lalu nilai per siswa
+  proyeksi       proyeksi_dari_file, lalu nilai per siswa
+  sdk-http       begin_analyze_document + poller.result() ke endpoint_palsu.py
+  proyeksi-http  analisis_proyeksi ke endpoint_palsu.py (GET streaming)
+Jawaban semua siswa dibandingkan antar mode.
+
+Sebelum benchmark, PembacaJSONBertahap diperiksa pada dokumen kecil yang dipotong di setiap titik
+(termasuk di tengah angka seperti "1700." atau "1e-" dan di tengah karakter UTF-8); hasilnya harus sama
+dengan json.loads.
+
+Contoh:
+    python benchmark_proyeksi.py --halaman 100
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PILIHAN = "ABCD"
+MODE = ("sdk", "proyeksi", "sdk-http", "proyeksi-http")
+
+# Dokumen untuk cek_titik_potong; kunci "dilewati" dibaca dengan lewati(), bukan diurai
+DOKUMEN_CEK = {
+    "angka": [1700.5, -1e-3, 2.5E+10, 0, -0.25, 12345678901234567890, 3e7],
+    "teks": "sélection \"kutip\" \\ ∑ 😀",
+    "polygon": [101.25, 202.5, 303.75, 404.0],
+    "dilewati": {"content": "a \\\" b", "spans": [{"offset": 17, "length": 1e2}], "x": [1.5e-2, True]},
+    "bersarang": {"benar": True, "salah": False, "kosong": None, "larik": [], "objek": {}},
+    "akhir": 42,
+}
+
+
+def _baca_seperti(pembaca, contoh):
+    """Baca nilai berikutnya dengan objek()/larik()/nilai() mengikuti bentuk contoh."""
+    if isinstance(contoh, dict):
+        hasil = {}
+        for kunci in pembaca.objek():
+            if kunci == "dilewati":
+                pembaca.lewati()
+            else:
+                hasil[kunci] = _baca_seperti(pembaca, contoh[kunci])
+        return hasil
+    if isinstance(contoh, list):
+        return [_baca_seperti(pembaca, contoh[i]) for i in pembaca.larik()]
+    return pembaca.nilai()
+
+
+def cek_titik_potong(dokumen=DOKUMEN_CEK):
+    """Urai dokumen yang dipotong menjadi dua di setiap byte; kembalikan jumlah titik potong yang diperiksa."""
+    from proyeksi_hasil import PembacaJSONBertahap
+
+    data = json.dumps(dokumen, ensure_ascii=False).encode("utf-8")
+    harapan = json.loads(data)
+    harapan.pop("dilewati")
+    for i in range(len(data) + 1):
+        # ukuran_potongan=1: setiap pengisian buffer hanya mengambil satu potongan
+        pembaca = PembacaJSONBertahap([data[:i], data[i:]], ukuran_potongan=1)
+        hasil = _baca_seperti(pembaca, dokumen)
+        if hasil != harapan:
+            raise SystemExit(f"PembacaJSONBertahap salah jika dipotong di byte {i}: {data[:i][-20:]!r} | {data[i:][:20]!r}")
+    return len(data) + 1
+
+
+def _kotak(x0, y0, lebar, tinggi):
+    return [round(v, 4) for v in (x0, y0, x0 + lebar, y0, x0 + lebar, y0 + tinggi, x0, y0 + tinggi)]
+
+
+def buat_respons_sintetis(jumlah_halaman, jumlah_soal=40, kata_per_halaman=800, seed=0):
+    """Dict AnalyzeResult (format as_dict) dengan satu lembar jawaban 8 kolom per halaman."""
+    rng = random.Random(seed)
+    kosakata = ["nama", "kelas", "nomor", "jawaban", "ujian", "tengah", "semester", "matematika", "siswa"]
+    jumlah_kolom = 8
+    jumlah_blok = (jumlah_soal + jumlah_kolom - 1) // jumlah_kolom
+    offset = 0
+    semua_teks = []
+    pages, tables, paragraphs = [], [], []
+
+    for nomor in range(1, jumlah_halaman + 1):
+        words, lines = [], []
+        for i in range(kata_per_halaman):
+            teks = rng.choice(kosakata)
+            x, y = rng.uniform(0, 1600), rng.uniform(0, 2200)
+            words.append({"content": teks, "polygon": _kotak(x, y, 60, 18), "confidence": round(rng.random(), 3),
+                          "span": {"offset": offset, "length": len(teks)}})
+            semua_teks.append(teks)
+            offset += len(teks) + 1
+        for i in range(kata_per_halaman // 8):
+            teks = " ".join(w["content"] for w in words[i * 8:(i + 1) * 8])
+            lines.append({"content": teks, "polygon": words[i * 8]["polygon"],
+                          "spans": [{"offset": words[i * 8]["span"]["offset"], "length": len(teks)}]})
+            paragraphs.append({"content": teks, "spans": lines[-1]["spans"],
+                               "boundingRegions": [{"pageNumber": nomor, "polygon": lines[-1]["polygon"]}]})
+
+        cells = []
+        selection_marks = []
+        for row in range(jumlah_blok * 4):
+            for col in range(jumlah_kolom):
+                x0, y0 = 200 + col * 120, 600 + row * 30
+                cells.append({"kind": "content", "rowIndex": row, "columnIndex": col, "content": PILIHAN[row % 4],
+                              "boundingRegions": [{"pageNumber": nomor, "polygon": _kotak(x0, y0, 120, 30)}],
+                              "spans": [{"offset": 0, "length": 1}], "elements": [f"/paragraphs/{len(paragraphs)}"]})
+        for blok in range(jumlah_blok):
+            for col in range(jumlah_kolom):
+                # Satu tanda silang per soal di salah satu sel A-D
+                row = blok * 4 + rng.randrange(4)
+                x0, y0 = 200 + col * 120, 600 + row * 30
+                selection_marks.append({"state": "selected", "confidence": 0.9,
+                                        "polygon": _kotak(x0 + 50, y0 + 8, 14, 14), "span": {"offset": 0, "length": 1}})
+        tables.append({"rowCount": jumlah_blok * 4, "columnCount": jumlah_kolom, "cells": cells,
+                       "boundingRegions": [{"pageNumber": nomor, "polygon": _kotak(200, 600, 960, jumlah_blok * 120)}],
+                       "spans": [{"offset": 0, "length": 1}]})
+        pages.append({"pageNumber": nomor, "angle": 0.0, "width": 1700, "height": 2300, "unit": "pixel",
+                      "words": words, "lines": lines, "selectionMarks": selection_marks,
+                      "spans": [{"offset": 0, "length": offset}]})
+
+    return {
+        "apiVersion": "2024-11-30",
+        "modelId": "prebuilt-layout",
+        "stringIndexType": "textElements",
+        "content": " ".join(semua_teks),
+        "pages": pages,
+        "tables": tables,
+        "paragraphs": paragraphs,
+        "styles": [{"isHandwritten": True, "confidence": 0.9, "spans": [{"offset": 0, "length": 10}]}],
+        "contentFormat": "text",
+    }
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _puncak_rss_mb():
+    # VmHWM, bukan ru_maxrss: ru_maxrss proses anak ikut mewarisi puncak proses induk saat fork
+    with open("/proc/self/status") as f:
+        for baris in f:
+            if baris.startswith("VmHWM:"):
+                return int(baris.split()[1]) / 1024
+    return 0.0
+
+
+def _jalankan_mode(mode, path, endpoint):
+    """Dijalankan di proses anak: muat hasil, nilai semua siswa, cetak ringkasan JSON."""
+    from lembar_bertahap import nilai_per_siswa
+    from proyeksi_hasil import analisis_proyeksi, proyeksi_dari_file
+
+    if mode.endswith("http"):
+        from azure.core.credentials import AzureKeyCredential
+        from azure.ai.documentintelligence import DocumentIntelligenceClient
+        from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
+        client = DocumentIntelligenceClient(endpoint=endpoint, credential=AzureKeyCredential("palsu"))
+    else:
+        from azure.ai.documentintelligence.models import AnalyzeResult
+
+    rss_awal = _rss_mb()
+    mulai = time.perf_counter()
+    if mode == "sdk":
+        with open(path, "r", encoding="utf-8") as f:
+            result = AnalyzeResult(json.load(f))
+    elif mode == "proyeksi":
+        result = proyeksi_dari_file(path)
+    elif mode == "sdk-http":
+        poller = client.begin_analyze_document(
+            "prebuilt-layout", AnalyzeDocumentRequest(bytes_source=b"lembar"), polling_interval=0.1
+        )
+        result = poller.result()
+    else:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = analisis_proyeksi(client, b"lembar", polling_interval=0.1)
+    detik_muat = time.perf_counter() - mulai
+    rss_setelah_muat = _rss_mb()
+    puncak_muat = _puncak_rss_mb()
+
+    mulai = time.perf_counter()
+    ringkasan_jawaban = hashlib.sha256()
+    jumlah_siswa = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for hasil in nilai_per_siswa(result):
+            ringkasan_jawaban.update("".join(hasil["jawaban"]).encode("utf-8"))
+            jumlah_siswa += 1
+    detik_nilai = time.perf_counter() - mulai
+
+    print(json.dumps({
+        "mode": mode,
+        "rss_awal_mb": round(rss_awal, 1),
+        "rss_setelah_muat_mb": round(rss_setelah_muat, 1),
+        "puncak_muat_mb": round(puncak_muat, 1),
+        "puncak_rss_mb": round(_puncak_rss_mb(), 1),
+        "detik_muat": round(detik_muat, 3),
+        "detik_nilai": round(detik_nilai, 3),
+        "siswa": jumlah_siswa,
+        "jawaban": ringkasan_jawaban.hexdigest()[:16],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memori AnalyzeResult SDK vs proyeksi bertahap")
+    parser.add_argument("--halaman", type=int, default=100)
+    parser.add_argument("--kata", type=int, default=800, help="kata per halaman")
+    parser.add_argument("--mode", choices=MODE, nargs="+", default=list(MODE))
+    parser.add_argument("--_anak", nargs=3, metavar=("MODE", "FILE", "ENDPOINT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._anak:
+        _jalankan_mode(*args._anak)
+        return
+
+    print(f"Pembaca bertahap: {cek_titik_potong()} titik potong sama dengan json.loads")
+
+    from endpoint_palsu import buat_server_palsu
+
+    with tempfile.TemporaryDirectory() as direktori:
+        path = os.path.join(direktori, "hasil.json")
+        data = buat_respons_sintetis(args.halaman, kata_per_halaman=args.kata)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        print(f"Respons sintetis: {args.halaman} halaman, {os.path.getsize(path) / (1024 * 1024):.1f} MB JSON")
+
+        server = buat_server_palsu(rps=0, latensi_dasar=0.2, hasil=data)
+        del data
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{server.server_port}"
+
+        hasil_mode = []
+        for mode in args.mode:
+            keluaran = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--_anak", mode, path, endpoint],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            hasil_mode.append(json.loads(keluaran.strip().splitlines()[-1]))
+        server.shutdown()
+
+    print(f"\n{'mode':15s} {'RSS awal':>9s} {'+muat':>8s} {'puncak muat':>12s} {'puncak':>8s} "
+          f"{'muat (s)':>9s} {'nilai (s)':>9s}  jawaban")
+    for h in hasil_mode:
+        print(f"{h['mode']:15s} {h['rss_awal_mb']:8.1f}M {h['rss_setelah_muat_mb'] - h['rss_awal_mb']:7.1f}M "
+              f"{h['puncak_muat_mb']:11.1f}M {h['puncak_rss_mb']:7.1f}M {h['detik_muat']:9.2f} {h['detik_nilai']:9.2f}  "
+              f"{h['jawaban']} ({h['siswa']} siswa)")
+    if len({h["jawaban"] for h in hasil_mode}) > 1:
+        raise SystemExit("Jawaban berbeda antar mode!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Cache lokal berbasis konten (content-addressed) untuk hasil analisis Azure Document Intelligence.
+
+Kunci cache adalah hash SHA-256 dari isi file, model id, dan versi API, sehingga lembar
+yang sama tidak perlu dikirim ulang ke Azure ketika hanya kunci jawaban atau detektor yang berubah.
+Hasil disimpan sebagai JSON dari `AnalyzeResult.as_dict()` dan dibatasi ukurannya dengan eviksi LRU.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+from azure.core.exceptions import HttpResponseError
+from azure.ai.documentintelligence.models import AnalyzeResult
+
+from instrumentasi import hitung, span
+
+# Batas ukuran default direktori cache (dalam byte)
+BATAS_UKURAN_DEFAULT = 512 * 1024 * 1024
+
+
+def awal_kunci_cache(model_id, api_version):
+    """Objek hash kunci cache yang sudah berisi model id dan versi API; isi file ditambahkan dengan update()."""
+    h = hashlib.sha256()
+    h.update(model_id.encode("utf-8"))
+    h.update(b"\0")
+    h.update(str(api_version).encode("utf-8"))
+    h.update(b"\0")
+    return h
+
+
+def buat_kunci_cache(file_bytes, model_id, api_version):
+    """Buat kunci cache dari isi file, model id, dan versi API."""
+    h = awal_kunci_cache(model_id, api_version)
+    h.update(file_bytes)
+    return h.hexdigest()
+
+
+def kunci_dokumen(dokumen, model_id, api_version):
+    """Kunci cache untuk dokumen berupa bytes atau DokumenFile (masukan_dokumen), tanpa membaca file utuh."""
+    if isinstance(dokumen, bytes):
+        return buat_kunci_cache(dokumen, model_id, api_version)
+    return dokumen.kunci_cache(model_id, api_version)
+
+
+@contextlib.contextmanager
+def body_unggahan(dokumen):
+    """
+    Body begin_analyze_document untuk bytes atau DokumenFile. Keduanya dikirim sebagai application/octet-stream,
+    bukan AnalyzeDocumentRequest(bytes_source=...) yang menyalin isi file ke string base64 dan body JSON;
+    DokumenFile dibuka sebagai file dan dialirkan dari disk, lalu ditutup setelah unggahan selesai.
+    """
+    if isinstance(dokumen, bytes):
+        yield dokumen
+        return
+    with dokumen.buka() as f:
+        yield f
+
+
+class CacheHasilAnalisis:
+    """
+    Cache hasil analisis di disk dengan batas ukuran dan eviksi LRU.
+    Waktu akses dicatat melalui mtime file, sehingga urutan LRU tetap bertahan antar proses.
+    """
+
+    def __init__(self, direktori, batas_ukuran=BATAS_UKURAN_DEFAULT):
+        self.direktori = direktori
+        self.batas_ukuran = batas_ukuran
+        self.hit = 0
+        self.miss = 0
+        self._lock = threading.Lock()
+        # Perkiraan ukuran total cache, dihitung penuh hanya saat pertama kali dibutuhkan
+        self._ukuran_total = None
+        os.makedirs(direktori, exist_ok=True)
+
+    def _path(self, kunci):
+        # Pecah ke subdirektori berdasarkan 2 karakter awal agar direktori tidak terlalu besar
+        return os.path.join(self.direktori, kunci[:2], kunci + ".json")
+
+    def ambil(self, kunci):
+        """Kembalikan AnalyzeResult dari cache, atau None jika tidak ada."""
+        path = self._path(kunci)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.miss += 1
+            return None
+
+        # Perbarui waktu akses untuk urutan LRU
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hit += 1
+        return AnalyzeResult(data)
+
+    def path_entri(self, kunci):
+        """
+        Path file JSON entri untuk kunci, atau None jika tidak ada. Dicatat sebagai hit/miss seperti ambil();
+        dipakai pembaca yang mengurai file sendiri (misalnya proyeksi_hasil).
+        """
+        path = self._path(kunci)
+        try:
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self.miss += 1
+            return None
+        with self._lock:
+            self.hit += 1
+        return path
+
+    def path_sementara(self, kunci):
+        """Path file sementara untuk menulis entri kunci, diserahkan ke simpan_file() setelah selesai."""
+        path = self._path(kunci)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def simpan(self, kunci, result):
+        """Simpan AnalyzeResult ke cache, lalu lakukan eviksi jika melebihi batas ukuran."""
+        path_sementara = self.path_sementara(kunci)
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            json.dump(result.as_dict(), f)
+        self.simpan_file(kunci, path_sementara)
+
+    def simpan_file(self, kunci, path_sementara):
+        """Pindahkan file JSON AnalyzeResult yang sudah ditulis di path_sementara menjadi entri kunci."""
+        # Ganti secara atomik agar pembaca lain tidak melihat file setengah jadi
+        path = self._path(kunci)
+        os.replace(path_sementara, path)
+
+        # Cache dapat dipakai bersama oleh beberapa worker, sehingga pembaruan ukuran dilindungi lock
+        with self._lock:
+            if self._ukuran_total is None:
+                self._ukuran_total = self._hitung_ukuran_total()
+            else:
+                self._ukuran_total += os.path.getsize(path)
+            perlu_eviksi = self._ukuran_total > self.batas_ukuran
+
+        # Pemindaian direktori hanya dilakukan jika perkiraan ukuran melewati batas
+        if perlu_eviksi:
+            self.eviksi()
+
+    def _daftar_entri(self):
+        entri = []
+        for root, _, files in os.walk(self.direktori):
+            for nama in files:
+                if not nama.endswith(".json"):
+                    continue
+                path = os.path.join(root, nama)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entri.append((st.st_mtime, st.st_size, path))
+        return entri
+
+    def _hitung_ukuran_total(self):
+        return sum(ukuran for _, ukuran, _ in self._daftar_entri())
+
+    def eviksi(self):
+        """Hapus entri yang paling lama tidak diakses sampai ukuran cache di bawah batas."""
+        entri = self._daftar_entri()
+        total = sum(ukuran for _, ukuran, _ in entri)
+
+        if total > self.batas_ukuran:
+            entri.sort()
+            for _, ukuran, path in entri:
+                if total <= self.batas_ukuran:
+                    break
+                try:
+                    os.remove(path)
+                    total -= ukuran
+                except OSError:
+                    continue
+
+        self._ukuran_total = total
+
+    def statistik(self):
+        """Kembalikan jumlah hit dan miss cache."""
+        total = self.hit + self.miss
+        return {
+            "hit": self.hit,
+            "miss": self.miss,
+            "rasio_hit": self.hit / total if total else 0.0,
+        }
+
+
+def cache_dari_lingkungan():
+    """
+    Buat cache dari variabel lingkungan AZURE_CACHE_DIR (default ".cache_analisis") dan AZURE_CACHE_MAX_MB.
+    Kembalikan None jika AZURE_CACHE_DIR dikosongkan (cache dinonaktifkan).
+    """
+    cache_dir = os.getenv("AZURE_CACHE_DIR", ".cache_analisis")
+    cache_max_mb = os.getenv("AZURE_CACHE_MAX_MB")
+    if not cache_dir:
+        return None
+    return CacheHasilAnalisis(
+        cache_dir,
+        batas_ukuran=int(cache_max_mb) * 1024 * 1024 if cache_max_mb else BATAS_UKURAN_DEFAULT,
+    )
+
+
+def analisis_dengan_cache(client, dokumen, model_id="prebuilt-layout", cache=None, jurnal=None,
+                         polling_interval=None):
+    """
+    Analisis dokumen (bytes atau DokumenFile) dengan Azure, memakai cache lokal jika tersedia.
+    Jika cache memiliki hasil untuk file yang sama, tidak ada panggilan ke Azure.
+    Dengan jurnal (JurnalOperasi), continuation token dicatat setelah unggah, dan operasi yang tertinggal
+    dari proses sebelumnya dilanjutkan tanpa mengunggah ulang. polling_interval (detik) mengganti jeda
+    polling default SDK jika layanan tidak mengirim Retry-After.
+    """
+    kunci = None
+    api_version = getattr(getattr(client, "_config", None), "api_version", "")
+    if cache is not None:
+        with span("cache_ambil"):
+            kunci = kunci_dokumen(dokumen, model_id, api_version)
+            result = cache.ambil(kunci)
+        if result is not None:
+            hitung("cache_hit")
+            print(f"Hasil analisis diambil dari cache ({kunci[:12]})")
+            return result
+        hitung("cache_miss")
+    elif jurnal is not None:
+        kunci = kunci_dokumen(dokumen, model_id, api_version)
+
+    opsi = {"polling_interval": polling_interval} if polling_interval is not None else {}
+    result = None
+    entri = jurnal.ambil(kunci) if jurnal is not None else None
+    if entri is not None and entri.get("token"):
+        # Operasi untuk file yang sama sudah diunggah oleh proses sebelumnya: lanjutkan polling
+        try:
+            with span("tunggu_polling"):
+                poller = client.begin_analyze_document(model_id, None, continuation_token=entri["token"], **opsi)
+                result = poller.result()
+            hitung("operasi_dilanjutkan")
+            print(f"Operasi analisis dilanjutkan dari jurnal ({kunci[:12]})")
+        except HttpResponseError as e:
+            print(f"Operasi di jurnal tidak dapat dilanjutkan ({e.status_code}), mengunggah ulang")
+            jurnal.hapus(kunci)
+
+    if result is None:
+        # Unggah dokumen dan mulai analisis, lalu tunggu hasil polling
+        with span("unggah_analisis"), body_unggahan(dokumen) as body:
+            poller = client.begin_analyze_document(model_id, body, **opsi)
+        if jurnal is not None:
+            jurnal.catat(kunci, poller.continuation_token(), model_id, poller.details["operation_id"])
+        with span("tunggu_polling"):
+            result = poller.result()
+
+    if cache is not None:
+        with span("cache_simpan"):
+            cache.simpan(kunci, result)
+    if jurnal is not None:
+        jurnal.hapus(kunci)
+
+    return result
@@ -0,0 +1,316 @@
+"""
+Detektor jawaban berbasis tabel: pola jawaban tetap, huruf yang tidak muncul, dan deteksi per baris.
+
+Semua detektor menerima hasil analisis beserta IndeksTabel dan SheetGeometry yang sudah dibangun,
+sehingga dapat dipanggil berulang kali tanpa membangun ulang indeks.
+"""
+
+import numpy as np
+
+from geometri_lembar import SheetGeometry, perluas_kotak_array
+from indeks_spasial import GridSpasial
+from indeks_tabel import buat_indeks_tabel
+from instrumentasi import hitung
+from skema_ujian import SKEMA_DEFAULT
+
+# Pilihan jawaban yang tersedia pada skema default
+pilihan_jawaban = list(SKEMA_DEFAULT.pilihan)
+
+# Skema formulir tempat pola jawaban di bawah direkam (40 soal A-D)
+SKEMA_POLA = SKEMA_DEFAULT
+
+
+def pola_tersedia(skema=None):
+    """True jika pola jawaban direkam dari formulir dengan skema ini."""
+    skema = skema or SKEMA_DEFAULT
+    return skema.jumlah_soal == SKEMA_POLA.jumlah_soal and skema.pilihan == SKEMA_POLA.pilihan
+
+
+# Fungsi untuk mendapatkan jawaban dari pola tanda silang pada lembar jawaban
+# Pola hanya berlaku untuk formulir tempat pola direkam (pola_tersedia); skema lain mendapat semua "-"
+def get_jawaban_dari_pola(skema=None):
+    skema = skema or SKEMA_DEFAULT
+    if not pola_tersedia(skema):
+        return ["-"] * skema.jumlah_soal
+
+    # Pola jawaban dari gambar yang diberikan (berdasarkan tanda silang)
+    # Format: nomor soal -> pilihan jawaban (A=0, B=1, C=2, D=3)
+    pola_jawaban = {
+        1: 2,   # 1C
+        2: 0,   # 2A
+        3: 0,   # 3A
+        4: 3,   # 4D
+        5: 0,   # 5A
+        6: 1,   # 6B
+        7: 0,   # 7A
+        8: 1,   # 8B
+        9: 3,   # 9D
+        10: 0,  # 10A
+        11: 2,  # 11C
+        12: 0,  # 12A
+        13: 0,  # 13A
+        14: 3,  # 14D
+        15: 1,  # 15B
+        16: 2,  # 16C
+        17: 3,  # 17D
+        18: 0,  # 18A
+        19: 1,  # 19B
+        20: 2,  # 20C
+        21: 1,  # 21B
+        22: 3,  # 22D
+        23: 2,  # 23C
+        24: 0,  # 24A
+        25: 3,  # 25D
+        26: 2,  # 26C
+        27: 2,  # 27C
+        28: 2,  # 28C
+        29: 1,  # 29B
+        30: 3,  # 30D
+        31: 1,  # 31B
+        32: 3,  # 32D
+        33: 0,  # 33A
+        34: 1,  # 34B
+        35: 2,  # 35C
+        36: 1,  # 36B
+        37: 1,  # 37B
+        38: 3,  # 38D
+        39: 0,  # 39A
+        40: 1,  # 40B
+    }
+    
+    # Konversi indeks pilihan ke huruf A, B, C, D
+    pilihan_to_huruf = {0: "A", 1: "B", 2: "C", 3: "D"}
+    
+    # Buat array jawaban
+    jawaban = ["-"] * skema.jumlah_soal
+    for nomor, pilihan_idx in pola_jawaban.items():
+        if skema.nomor_valid(nomor):
+            jawaban[nomor-1] = pilihan_to_huruf[pilihan_idx]
+    
+    return jawaban
+
+# Fungsi untuk mendapatkan jawaban berdasarkan huruf yang tidak muncul
+# soal (opsional) membatasi nomor soal yang diproses, misalnya hanya soal yang belum terjawab
+# skema (opsional) menentukan jumlah soal dan pilihan jawaban (default SKEMA_DEFAULT)
+def get_jawaban_dari_huruf_tidak_muncul(result, indeks_tabel=None, geometri=None, soal=None, skema=None):
+    print("\nMenggunakan metode deteksi jawaban berdasarkan huruf yang tidak muncul...")
+    
+    if indeks_tabel is None:
+        indeks_tabel = buat_indeks_tabel(result)
+    skema = skema or SKEMA_DEFAULT
+    jumlah_pilihan = skema.jumlah_pilihan
+    
+    # Inisialisasi array kode jawaban (0 = tidak terdeteksi)
+    jawaban_kode = np.zeros(skema.jumlah_soal, dtype=np.uint8)
+    soal_diproses = set(range(1, skema.jumlah_soal + 1)) if soal is None else set(soal)
+    
+    # Struktur data untuk menyimpan huruf yang terdeteksi untuk setiap soal
+    # Format: nomor_soal -> bitmask huruf yang terdeteksi
+    huruf_terdeteksi = {}
+    # Ambang jumlah sel/soal: seperempat jumlah soal (10 untuk 40 soal)
+    minimal_soal = max(skema.jumlah_soal // 4, 1)
+    
+    # Ekstrak teks dari semua sel dalam tabel jawaban
+    for indeks in indeks_tabel:
+        # Cari tabel yang kemungkinan berisi jawaban (biasanya memiliki banyak sel dengan huruf A, B, C, D)
+        sel_dengan_pilihan = indeks.jumlah_sel_dengan_konten(skema.pilihan)
+        
+        # Jika tabel ini memiliki banyak sel dengan pilihan jawaban, proses lebih lanjut
+        if sel_dengan_pilihan > minimal_soal:  # Ambang batas minimal sel dengan pilihan jawaban
+            # Penomoran di bawah hanya berlaku untuk tabel vertikal: sebagian besar huruf berada di baris
+            # row % jumlah_pilihan == kode - 1. Tabel horizontal atau grid dilewati agar tidak memberi jawaban salah
+            if not indeks.tampak_vertikal(skema):
+                print(f"Tabel dengan {sel_dengan_pilihan} sel pilihan jawaban bukan tabel vertikal, dilewati")
+                continue
+            sel_pilihan = indeks.sel_dengan_konten(skema.himpunan_pilihan)
+            print(f"Memproses tabel dengan {sel_dengan_pilihan} sel pilihan jawaban")
+            
+            # Identifikasi struktur tabel jawaban
+            # Asumsikan setiap jumlah_pilihan baris berurutan mewakili pilihan (A, B, C, D) untuk satu soal
+            # Hanya sel yang berisi pilihan jawaban
+            for cell, content in sel_pilihan:
+                row_idx = cell.row_index
+                col_idx = cell.column_index
+                
+                # Tentukan nomor soal berdasarkan posisi sel
+                # Asumsikan struktur: setiap jumlah_pilihan baris berisi 1 soal, dan ada beberapa soal per kolom
+                nomor_soal = indeks.nomor_soal_vertikal(row_idx, col_idx, jumlah_pilihan)
+                
+                # Pastikan nomor soal valid
+                if skema.nomor_valid(nomor_soal) and nomor_soal in soal_diproses:
+                    # Tambahkan huruf yang terdeteksi ke bitmask soal
+                    huruf_terdeteksi[nomor_soal] = huruf_terdeteksi.get(nomor_soal, 0) | skema.bit(content)
+    
+    # Jika tidak berhasil mengidentifikasi struktur tabel, coba pendekatan alternatif
+    # dengan mencari pola dari teks yang terdeteksi
+    if not huruf_terdeteksi or len(huruf_terdeteksi) < minimal_soal:  # Jika terlalu sedikit soal terdeteksi
+        print("Mencoba pendekatan alternatif dengan analisis teks...")
+        
+        # Kumpulkan semua teks yang terdeteksi
+        if geometri is not None:
+            all_texts = [line.konten for line in geometri.garis]
+        else:
+            all_texts = []
+            for page in result.pages:
+                for line in page.lines:
+                    all_texts.append(line.content.strip().upper())
+        
+        # Cari pola nomor soal dan pilihan jawaban
+        for text in all_texts:
+            # Cari pola seperti "1. A B C D" atau "1) A B C D"
+            # Implementasi parsing teks sederhana di sini
+            pass
+    
+    # Tentukan jawaban berdasarkan huruf yang tidak muncul
+    for nomor_soal in sorted(soal_diproses):
+        if nomor_soal in huruf_terdeteksi:
+            # Temukan huruf yang tidak muncul lewat tabel lookup bitmask
+            huruf_muncul = huruf_terdeteksi[nomor_soal]
+            kode = skema.kode_hilang(huruf_muncul)
+            
+            # Jika hanya ada satu huruf yang tidak muncul, itu adalah jawaban siswa
+            # Sesuai dengan aturan: jika BCD muncul, jawaban adalah A
+            # Jika ACD muncul, jawaban adalah B, dst.
+            if kode:
+                jawaban_kode[nomor_soal-1] = kode
+                print(f"Soal {nomor_soal}: Huruf yang muncul {skema.huruf_dari_mask(huruf_muncul)}, jawaban siswa adalah {skema.huruf(kode)}")
+            else:
+                # Jika ada lebih dari satu huruf yang tidak muncul, gunakan logika tambahan
+                huruf_tidak_muncul = skema.huruf_dari_mask(skema.mask_penuh & ~huruf_muncul)
+                print(f"Soal {nomor_soal}: Ditemukan {skema.jumlah_hilang(huruf_muncul)} huruf yang tidak muncul: {huruf_tidak_muncul}")
+    
+    return skema.dari_kode(jawaban_kode)
+
+# Fungsi untuk mengidentifikasi jawaban berdasarkan baris
+# soal (opsional) membatasi nomor soal yang diproses, misalnya hanya soal yang belum terjawab
+# skema (opsional) menentukan jumlah soal dan pilihan jawaban (default SKEMA_DEFAULT)
+def get_jawaban_dari_baris(result, indeks_tabel=None, geometri=None, soal=None, skema=None):
+    print("\nMenggunakan metode deteksi jawaban berdasarkan baris...")
+    
+    if indeks_tabel is None:
+        indeks_tabel = buat_indeks_tabel(result)
+    if geometri is None:
+        geometri = SheetGeometry(result, indeks_tabel)
+    skema = skema or SKEMA_DEFAULT
+    jumlah_pilihan = skema.jumlah_pilihan
+    
+    # Inisialisasi array kode jawaban (0 = tidak terdeteksi)
+    jawaban_kode = np.zeros(skema.jumlah_soal, dtype=np.uint8)
+    soal_diproses = set(range(1, skema.jumlah_soal + 1)) if soal is None else set(soal)
+    
+    # Struktur data untuk menyimpan huruf yang terdeteksi untuk setiap soal
+    # Format: nomor_soal -> {baris -> huruf}
+    huruf_per_baris = {}
+    
+    # Ekstrak teks dari semua sel dalam tabel jawaban; seperti detektor huruf yang tidak muncul, hanya
+    # tabel vertikal yang diproses
+    for indeks in indeks_tabel:
+        if not indeks.tampak_vertikal(skema):
+            continue
+        # Identifikasi struktur tabel jawaban
+        # Asumsikan setiap jumlah_pilihan baris berurutan mewakili pilihan (A, B, C, D) untuk satu soal
+        for cell, content in indeks.sel_dengan_konten(skema.himpunan_pilihan):
+            row_idx = cell.row_index
+            col_idx = cell.column_index
+            
+            # Tentukan nomor soal berdasarkan posisi sel
+            # Asumsikan struktur: setiap jumlah_pilihan baris berisi 1 soal, dan ada beberapa soal per kolom
+            # (soal berurutan ke bawah lalu pindah kolom, sama dengan detektor huruf yang tidak muncul)
+            nomor_soal = indeks.nomor_soal_vertikal(row_idx, col_idx, jumlah_pilihan)
+            baris_dalam_soal = row_idx % jumlah_pilihan  # 0 untuk A, 1 untuk B, 2 untuk C, dst.
+            
+            # Pastikan nomor soal valid
+            if skema.nomor_valid(nomor_soal) and nomor_soal in soal_diproses:
+                # Inisialisasi jika belum ada
+                if nomor_soal not in huruf_per_baris:
+                    huruf_per_baris[nomor_soal] = {}
+                
+                # Simpan huruf untuk baris ini
+                huruf_per_baris[nomor_soal][baris_dalam_soal] = content
+    
+    # Bangun indeks spasial untuk sel pilihan jawaban sekali saja untuk seluruh hasil analisis,
+    # sehingga setiap tanda silang hanya dicocokkan dengan sel-sel di sekitarnya. Sel soal yang tidak
+    # diminta tetap masuk indeks, agar sel yang memuat sebuah tanda tidak bergantung pada soal yang diminta
+    sel_pilihan = []
+    for table_idx, indeks in enumerate(indeks_tabel):
+        if not indeks.tampak_vertikal(skema):
+            continue
+        for i in geometri.indeks_sel_tabel(table_idx):
+            sel = geometri.sel[i]
+            if sel.konten not in skema.himpunan_pilihan:
+                continue
+            
+            # Tentukan nomor soal berdasarkan posisi sel
+            nomor_soal = indeks.nomor_soal_vertikal(sel.baris, sel.kolom, jumlah_pilihan)
+            baris_dalam_soal = sel.baris % jumlah_pilihan  # 0 untuk A, 1 untuk B, 2 untuk C, dst.
+            if skema.nomor_valid(nomor_soal):
+                sel_pilihan.append((i, table_idx, nomor_soal, baris_dalam_soal, sel.konten))
+    
+    # Lewati sel tanpa polygon yang valid, lalu tambahkan margin 15% untuk meningkatkan akurasi deteksi
+    kotak_sel = geometri.kotak_sel[[i for i, *_ in sel_pilihan]].reshape(-1, 4)
+    valid = ~np.isnan(kotak_sel).any(axis=1)
+    sel_pilihan = [info[1:] for info, ok in zip(sel_pilihan, valid) if ok]
+    indeks_sel = GridSpasial(perluas_kotak_array(kotak_sel[valid], 0.15).tolist())
+    
+    # Untuk setiap soal, identifikasi baris yang memiliki tanda silang
+    for i, mark in enumerate(geometri.tanda):
+        if mark.state == "selected" or mark.confidence > 0.5:
+            # Tentukan posisi tanda silang
+            mark_x, mark_y = geometri.pusat_tanda[i].tolist()
+            if np.isnan(mark_x):
+                continue
+            
+            # Cari sel yang memuat tanda silang; cukup sel pertama untuk setiap tabel
+            tabel_tertandai = set()
+            for idx in indeks_sel.query_titik(mark_x, mark_y):
+                table_idx, nomor_soal, baris_dalam_soal, content = sel_pilihan[idx]
+                if table_idx in tabel_tertandai:
+                    continue
+                tabel_tertandai.add(table_idx)
+                if nomor_soal not in soal_diproses:
+                    continue
+                
+                # Inisialisasi jika belum ada
+                if nomor_soal not in huruf_per_baris:
+                    huruf_per_baris[nomor_soal] = {}
+                
+                # Tandai bahwa baris ini memiliki tanda silang
+                huruf_per_baris[nomor_soal][baris_dalam_soal] = "X"
+                
+                print(f"Tanda silang terdeteksi pada soal {nomor_soal}, baris {baris_dalam_soal+1} (pilihan {content})")
+
+    hitung("uji_sel", indeks_sel.jumlah_uji)
+
+    # Tentukan jawaban berdasarkan pola huruf yang terdeteksi di setiap baris
+    for nomor_soal in sorted(soal_diproses):
+        if nomor_soal in huruf_per_baris:
+            # Dapatkan huruf yang terdeteksi di setiap baris
+            huruf_baris = huruf_per_baris[nomor_soal]
+            
+            # Jika ada tanda silang (X) di salah satu baris
+            if "X" in huruf_baris.values():
+                # Temukan baris yang memiliki tanda silang
+                for baris, nilai in huruf_baris.items():
+                    if nilai == "X":
+                        # Tentukan jawaban berdasarkan baris yang memiliki tanda silang
+                        # Baris 0 = A, 1 = B, 2 = C, 3 = D, dst. (kode = baris + 1)
+                        jawaban_kode[nomor_soal-1] = baris + 1
+                        print(f"Soal {nomor_soal}: Tanda silang pada baris {baris+1}, jawaban siswa adalah {skema.pilihan[baris]}")
+                        break
+            else:
+                # Jika tidak ada tanda silang, gunakan metode huruf yang tidak muncul
+                # Jika BCD muncul, jawaban adalah A
+                # Jika ACD muncul, jawaban adalah B
+                # Jika ABD muncul, jawaban adalah C
+                # Jika ABC muncul, jawaban adalah D
+                huruf_muncul = 0
+                for huruf in huruf_baris.values():
+                    huruf_muncul |= skema.bit(huruf)
+                
+                # Hanya satu huruf yang tidak muncul (semua huruf lain terdeteksi)
+                kode = skema.kode_hilang(huruf_muncul)
+                if kode:
+                    jawaban_kode[nomor_soal-1] = kode
+                    print(f"Soal {nomor_soal}: Huruf yang muncul {skema.huruf_dari_mask(huruf_muncul)}, jawaban siswa adalah {skema.huruf(kode)}")
+    
+    return skema.dari_kode(jawaban_kode)
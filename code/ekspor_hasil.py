@@ -0,0 +1,210 @@
+"""
+Ekspor hasil penilaian per lembar ke CSV atau Parquet secara streaming.
+
+Setiap lembar yang selesai dinilai menjadi satu baris: id lembar, skor, jumlah soal, jumlah benar/salah/
+tidak terdeteksi, lalu per soal jawaban (jawaban_1..Q), metode deteksi terpilih (metode_1..Q), dan skor
+kepercayaan (kepercayaan_1..Q). Kolom per soal ditentukan dari lembar pertama.
+
+Baris ditampung di buffer berukuran tetap dan ditulis per batch (CSV: writerows lalu flush; Parquet: satu
+row group per batch), sehingga batch 100 ribu lembar tidak pernah menyimpan semua hasil di memori.
+CSV ditambahkan ke file yang sudah ada (header hanya ditulis untuk file kosong; header file yang sudah
+ada harus sama, misalnya jumlah soal yang sama); Parquet selalu menulis file baru. Parquet membutuhkan pyarrow.
+"""
+
+import abc
+import csv
+import os
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow hanya dibutuhkan untuk ekspor Parquet
+    pa = None
+    pq = None
+
+UKURAN_BUFFER_CSV = 1000
+UKURAN_BATCH_PARQUET = 10000
+
+KOLOM_RINGKASAN = ("lembar", "skor", "jumlah_soal", "benar", "salah", "tidak_terdeteksi")
+
+
+def kolom_hasil(jumlah_soal):
+    """Nama kolom untuk hasil dengan jumlah_soal soal."""
+    kolom = list(KOLOM_RINGKASAN)
+    for awalan in ("jawaban", "metode", "kepercayaan"):
+        kolom.extend(f"{awalan}_{nomor}" for nomor in range(1, jumlah_soal + 1))
+    return kolom
+
+
+def baris_hasil(lembar, hasil, jumlah_soal):
+    """Ubah dict hasil nilai_lembar menjadi satu baris (list) sesuai kolom_hasil(jumlah_soal)."""
+    jawaban = list(hasil.get("jawaban") or [])[:jumlah_soal]
+    jawaban += ["-"] * (jumlah_soal - len(jawaban))
+    metode = list(hasil.get("metode") or [])[:jumlah_soal]
+    metode += ["-"] * (jumlah_soal - len(metode))
+    kepercayaan = [round(float(skor), 4) for skor in (hasil.get("kepercayaan") or [])[:jumlah_soal]]
+    kepercayaan += [0.0] * (jumlah_soal - len(kepercayaan))
+
+    return [
+        str(lembar),
+        hasil.get("skor", 0),
+        hasil.get("jumlah_soal", jumlah_soal),
+        len(hasil.get("benar", ())),
+        len(hasil.get("salah", ())),
+        len(hasil.get("tidak_terdeteksi", ())),
+        *jawaban,
+        *metode,
+        *kepercayaan,
+    ]
+
+
+class PenulisHasil(abc.ABC):
+    """
+    Dasar penulis hasil: menampung baris sampai ukuran_buffer lalu menuliskannya sekaligus.
+    Aman dipakai bersama beberapa thread worker. Pakai sebagai context manager atau panggil tutup().
+    """
+
+    def __init__(self, path, ukuran_buffer):
+        self.path = path
+        self.ukuran_buffer = ukuran_buffer
+        self.jumlah_soal = None
+        self.jumlah_baris = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def tulis(self, lembar, hasil):
+        """
+        Tambahkan hasil satu lembar; ditulis ke file saat buffer penuh. Kolom per soal ditentukan lembar
+        pertama; lembar dengan jumlah soal lain ditolak dengan ValueError, bukan dipotong atau diisi.
+        """
+        jumlah_soal = hasil.get("jumlah_soal") or len(hasil.get("jawaban") or [])
+        with self._lock:
+            if self.jumlah_soal is None:
+                # jumlah_soal baru diisi setelah _mulai berhasil, agar lembar berikutnya mencoba lagi
+                self._mulai(kolom_hasil(jumlah_soal))
+                self.jumlah_soal = jumlah_soal
+            elif jumlah_soal != self.jumlah_soal:
+                raise ValueError(
+                    f"Lembar {lembar} berisi {jumlah_soal} soal, {self.path} berisi {self.jumlah_soal} soal; "
+                    f"pakai file ekspor terpisah per ujian"
+                )
+            self._buffer.append(baris_hasil(lembar, hasil, self.jumlah_soal))
+            self.jumlah_baris += 1
+            if len(self._buffer) >= self.ukuran_buffer:
+                self._tulis_buffer()
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self._tulis_buffer()
+
+    def tutup(self):
+        with self._lock:
+            if self._buffer:
+                self._tulis_buffer()
+            self._selesai()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+    @abc.abstractmethod
+    def _mulai(self, kolom):
+        """Buka file tujuan untuk baris dengan kolom ini (dipanggil sekali, saat hasil pertama ditulis)."""
+
+    @abc.abstractmethod
+    def _tulis_buffer(self):
+        """Tulis semua baris di self._buffer lalu kosongkan buffer."""
+
+    @abc.abstractmethod
+    def _selesai(self):
+        """Tutup file tujuan."""
+
+
+class PenulisCSV(PenulisHasil):
+    """
+    Tambahkan hasil ke file CSV; header ditulis jika file belum ada atau masih kosong. File yang sudah
+    berisi harus memiliki header yang sama, agar kolom per soal tidak bergeser.
+    """
+
+    def __init__(self, path, ukuran_buffer=UKURAN_BUFFER_CSV):
+        super().__init__(path, ukuran_buffer)
+        self._file = None
+        self._writer = None
+
+    def _mulai(self, kolom):
+        tulis_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not tulis_header:
+            with open(self.path, "r", encoding="utf-8", newline="") as f:
+                header = next(csv.reader(f), [])
+            if header != kolom:
+                raise ValueError(
+                    f"Header {self.path} ({len(header)} kolom) berbeda dengan hasil yang ditulis "
+                    f"({len(kolom)} kolom); pakai file CSV lain"
+                )
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        if tulis_header:
+            self._writer.writerow(kolom)
+
+    def _tulis_buffer(self):
+        self._writer.writerows(self._buffer)
+        self._file.flush()
+        self._buffer = []
+
+    def _selesai(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PenulisParquet(PenulisHasil):
+    """Tulis hasil ke file Parquet baru, satu row group per batch."""
+
+    def __init__(self, path, ukuran_buffer=UKURAN_BATCH_PARQUET):
+        if pa is None:
+            raise RuntimeError("Ekspor Parquet membutuhkan pyarrow: pip install pyarrow")
+        super().__init__(path, ukuran_buffer)
+        self._skema = None
+        self._writer = None
+
+    def _mulai(self, kolom):
+        tipe = {"lembar": pa.string(), "skor": pa.int32(), "jumlah_soal": pa.int32(), "benar": pa.int32(),
+                "salah": pa.int32(), "tidak_terdeteksi": pa.int32()}
+        fields = []
+        for nama in kolom:
+            if nama in tipe:
+                fields.append(pa.field(nama, tipe[nama]))
+            elif nama.startswith("kepercayaan_"):
+                fields.append(pa.field(nama, pa.float32()))
+            else:
+                # Jawaban dan metode berulang dengan sedikit nilai berbeda: simpan sebagai dictionary
+                fields.append(pa.field(nama, pa.dictionary(pa.int32(), pa.string())))
+        self._skema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(self.path, self._skema, compression="zstd")
+
+    def _tulis_buffer(self):
+        kolom_data = list(zip(*self._buffer))
+        arrays = []
+        for field, data in zip(self._skema, kolom_data):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(data, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(data, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._skema))
+        self._buffer = []
+
+    def _selesai(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def buka_penulis_hasil(path, ukuran_buffer=None):
+    """Buat PenulisParquet untuk path berakhiran .parquet, selain itu PenulisCSV."""
+    if path.lower().endswith(".parquet"):
+        return PenulisParquet(path, ukuran_buffer or UKURAN_BATCH_PARQUET)
+    return PenulisCSV(path, ukuran_buffer or UKURAN_BUFFER_CSV)
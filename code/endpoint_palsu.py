@@ -0,0 +1,197 @@
+"""
+Endpoint Document Intelligence palsu untuk menguji alur analisis tanpa Azure.
+
+Meniru dua endpoint yang dipakai SDK:
+  POST /documentintelligence/documentModels/<model>:analyze   -> 202 + Operation-Location
+  GET  /documentintelligence/documentModels/<model>/analyzeResults/<id>
+                                                              -> {"status": "running"} atau "succeeded"
+Throttling disimulasikan dengan token bucket per detik untuk POST (dan opsional GET): permintaan yang
+melebihi kuota mendapat 429 dengan header Retry-After. Lama analisis bertambah dengan jumlah operasi
+yang sedang berjalan (latensi_dasar * (1 + aktif / kapasitas)), sehingga pengatur konkurensi dapat
+melihat layanan melambat saat dibebani.
+
+Hasil analisis diambil dari file JSON (`AnalyzeResult.as_dict()`, misalnya dari cache analisis) atau
+hasil kosong satu halaman jika tidak diberikan.
+
+Contoh:
+    python endpoint_palsu.py --port 8765 --rps 5 --latensi 1.5 --kapasitas 8
+    AZURE_ENDPOINT=http://127.0.0.1:8765 AZURE_KEY=palsu python analisis_async.py lembar/*.jpg
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HASIL_KOSONG = {
+    "apiVersion": "2024-11-30",
+    "modelId": "prebuilt-layout",
+    "content": "",
+    "pages": [{"pageNumber": 1, "width": 1000, "height": 1400, "unit": "pixel", "spans": [],
+               "words": [], "lines": [], "selectionMarks": []}],
+    "tables": [],
+}
+
+
+class EmberToken:
+    """Token bucket: kapasitas rps token, diisi ulang rps token per detik."""
+
+    def __init__(self, rps):
+        self.rps = rps
+        self.token = float(rps)
+        self.waktu = time.monotonic()
+        self._lock = threading.Lock()
+
+    def ambil(self):
+        """Ambil satu token. Kembalikan 0 jika berhasil, atau detik sampai token berikutnya tersedia."""
+        with self._lock:
+            sekarang = time.monotonic()
+            self.token = min(float(self.rps), self.token + (sekarang - self.waktu) * self.rps)
+            self.waktu = sekarang
+            if self.token >= 1:
+                self.token -= 1
+                return 0.0
+            return (1 - self.token) / self.rps
+
+
+class EndpointPalsu:
+    """Status operasi analisis dan statistik permintaan untuk satu server palsu."""
+
+    def __init__(self, rps=5.0, rps_polling=None, latensi_dasar=1.0, kapasitas=8, hasil=None):
+        self.ember_analisis = EmberToken(rps) if rps else None
+        self.ember_polling = EmberToken(rps_polling) if rps_polling else None
+        self.latensi_dasar = latensi_dasar
+        self.kapasitas = kapasitas
+        self.hasil = hasil or HASIL_KOSONG
+        # id operasi -> waktu selesai (monotonic)
+        self.operasi = {}
+        self.statistik = {"analisis": 0, "polling": 0, "throttle": 0, "selesai": 0}
+        self._lock = threading.Lock()
+
+    def jumlah_aktif(self):
+        sekarang = time.monotonic()
+        return sum(1 for selesai in self.operasi.values() if selesai > sekarang)
+
+    def mulai_operasi(self):
+        with self._lock:
+            latensi = self.latensi_dasar * (1 + self.jumlah_aktif() / self.kapasitas)
+            id_operasi = uuid.uuid4().hex
+            self.operasi[id_operasi] = time.monotonic() + latensi
+            self.statistik["analisis"] += 1
+        return id_operasi
+
+    def status_operasi(self, id_operasi):
+        """"running", "succeeded", atau None jika id tidak dikenal."""
+        with self._lock:
+            self.statistik["polling"] += 1
+            selesai = self.operasi.get(id_operasi)
+            if selesai is None:
+                return None
+            if time.monotonic() < selesai:
+                return "running"
+            self.statistik["selesai"] += 1
+            return "succeeded"
+
+
+class PenanganPalsu(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _kirim(self, kode, data=None, header=None):
+        body = json.dumps(data).encode("utf-8") if data is not None else b""
+        self.send_response(kode)
+        for nama, nilai in (header or {}).items():
+            self.send_header(nama, nilai)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttle(self, ember):
+        if ember is None:
+            return False
+        tunggu = ember.ambil()
+        if not tunggu:
+            return False
+        with self.server.palsu._lock:
+            self.server.palsu.statistik["throttle"] += 1
+        self._kirim(429, {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+                    {"Retry-After": str(max(1, round(tunggu)))})
+        return True
+
+    def do_POST(self):
+        panjang = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(panjang)
+        jalur, _, query = self.path.partition("?")
+        if not jalur.endswith(":analyze"):
+            self._kirim(404, {"error": {"code": "NotFound", "message": jalur}})
+            return
+        palsu = self.server.palsu
+        if self._throttle(palsu.ember_analisis):
+            return
+
+        id_operasi = palsu.mulai_operasi()
+        lokasi = f"http://{self.headers.get('Host')}{jalur[:-len(':analyze')]}/analyzeResults/{id_operasi}?{query}"
+        self._kirim(202, header={"Operation-Location": lokasi, "apim-request-id": id_operasi})
+
+    def do_GET(self):
+        jalur = self.path.partition("?")[0]
+        bagian = jalur.split("/")
+        palsu = self.server.palsu
+        if len(bagian) < 2 or bagian[-2] != "analyzeResults":
+            self._kirim(404, {"error": {"code": "NotFound", "message": jalur}})
+            return
+        if self._throttle(palsu.ember_polling):
+            return
+
+        status = palsu.status_operasi(bagian[-1])
+        if status is None:
+            self._kirim(404, {"error": {"code": "NotFound", "message": "operasi tidak ditemukan"}})
+        elif status == "running":
+            self._kirim(200, {"status": "running"})
+        else:
+            self._kirim(200, {"status": "succeeded", "analyzeResult": palsu.hasil})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def buat_server_palsu(host="127.0.0.1", port=0, **opsi):
+    """Buat ThreadingHTTPServer endpoint palsu; port 0 memilih port bebas (lihat server.server_port)."""
+    server = ThreadingHTTPServer((host, port), PenanganPalsu)
+    server.daemon_threads = True
+    server.palsu = EndpointPalsu(**opsi)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint Document Intelligence palsu dengan simulasi throttling")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rps", type=float, default=5.0, help="kuota analisis per detik (0 = tanpa batas)")
+    parser.add_argument("--rps-polling", type=float, default=0, help="kuota polling per detik (0 = tanpa batas)")
+    parser.add_argument("--latensi", type=float, default=1.0, help="lama analisis tanpa beban (detik)")
+    parser.add_argument("--kapasitas", type=int, default=8, help="operasi berjalan sebelum latensi berlipat dua")
+    parser.add_argument("--hasil", help="file JSON AnalyzeResult yang dikembalikan untuk setiap analisis")
+    args = parser.parse_args()
+
+    hasil = None
+    if args.hasil:
+        with open(args.hasil, "r", encoding="utf-8") as f:
+            hasil = json.load(f)
+
+    server = buat_server_palsu(args.host, args.port, rps=args.rps, rps_polling=args.rps_polling,
+                               latensi_dasar=args.latensi, kapasitas=args.kapasitas, hasil=hasil)
+    print(f"Endpoint palsu berjalan di http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.palsu.statistik))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Lapisan geometri lembar jawaban berbasis NumPy.
+
+`SheetGeometry` dibangun sekali per `AnalyzeResult` dan menyimpan titik pusat serta kotak batas
+(min_x, min_y, max_x, max_y) untuk garis teks, selection mark, dan sel tabel dalam array NumPy.
+Metadata (konten, halaman, posisi sel, dll.) disimpan dalam record kecil ber-`__slots__`.
+Entri dengan polygon yang tidak valid memiliki pusat/kotak bernilai NaN.
+"""
+
+import numpy as np
+
+from indeks_tabel import buat_indeks_tabel
+
+
+def titik_polygon(polygon):
+    """
+    Ubah polygon menjadi array titik berukuran (k, 2).
+    Mendukung titik dengan atribut x/y, format list [x, y], maupun list datar
+    [x1, y1, x2, y2, ...] (format SDK Document Intelligence 1.x). Kembalikan None jika tidak valid.
+    """
+    if not polygon:
+        return None
+    try:
+        if hasattr(polygon[0], 'x') and hasattr(polygon[0], 'y'):
+            titik = np.array([(point.x, point.y) for point in polygon], dtype=float)
+        elif isinstance(polygon[0], (list, tuple)):
+            titik = np.array([(point[0], point[1]) for point in polygon], dtype=float)
+        elif isinstance(polygon[0], (int, float)) and len(polygon) % 2 == 0:
+            titik = np.asarray(polygon, dtype=float).reshape(-1, 2)
+        else:
+            return None
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+    return titik
+
+
+def ringkas_polygon(daftar_titik):
+    """
+    Hitung pusat (n, 2) dan kotak batas (n, 4) untuk daftar array titik sekaligus.
+    Semua titik digabung menjadi satu array lalu direduksi per polygon dengan `reduceat`.
+    """
+    n = len(daftar_titik)
+    pusat = np.full((n, 2), np.nan)
+    kotak = np.full((n, 4), np.nan)
+
+    valid = [i for i, titik in enumerate(daftar_titik) if titik is not None and len(titik)]
+    if valid:
+        semua = np.concatenate([daftar_titik[i] for i in valid])
+        jumlah = np.array([len(daftar_titik[i]) for i in valid])
+        awal = np.concatenate(([0], np.cumsum(jumlah)[:-1]))
+        pusat[valid] = np.add.reduceat(semua, awal, axis=0) / jumlah[:, None]
+        kotak[valid, 0:2] = np.minimum.reduceat(semua, awal, axis=0)
+        kotak[valid, 2:4] = np.maximum.reduceat(semua, awal, axis=0)
+
+    return pusat, kotak
+
+
+def perluas_kotak_array(kotak, rasio_margin):
+    """Perluas setiap kotak (n, 4) dengan margin sebesar rasio dari lebar dan tingginya."""
+    margin = np.empty_like(kotak)
+    margin[:, 0] = margin[:, 2] = (kotak[:, 2] - kotak[:, 0]) * rasio_margin
+    margin[:, 1] = margin[:, 3] = (kotak[:, 3] - kotak[:, 1]) * rasio_margin
+    return kotak + margin * np.array([-1.0, -1.0, 1.0, 1.0])
+
+
+class RekamanGaris:
+    """Metadata satu garis teks."""
+
+    __slots__ = ("halaman", "konten")
+
+    def __init__(self, halaman, konten):
+        self.halaman = halaman
+        self.konten = konten
+
+
+class RekamanSelectionMark:
+    """Metadata satu selection mark dari API."""
+
+    __slots__ = ("halaman", "state", "confidence")
+
+    def __init__(self, halaman, state, confidence):
+        self.halaman = halaman
+        self.state = state
+        self.confidence = confidence
+
+
+class RekamanSel:
+    """Metadata satu sel tabel; konten sudah dinormalisasi oleh IndeksTabel."""
+
+    __slots__ = ("tabel", "baris", "kolom", "konten", "cell")
+
+    def __init__(self, tabel, baris, kolom, konten, cell):
+        self.tabel = tabel
+        self.baris = baris
+        self.kolom = kolom
+        self.konten = konten
+        self.cell = cell
+
+
+class SheetGeometry:
+    """
+    Geometri satu hasil analisis yang dipakai bersama oleh semua detektor.
+
+    Atribut array:
+      pusat_garis, kotak_garis     -> garis teks (urut per halaman, lalu per garis)
+      pusat_tanda, kotak_tanda     -> selection mark dari API
+      pusat_sel, kotak_sel         -> sel tabel (urut per tabel, lalu sesuai IndeksTabel.sel)
+    rentang_garis / rentang_tanda berisi (page_number, awal, akhir) untuk setiap halaman,
+    dan awal_tabel[t] adalah indeks sel pertama milik tabel ke-t.
+    """
+
+    def __init__(self, result, indeks_tabel=None):
+        if indeks_tabel is None:
+            indeks_tabel = buat_indeks_tabel(result)
+        self.indeks_tabel = indeks_tabel
+
+        # Garis teks dan selection mark per halaman
+        self.garis = []
+        self.titik_garis = []
+        self.rentang_garis = []
+        self.tanda = []
+        titik_tanda = []
+        self.rentang_tanda = []
+        for page in result.pages:
+            awal = len(self.garis)
+            for line in page.lines or []:
+                self.garis.append(RekamanGaris(page.page_number, line.content.strip().upper()))
+                if getattr(line, 'bounding_regions', None):
+                    polygon = line.bounding_regions[0].polygon
+                else:
+                    polygon = getattr(line, 'polygon', None)
+                self.titik_garis.append(titik_polygon(polygon))
+            self.rentang_garis.append((page.page_number, awal, len(self.garis)))
+
+            awal = len(self.tanda)
+            for mark in getattr(page, 'selection_marks', None) or []:
+                self.tanda.append(RekamanSelectionMark(page.page_number, mark.state, mark.confidence))
+                titik_tanda.append(titik_polygon(mark.polygon))
+            self.rentang_tanda.append((page.page_number, awal, len(self.tanda)))
+
+        self.pusat_garis, self.kotak_garis = ringkas_polygon(self.titik_garis)
+        self.pusat_tanda, self.kotak_tanda = ringkas_polygon(titik_tanda)
+
+        # Sel tabel, memakai konten yang sudah dinormalisasi di IndeksTabel
+        self.sel = []
+        titik_sel = []
+        self.awal_tabel = []
+        for tabel_idx, indeks in enumerate(indeks_tabel):
+            self.awal_tabel.append(len(self.sel))
+            for cell, content in indeks.sel:
+                self.sel.append(RekamanSel(tabel_idx, cell.row_index, cell.column_index, content, cell))
+                if cell.bounding_regions:
+                    titik_sel.append(titik_polygon(cell.bounding_regions[0].polygon))
+                else:
+                    titik_sel.append(None)
+        self.awal_tabel.append(len(self.sel))
+
+        self.pusat_sel, self.kotak_sel = ringkas_polygon(titik_sel)
+
+    def indeks_sel_tabel(self, tabel_idx):
+        """Rentang indeks global sel milik tabel ke-tabel_idx."""
+        return range(self.awal_tabel[tabel_idx], self.awal_tabel[tabel_idx + 1])
+
+    def kotak_sel_tuple(self, indeks):
+        """Kotak sel sebagai tuple (min_x, min_y, max_x, max_y), atau None jika polygon tidak valid."""
+        kotak = self.kotak_sel[indeks]
+        if np.isnan(kotak).any():
+            return None
+        return tuple(float(v) for v in kotak)
+
+
+class RekamanTanda:
+    """Metadata satu kandidat tanda silang dari salah satu sumber deteksi."""
+
+    __slots__ = ("halaman", "confidence", "state", "sumber", "konten")
+
+    def __init__(self, halaman, confidence, state, sumber, konten=None):
+        self.halaman = halaman
+        self.confidence = confidence
+        self.state = state
+        self.sumber = sumber
+        self.konten = konten
+
+
+class KumpulanTanda:
+    """
+    Kumpulan kandidat tanda silang dari semua sumber (selection_mark, text, intersecting_lines).
+    Metadata disimpan sebagai list RekamanTanda, titik pusat sebagai array (m, 2).
+    """
+
+    def __init__(self):
+        self.tanda = []
+        self._pusat = []
+        self._pusat_array = None
+
+    def tambah(self, pusat, halaman, confidence, state, sumber, konten=None):
+        self.tanda.append(RekamanTanda(halaman, confidence, state, sumber, konten))
+        self._pusat.append(pusat)
+        self._pusat_array = None
+
+    @property
+    def pusat(self):
+        if self._pusat_array is None:
+            self._pusat_array = np.array(self._pusat, dtype=float).reshape(-1, 2)
+        return self._pusat_array
+
+    def __len__(self):
+        return len(self.tanda)
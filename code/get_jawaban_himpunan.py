@@ -1,33 +1,53 @@
-def get_jawaban_berbasis_himpunan(result):
+import numpy as np
+
+from indeks_tabel import buat_indeks_tabel
+from skema_ujian import SKEMA_DEFAULT
+
+
+def get_jawaban_berbasis_himpunan(result, indeks_tabel=None, geometri=None, soal=None, skema=None):
     """
     Fungsi untuk mendapatkan jawaban siswa berdasarkan pendekatan himpunan.
     Algoritma:
     1. Baca semua baris hasil API ke dalam list Python
     2. Buang baris-baris yang bukan berarti nomor soal atau pilihan
-    3. Kelompokkan setiap 4 baris jadi satu blok
+    3. Kelompokkan setiap 4 baris jadi satu blok (jumlah pilihan pada skema)
     4. Hitung himpunan penuh {'A','B','C','D'}, lalu cari elemen yang hilang
     5. Simpan hasilnya dalam struktur data
+
+    Himpunan pilihan disimpan sebagai bitmask skema, sehingga elemen yang hilang diperoleh dengan
+    lookup tabel; skema (opsional, default SKEMA_DEFAULT) menentukan jumlah soal dan pilihan.
+
+    indeks_tabel (opsional) adalah hasil buat_indeks_tabel(result) dan geometri (opsional) adalah
+    SheetGeometry dari result; keduanya dipakai bersama detektor lain.
+    soal (opsional) membatasi nomor soal yang dijawab, misalnya hanya soal yang belum terjawab.
     """
     print("\nMenggunakan metode deteksi jawaban berbasis himpunan...")
     
-    # Inisialisasi array jawaban
-    jawaban_siswa = ["-"] * 40
+    skema = skema or SKEMA_DEFAULT
+    jumlah_pilihan = skema.jumlah_pilihan
+    
+    # Inisialisasi array kode jawaban (0 = tidak terdeteksi)
+    jawaban_kode = np.zeros(skema.jumlah_soal, dtype=np.uint8)
+    soal_diproses = set(range(1, skema.jumlah_soal + 1)) if soal is None else set(soal)
     
     # Pilihan jawaban yang tersedia
-    pilihan_lengkap = set(["A", "B", "C", "D"])
+    pilihan_lengkap = skema.himpunan_pilihan
     
     # 1. Baca semua baris hasil API ke dalam list Python
-    lines = []
-    for page in result.pages:
-        for line in page.lines:
-            content = line.content.strip().upper()
-            lines.append(content)
+    if geometri is not None:
+        lines = [line.konten for line in geometri.garis]
+    else:
+        lines = []
+        for page in result.pages:
+            for line in page.lines:
+                content = line.content.strip().upper()
+                lines.append(content)
     
     # 2. Buang baris-baris yang bukan berarti nomor soal atau pilihan
     filtered_lines = []
     for line in lines:
         # Simpan hanya baris yang berisi pilihan jawaban atau nomor soal
-        if line in ["A", "B", "C", "D"] or line.isdigit() or (len(line) > 1 and line[0].isdigit() and line[1] == "."):
+        if line in pilihan_lengkap or line.isdigit() or (len(line) > 1 and line[0].isdigit() and line[1] == "."):
             # Jika format "1." atau "1)", ambil hanya angkanya
             if len(line) > 1 and line[0].isdigit():
                 if line[1] == "." or line[1] == ")":
@@ -36,35 +56,37 @@ def get_jawaban_berbasis_himpunan(result):
     
     print(f"Total baris setelah filtering: {len(filtered_lines)}")
     
-    # 3. Kelompokkan setiap 4 baris jadi satu blok
-    # Cari pola nomor soal diikuti oleh 3 pilihan (yang muncul)
+    # 3. Kelompokkan setiap jumlah_pilihan baris jadi satu blok
+    # terdeteksi_teks mencatat semua soal yang terjawab dari teks, termasuk yang tidak diminta
+    terdeteksi_teks = set()
+    # Cari pola nomor soal diikuti oleh jumlah_pilihan - 1 pilihan (yang muncul)
     i = 0
     while i < len(filtered_lines):
         # Cek apakah baris saat ini adalah nomor soal
         if filtered_lines[i].isdigit():
             nomor_soal = int(filtered_lines[i])
             
-            # Pastikan nomor soal valid (1-40)
-            if 1 <= nomor_soal <= 40:
-                # Kumpulkan pilihan yang muncul (maksimal 3 pilihan)
-                pilihan_muncul = set()
+            # Pastikan nomor soal valid
+            if skema.nomor_valid(nomor_soal):
+                # Kumpulkan pilihan yang muncul sampai nomor soal berikutnya (maksimal jumlah_pilihan) sebagai
+                # bitmask; jika huruf yang disilang tetap terbaca, semua pilihan muncul dan soal tidak dijawab
+                pilihan_muncul = 0
                 j = i + 1
-                while j < len(filtered_lines) and j < i + 4 and not filtered_lines[j].isdigit():
-                    if filtered_lines[j] in ["A", "B", "C", "D"]:
-                        pilihan_muncul.add(filtered_lines[j])
+                while j <= i + jumlah_pilihan and j < len(filtered_lines) and not filtered_lines[j].isdigit():
+                    pilihan_muncul |= skema.bit(filtered_lines[j])
                     j += 1
                 
                 # 4. Hitung himpunan penuh {'A','B','C','D'}, lalu cari elemen yang hilang
-                if len(pilihan_muncul) > 0:
-                    pilihan_tidak_muncul = pilihan_lengkap - pilihan_muncul
-                    
+                kode = skema.kode_hilang(pilihan_muncul) if pilihan_muncul else 0
+                if kode:
+                    terdeteksi_teks.add(nomor_soal)
+                if pilihan_muncul and nomor_soal in soal_diproses:
                     # Jika hanya ada satu pilihan yang tidak muncul, itu adalah jawaban siswa
-                    if len(pilihan_tidak_muncul) == 1:
-                        jawaban = list(pilihan_tidak_muncul)[0]
-                        jawaban_siswa[nomor_soal-1] = jawaban
-                        print(f"Soal {nomor_soal}: Pilihan yang muncul {pilihan_muncul}, jawaban siswa adalah {jawaban}")
+                    if kode:
+                        jawaban_kode[nomor_soal-1] = kode
+                        print(f"Soal {nomor_soal}: Pilihan yang muncul {skema.huruf_dari_mask(pilihan_muncul)}, jawaban siswa adalah {skema.huruf(kode)}")
                     else:
-                        print(f"Soal {nomor_soal}: Tidak dapat menentukan jawaban dengan pasti. Pilihan yang muncul: {pilihan_muncul}")
+                        print(f"Soal {nomor_soal}: Tidak dapat menentukan jawaban dengan pasti. Pilihan yang muncul: {skema.huruf_dari_mask(pilihan_muncul)}")
                 
                 # Lompat ke nomor soal berikutnya
                 i = j
@@ -74,46 +96,43 @@ def get_jawaban_berbasis_himpunan(result):
             i += 1
     
     # Jika metode di atas tidak berhasil mendeteksi banyak jawaban, coba pendekatan alternatif
-    # dengan menggunakan tabel
-    if jawaban_siswa.count("-") > 30:  # Jika lebih dari 30 soal belum terdeteksi
+    # dengan menggunakan tabel. Dihitung atas semua soal, bukan hanya soal yang diminta, agar jawaban
+    # satu soal tidak bergantung pada soal lain yang diminta kaskade
+    belum_terdeteksi = skema.jumlah_soal - len(terdeteksi_teks)
+    if belum_terdeteksi > skema.jumlah_soal * 3 // 4:  # Jika lebih dari 3/4 soal belum terdeteksi
         print("\nMencoba pendekatan alternatif dengan analisis tabel...")
         
-        # Ekstrak teks dari semua sel dalam tabel jawaban
-        for table in result.tables:
+        if indeks_tabel is None:
+            indeks_tabel = buat_indeks_tabel(result)
+        
+        # Ekstrak teks dari semua sel tabel vertikal (penomoran sama dengan detektor huruf yang tidak muncul)
+        for indeks in indeks_tabel:
+            if not indeks.tampak_vertikal(skema):
+                continue
             # Identifikasi struktur tabel jawaban
-            # Asumsikan setiap 4 baris berurutan mewakili pilihan A, B, C, D untuk satu soal
-            for cell in table.cells:
-                content = cell.content.strip().upper()
+            # Asumsikan setiap jumlah_pilihan baris berurutan mewakili pilihan (A, B, C, D) untuk satu soal
+            for cell, content in indeks.sel_dengan_konten(pilihan_lengkap):
                 row_idx = cell.row_index
                 col_idx = cell.column_index
                 
-                # Jika sel berisi pilihan jawaban (A, B, C, D)
-                if content in ["A", "B", "C", "D"]:
-                    # Tentukan nomor soal berdasarkan posisi sel
-                    # Asumsikan struktur: setiap 4 baris berisi 1 soal, dan ada beberapa soal per kolom
-                    nomor_soal = (row_idx // 4) * table.column_count + col_idx + 1
-                    
-                    # Pastikan nomor soal valid (1-40)
-                    if 1 <= nomor_soal <= 40:
-                        # Jika jawaban untuk soal ini belum terdeteksi
-                        if jawaban_siswa[nomor_soal-1] == "-":
-                            # Kumpulkan semua pilihan yang muncul untuk soal ini
-                            pilihan_muncul = set()
-                            for r in range(row_idx // 4 * 4, (row_idx // 4 + 1) * 4):
-                                for c in range(table.column_count):
-                                    for cell2 in table.cells:
-                                        if cell2.row_index == r and cell2.column_index == c:
-                                            content2 = cell2.content.strip().upper()
-                                            if content2 in ["A", "B", "C", "D"]:
-                                                pilihan_muncul.add(content2)
-                            
-                            # Cari pilihan yang tidak muncul
-                            pilihan_tidak_muncul = pilihan_lengkap - pilihan_muncul
-                            
-                            # Jika hanya ada satu pilihan yang tidak muncul, itu adalah jawaban siswa
-                            if len(pilihan_tidak_muncul) == 1:
-                                jawaban = list(pilihan_tidak_muncul)[0]
-                                jawaban_siswa[nomor_soal-1] = jawaban
-                                print(f"Soal {nomor_soal}: Pilihan yang muncul {pilihan_muncul}, jawaban siswa adalah {jawaban}")
+                # Tentukan nomor soal berdasarkan posisi sel
+                # Asumsikan struktur: setiap jumlah_pilihan baris berisi 1 soal, dan ada beberapa soal per kolom
+                # (soal berurutan ke bawah lalu pindah kolom, sama dengan detektor huruf yang tidak muncul)
+                nomor_soal = indeks.nomor_soal_vertikal(row_idx, col_idx, jumlah_pilihan)
+                
+                # Pastikan nomor soal valid
+                if skema.nomor_valid(nomor_soal) and nomor_soal in soal_diproses:
+                    # Jika jawaban untuk soal ini belum terdeteksi
+                    if jawaban_kode[nomor_soal-1] == 0:
+                        # Kumpulkan semua pilihan yang muncul pada blok soal ini sebagai bitmask
+                        pilihan_muncul = 0
+                        for konten in indeks.konten_dalam_blok(row_idx // jumlah_pilihan, col_idx, jumlah_pilihan):
+                            pilihan_muncul |= skema.bit(konten)
+                        
+                        # Jika hanya ada satu pilihan yang tidak muncul, itu adalah jawaban siswa
+                        kode = skema.kode_hilang(pilihan_muncul)
+                        if kode:
+                            jawaban_kode[nomor_soal-1] = kode
+                            print(f"Soal {nomor_soal}: Pilihan yang muncul {skema.huruf_dari_mask(pilihan_muncul)}, jawaban siswa adalah {skema.huruf(kode)}")
     
-    return jawaban_siswa
\ No newline at end of file
+    return skema.dari_kode(jawaban_kode)
\ No newline at end of file
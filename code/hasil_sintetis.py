@@ -0,0 +1,218 @@
+"""
+Hasil analisis sintetis (bentuk AnalyzeResult) untuk mengukur detektor tanpa Azure dan tanpa scan.
+
+buat_lembar_sintetis() menyusun satu halaman dengan satu tabel jawaban dan jawaban siswa acak yang
+diketahui. Huruf pilihan yang disilang siswa biasanya tidak terbaca oleh OCR (sel dan garis teksnya
+kosong; huruf_terbaca mengatur peluang huruf itu tetap terbaca), lalu selection mark "selected"
+diletakkan di sel itu. Tata letak tabel:
+  vertikal    setiap jumlah_pilihan baris berurutan berisi pilihan satu soal; soal berurutan ke bawah lalu
+              pindah kolom, seperti IndeksTabel.nomor_soal_vertikal dan petakan_sel_pilihan:
+              nomor = baris // jumlah_pilihan + 1 + kolom * soal_per_kolom, soal_per_kolom = ceil(jumlah_soal / jumlah_kolom)
+  horizontal  satu soal per baris: kolom nomor soal lalu satu kolom per pilihan (nomor = baris + 1)
+  grid        blok jumlah_pilihan + 1 baris (baris nomor soal lalu pilihan), satu soal per kolom
+Baris teks disusun per soal (nomor, lalu huruf yang terbaca). Derau garis menyisipkan teks lain
+(kop, angka, huruf lepas) di posisi acak; goresan menambah dua garis pendek yang berpotongan di sel
+yang disilang; tanda tambahan adalah selection mark "unselected" di sel acak.
+
+LembarSintetis.data berformat `AnalyzeResult.as_dict()`, sehingga dapat dibungkus AnalyzeResult SDK
+(hasil()), diproyeksikan seperti respons Azure (proyeksi()), atau disimpan sebagai JSON.
+
+Contoh:
+    python hasil_sintetis.py --soal 60 --pilihan ABCDE --tata-letak grid --output lembar.json
+"""
+
+import argparse
+import json
+import random
+
+from skema_ujian import SKEMA_DEFAULT, SkemaUjian
+
+TATA_LETAK = ("vertikal", "horizontal", "grid")
+
+LEBAR_HALAMAN, TINGGI_HALAMAN = 1700, 2200
+TABEL_X, TABEL_Y = 200, 500
+LEBAR_SEL, TINGGI_SEL = 120, 30
+
+KATA_DERAU = ("NAMA", "KELAS", "UJIAN", "TENGAH", "SEMESTER", "MATEMATIKA", "PAKET", "12", "7", "B", "C.", "-")
+
+
+def _polygon(x0, y0, lebar, tinggi):
+    return [round(v, 2) for v in (x0, y0, x0 + lebar, y0, x0 + lebar, y0 + tinggi, x0, y0 + tinggi)]
+
+
+def _posisi_sel(tata_letak, nomor_soal, indeks_pilihan, jumlah_pilihan, jumlah_kolom, soal_per_kolom):
+    """(baris, kolom) sel pilihan; indeks_pilihan None untuk sel nomor soal (None jika tata letak tanpa sel nomor)."""
+    q = nomor_soal - 1
+    if tata_letak == "vertikal":
+        if indeks_pilihan is None:
+            return None
+        return (q % soal_per_kolom) * jumlah_pilihan + indeks_pilihan, q // soal_per_kolom
+    if tata_letak == "horizontal":
+        return q, 0 if indeks_pilihan is None else indeks_pilihan + 1
+    # grid
+    baris_awal = (q // jumlah_kolom) * (jumlah_pilihan + 1)
+    return baris_awal + (0 if indeks_pilihan is None else indeks_pilihan + 1), q % jumlah_kolom
+
+
+class LembarSintetis:
+    """Hasil analisis sintetis (dict format as_dict) beserta jawaban siswa yang sebenarnya."""
+
+    __slots__ = ("data", "jawaban", "skema", "tata_letak")
+
+    def __init__(self, data, jawaban, skema, tata_letak):
+        self.data = data
+        self.jawaban = jawaban
+        self.skema = skema
+        self.tata_letak = tata_letak
+
+    def hasil(self):
+        """Bungkus data sebagai AnalyzeResult SDK (seperti hasil poller atau cache_analisis.ambil)."""
+        from azure.ai.documentintelligence.models import AnalyzeResult
+
+        return AnalyzeResult(self.data)
+
+    def proyeksi(self):
+        """Uraikan data sebagai ProyeksiHasil, seperti respons yang dibaca analisis_proyeksi()."""
+        from proyeksi_hasil import proyeksi_dari_potongan
+
+        return proyeksi_dari_potongan([json.dumps(self.data).encode("utf-8")])
+
+
+def buat_lembar_sintetis(skema=None, tata_letak="vertikal", jumlah_kolom=8, derau_garis=0, jumlah_tanda=None,
+                         tanda_tambahan=0, rasio_goresan=0.0, kosong=0.0, huruf_terbaca=0.0, seed=0):
+    """
+    Bangun LembarSintetis dengan jawaban acak.
+
+    skema           SkemaUjian (jumlah soal dan huruf pilihan), default SKEMA_DEFAULT
+    tata_letak      salah satu TATA_LETAK; jumlah_kolom = soal per baris blok (vertikal dan grid)
+    derau_garis     jumlah garis teks derau yang disisipkan di urutan garis
+    jumlah_tanda    jumlah selection mark "selected"; None = satu untuk setiap soal yang dijawab
+    tanda_tambahan  jumlah selection mark "unselected" di sel pilihan acak
+    rasio_goresan   proporsi soal terjawab yang silangnya juga terbaca sebagai dua garis berpotongan
+    kosong          peluang soal tidak dijawab (semua huruf terbaca, tanpa tanda)
+    huruf_terbaca   peluang huruf yang disilang tetap terbaca OCR
+    """
+    if tata_letak not in TATA_LETAK:
+        raise ValueError(f"Tata letak tidak dikenal: {tata_letak} (pilih {', '.join(TATA_LETAK)})")
+    skema = skema or SKEMA_DEFAULT
+    rng = random.Random(seed)
+    jumlah_pilihan = skema.jumlah_pilihan
+
+    jawaban = []
+    for _ in range(skema.jumlah_soal):
+        jawaban.append("-" if rng.random() < kosong else rng.choice(skema.pilihan))
+
+    soal_per_kolom = -(-skema.jumlah_soal // jumlah_kolom)
+    if tata_letak == "vertikal":
+        jumlah_baris = soal_per_kolom * jumlah_pilihan
+        jumlah_kolom_tabel = jumlah_kolom
+    elif tata_letak == "horizontal":
+        jumlah_baris = skema.jumlah_soal
+        jumlah_kolom_tabel = jumlah_pilihan + 1
+    else:
+        jumlah_baris = -(-skema.jumlah_soal // jumlah_kolom) * (jumlah_pilihan + 1)
+        jumlah_kolom_tabel = jumlah_kolom
+    tinggi_halaman = max(TINGGI_HALAMAN, TABEL_Y + jumlah_baris * TINGGI_SEL + 200)
+    lebar_halaman = max(LEBAR_HALAMAN, TABEL_X + jumlah_kolom_tabel * LEBAR_SEL + 200)
+
+    def kotak(baris, kolom):
+        return TABEL_X + kolom * LEBAR_SEL, TABEL_Y + baris * TINGGI_SEL
+
+    def posisi(nomor_soal, indeks_pilihan):
+        return _posisi_sel(tata_letak, nomor_soal, indeks_pilihan, jumlah_pilihan, jumlah_kolom, soal_per_kolom)
+
+    cells, lines = [], []
+    sel_pilihan = []
+    for nomor_soal in range(1, skema.jumlah_soal + 1):
+        posisi_nomor = posisi(nomor_soal, None)
+        if posisi_nomor is not None:
+            x0, y0 = kotak(*posisi_nomor)
+            polygon = _polygon(x0, y0, LEBAR_SEL, TINGGI_SEL)
+            cells.append({"kind": "content", "rowIndex": posisi_nomor[0], "columnIndex": posisi_nomor[1],
+                          "content": str(nomor_soal), "boundingRegions": [{"pageNumber": 1, "polygon": polygon}]})
+        else:
+            # Nomor soal tercetak di kiri sel pilihan pertama
+            x0, y0 = kotak(*posisi(nomor_soal, 0))
+            polygon = _polygon(x0 + 4, y0 + 8, 24, 14)
+        lines.append({"content": str(nomor_soal), "polygon": polygon})
+
+        for indeks_pilihan, huruf in enumerate(skema.pilihan):
+            baris, kolom = posisi(nomor_soal, indeks_pilihan)
+            x0, y0 = kotak(baris, kolom)
+            # Huruf yang disilang tidak terbaca OCR, kecuali dengan peluang huruf_terbaca
+            hilang = huruf == jawaban[nomor_soal - 1] and rng.random() >= huruf_terbaca
+            cells.append({"kind": "content", "rowIndex": baris, "columnIndex": kolom,
+                          "content": "" if hilang else huruf,
+                          "boundingRegions": [{"pageNumber": 1, "polygon": _polygon(x0, y0, LEBAR_SEL, TINGGI_SEL)}]})
+            sel_pilihan.append((x0, y0))
+            if not hilang:
+                lines.append({"content": huruf, "polygon": _polygon(x0 + 50, y0 + 8, 14, 14)})
+
+    for _ in range(derau_garis):
+        x, y = rng.uniform(0, lebar_halaman - 100), rng.uniform(0, tinggi_halaman - 30)
+        lines.insert(rng.randrange(len(lines) + 1),
+                     {"content": rng.choice(KATA_DERAU), "polygon": _polygon(x, y, rng.uniform(20, 200), 20)})
+
+    terjawab = [q for q in range(skema.jumlah_soal) if jawaban[q] != "-"]
+    if jumlah_tanda is not None and jumlah_tanda < len(terjawab):
+        bertanda = sorted(rng.sample(terjawab, jumlah_tanda))
+    else:
+        bertanda = terjawab
+
+    selection_marks = []
+    for q in bertanda:
+        baris, kolom = posisi(q + 1, skema.pilihan.index(jawaban[q]))
+        x0, y0 = kotak(baris, kolom)
+        cx, cy = x0 + LEBAR_SEL / 2 + rng.uniform(-15, 15), y0 + TINGGI_SEL / 2 + rng.uniform(-5, 5)
+        selection_marks.append({"state": "selected", "confidence": round(rng.uniform(0.6, 0.99), 3),
+                                "polygon": _polygon(cx - 7, cy - 7, 14, 14)})
+        if rng.random() < rasio_goresan:
+            lines.append({"content": "\\", "polygon": [cx - 8, cy - 8, cx - 4, cy - 8, cx + 8, cy + 8, cx + 4, cy + 8]})
+            lines.append({"content": "/", "polygon": [cx + 4, cy - 8, cx + 8, cy - 8, cx - 4, cy + 8, cx - 8, cy + 8]})
+    for _ in range(tanda_tambahan):
+        x0, y0 = rng.choice(sel_pilihan)
+        selection_marks.append({"state": "unselected", "confidence": round(rng.uniform(0.1, 0.6), 3),
+                                "polygon": _polygon(x0 + 53, y0 + 8, 14, 14)})
+
+    x1, y1 = kotak(jumlah_baris, jumlah_kolom_tabel)
+    data = {
+        "apiVersion": "2024-11-30",
+        "modelId": "prebuilt-layout",
+        "content": "",
+        "pages": [{"pageNumber": 1, "angle": 0.0, "width": lebar_halaman, "height": tinggi_halaman, "unit": "pixel",
+                   "spans": [], "words": [], "lines": lines, "selectionMarks": selection_marks}],
+        "tables": [{"rowCount": jumlah_baris, "columnCount": jumlah_kolom_tabel, "cells": cells, "spans": [],
+                    "boundingRegions": [{"pageNumber": 1,
+                                         "polygon": _polygon(TABEL_X, TABEL_Y, x1 - TABEL_X, y1 - TABEL_Y)}]}],
+    }
+    return LembarSintetis(data, jawaban, skema, tata_letak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tulis hasil analisis sintetis (JSON format as_dict)")
+    parser.add_argument("--soal", type=int, default=40)
+    parser.add_argument("--pilihan", default="ABCD")
+    parser.add_argument("--tata-letak", choices=TATA_LETAK, default="vertikal")
+    parser.add_argument("--kolom", type=int, default=8, help="soal per baris blok (vertikal dan grid)")
+    parser.add_argument("--derau-garis", type=int, default=0)
+    parser.add_argument("--tanda", type=int, default=None, help="jumlah selection mark selected (default: semua soal terjawab)")
+    parser.add_argument("--tanda-tambahan", type=int, default=0)
+    parser.add_argument("--goresan", type=float, default=0.0)
+    parser.add_argument("--kosong", type=float, default=0.0)
+    parser.add_argument("--huruf-terbaca", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    lembar = buat_lembar_sintetis(
+        SkemaUjian(args.soal, tuple(args.pilihan)), args.tata_letak, args.kolom, args.derau_garis, args.tanda,
+        args.tanda_tambahan, args.goresan, args.kosong, args.huruf_terbaca, args.seed,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(lembar.data, f)
+    print(f"Lembar sintetis ditulis ke {args.output}")
+    print(f"Jawaban: {''.join(lembar.jawaban)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Indeks spasial sederhana (grid seragam) untuk mencocokkan titik tanda silang dengan sel tabel.
+
+Setiap kotak (bounding box) dimasukkan ke semua petak grid yang dilaluinya, sehingga pencarian
+sebuah titik hanya memeriksa kotak-kotak di petak yang sama, bukan seluruh sel tabel.
+"""
+
+import math
+
+
+def batas_polygon(polygon):
+    """
+    Hitung batas (min_x, min_y, max_x, max_y) dari polygon.
+    Mendukung titik dengan atribut x/y maupun format list [x, y]. Kembalikan None jika tidak valid.
+    """
+    if not polygon:
+        return None
+    try:
+        if hasattr(polygon[0], 'x') and hasattr(polygon[0], 'y'):
+            xs = [point.x for point in polygon]
+            ys = [point.y for point in polygon]
+        elif isinstance(polygon[0], list):
+            xs = [point[0] for point in polygon]
+            ys = [point[1] for point in polygon]
+        else:
+            return None
+    except (IndexError, TypeError):
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def perluas_kotak(kotak, rasio_margin):
+    """Perluas kotak dengan margin sebesar rasio dari lebar dan tingginya."""
+    min_x, min_y, max_x, max_y = kotak
+    margin_x = (max_x - min_x) * rasio_margin
+    margin_y = (max_y - min_y) * rasio_margin
+    return min_x - margin_x, min_y - margin_y, max_x + margin_x, max_y + margin_y
+
+
+class GridSpasial:
+    """
+    Grid seragam berisi kotak-kotak (min_x, min_y, max_x, max_y).
+    Ukuran petak default adalah rata-rata ukuran kotak, sehingga setiap kotak
+    hanya menempati sedikit petak dan setiap pencarian hanya memeriksa sedikit kandidat.
+    """
+
+    def __init__(self, kotak_list, ukuran_petak=None):
+        self.kotak_list = list(kotak_list)
+        self.petak = {}
+        # Jumlah kotak yang diuji oleh query_titik (untuk instrumentasi)
+        self.jumlah_uji = 0
+
+        if ukuran_petak is None:
+            if self.kotak_list:
+                lebar = sum(k[2] - k[0] for k in self.kotak_list) / len(self.kotak_list)
+                tinggi = sum(k[3] - k[1] for k in self.kotak_list) / len(self.kotak_list)
+                ukuran_petak = max(lebar, tinggi)
+            if not ukuran_petak or ukuran_petak <= 0:
+                ukuran_petak = 1.0
+        self.ukuran_petak = ukuran_petak
+
+        for idx, (min_x, min_y, max_x, max_y) in enumerate(self.kotak_list):
+            for gx in range(self._indeks(min_x), self._indeks(max_x) + 1):
+                for gy in range(self._indeks(min_y), self._indeks(max_y) + 1):
+                    self.petak.setdefault((gx, gy), []).append(idx)
+
+    def _indeks(self, nilai):
+        return math.floor(nilai / self.ukuran_petak)
+
+    def query_titik(self, x, y):
+        """Kembalikan indeks kotak yang memuat titik (x, y), terurut sesuai urutan penyisipan."""
+        kandidat = self.petak.get((self._indeks(x), self._indeks(y)), ())
+        self.jumlah_uji += len(kandidat)
+        hasil = []
+        for idx in kandidat:
+            min_x, min_y, max_x, max_y = self.kotak_list[idx]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                hasil.append(idx)
+        return hasil
+
+
+def pasangan_berdekatan(titik_list, jarak_maks):
+    """
+    Cari semua pasangan indeks (i, j), i < j, yang jarak titiknya kurang dari jarak_maks.
+    Titik di-hash ke petak berukuran jarak_maks, sehingga setiap titik hanya dibandingkan
+    dengan titik di petak yang sama dan 8 petak tetangganya. Titik bernilai None dilewati.
+    Hasil terurut seperti perulangan bersarang i < j.
+    """
+    petak = {}
+    for idx, titik in enumerate(titik_list):
+        if titik is None:
+            continue
+        kunci = (math.floor(titik[0] / jarak_maks), math.floor(titik[1] / jarak_maks))
+        petak.setdefault(kunci, []).append(idx)
+
+    pasangan = []
+    for (gx, gy), anggota in petak.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                tetangga = petak.get((gx + dx, gy + dy))
+                if not tetangga:
+                    continue
+                for i in anggota:
+                    x1, y1 = titik_list[i]
+                    for j in tetangga:
+                        if j <= i:
+                            continue
+                        x2, y2 = titik_list[j]
+                        if ((x1 - x2)**2 + (y1 - y2)**2)**0.5 < jarak_maks:
+                            pasangan.append((i, j))
+
+    pasangan.sort()
+    return pasangan
@@ -0,0 +1,83 @@
+"""
+Indeks sel tabel yang dibangun sekali per hasil analisis.
+
+Setiap `cell.content` dinormalisasi (strip + upper) tepat satu kali, lalu semua detektor
+berbasis tabel memakai indeks ini: (baris, kolom) -> konten, konten -> daftar sel,
+dan konten per blok soal.
+
+Tabel vertikal dinomori seperti petakan_sel_pilihan: setiap soal menempati tinggi_blok baris
+berurutan, soal berurutan ke bawah lalu pindah ke kolom berikutnya.
+"""
+
+
+class IndeksTabel:
+    """Indeks konten sel untuk satu tabel."""
+
+    def __init__(self, table):
+        self.table = table
+        self.row_count = table.row_count
+        self.column_count = table.column_count
+
+        # Daftar (cell, konten) sesuai urutan sel dari API
+        self.sel = []
+        # (baris, kolom) -> konten
+        self.konten = {}
+        # konten -> [cell, ...]
+        self.sel_per_konten = {}
+
+        for cell in table.cells:
+            content = cell.content.strip().upper()
+            self.sel.append((cell, content))
+            self.konten[(cell.row_index, cell.column_index)] = content
+            self.sel_per_konten.setdefault(content, []).append(cell)
+
+        self._konten_blok = {}
+        self._vertikal = {}
+
+    def jumlah_sel_dengan_konten(self, daftar_konten):
+        """Hitung jumlah sel yang kontennya termasuk dalam daftar_konten."""
+        return sum(len(self.sel_per_konten.get(content, ())) for content in set(daftar_konten))
+
+    def sel_dengan_konten(self, daftar_konten):
+        """Kembalikan (cell, konten) yang kontennya termasuk dalam daftar_konten, sesuai urutan sel."""
+        return [(cell, content) for cell, content in self.sel if content in daftar_konten]
+
+    def tampak_vertikal(self, skema):
+        """
+        True jika lebih dari separuh sel pilihan berada di baris row % jumlah_pilihan == kode - 1,
+        yaitu tabel disusun vertikal dan nomor_soal_vertikal berlaku. Hasil disimpan per skema.
+        """
+        if skema not in self._vertikal:
+            sel_pilihan = self.sel_dengan_konten(skema.himpunan_pilihan)
+            cocok = sum(
+                1 for cell, content in sel_pilihan if cell.row_index % skema.jumlah_pilihan == skema.kode(content) - 1
+            )
+            self._vertikal[skema] = cocok * 2 > len(sel_pilihan)
+        return self._vertikal[skema]
+
+    def soal_per_kolom(self, tinggi_blok=4):
+        """Jumlah soal dalam satu kolom tabel vertikal."""
+        return max(-(-self.row_count // tinggi_blok), 1)
+
+    def nomor_soal_vertikal(self, baris, kolom, tinggi_blok=4):
+        """Nomor soal untuk sel (baris, kolom) pada tabel vertikal."""
+        return baris // tinggi_blok + 1 + kolom * self.soal_per_kolom(tinggi_blok)
+
+    def konten_dalam_blok(self, blok, kolom, tinggi_blok=4):
+        """
+        Kembalikan konten sel kolom pada baris blok*tinggi_blok sampai (blok+1)*tinggi_blok-1,
+        yaitu semua pilihan satu soal pada tabel vertikal.
+        Pengelompokan untuk semua blok dihitung sekali untuk setiap tinggi_blok.
+        """
+        if tinggi_blok not in self._konten_blok:
+            per_blok = {}
+            for cell, content in self.sel:
+                if 0 <= cell.column_index < self.column_count:
+                    per_blok.setdefault((cell.row_index // tinggi_blok, cell.column_index), []).append(content)
+            self._konten_blok[tinggi_blok] = per_blok
+        return self._konten_blok[tinggi_blok].get((blok, kolom), [])
+
+
+def buat_indeks_tabel(result):
+    """Bangun IndeksTabel untuk setiap tabel dalam hasil analisis (urutan sama dengan result.tables)."""
+    return [IndeksTabel(table) for table in result.tables]
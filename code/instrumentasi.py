@@ -0,0 +1,177 @@
+"""
+Instrumentasi waktu per tahap dan counter untuk setiap lembar yang dinilai.
+
+Satu `Instrumentasi` dibuat per lembar lalu diaktifkan dengan `with instrumentasi.aktif():`.
+Kode penilaian cukup memanggil `span(nama)` dan `hitung(nama, n)`; keduanya tidak melakukan apa-apa
+jika tidak ada instrumentasi yang aktif. Instrumentasi aktif disimpan di contextvars, sehingga
+setiap worker layanan penilaian mencatat lembarnya sendiri.
+
+Hasil per lembar diekspor sebagai JSON lines (`tulis_jsonl`) dan diagregasi ke file teks Prometheus
+(`AgregatPrometheus`). Ringkasan p50/p99 per tahap dari file JSON lines:
+  python instrumentasi.py metrik.jsonl
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+_instrumentasi_aktif = contextvars.ContextVar("instrumentasi_aktif", default=None)
+
+# Batas bucket histogram durasi tahap (detik)
+BUCKET_DURASI = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Instrumentasi:
+    """Durasi span (detik, dijumlahkan per nama) dan counter untuk satu lembar."""
+
+    def __init__(self, lembar=None):
+        self.lembar = lembar
+        self.span = {}
+        self.counter = {}
+        self.waktu_mulai = time.time()
+
+    @contextmanager
+    def aktif(self):
+        """Jadikan instrumentasi ini tujuan span() dan hitung() selama blok with."""
+        token = _instrumentasi_aktif.set(self)
+        try:
+            yield self
+        finally:
+            _instrumentasi_aktif.reset(token)
+
+    def tambah_durasi(self, nama, detik):
+        self.span[nama] = self.span.get(nama, 0.0) + detik
+
+    def tambah_counter(self, nama, n=1):
+        self.counter[nama] = self.counter.get(nama, 0) + n
+
+    def rekaman(self):
+        """Rekaman lembar dalam bentuk dict yang dapat diserialisasi ke JSON."""
+        return {
+            "lembar": self.lembar,
+            "waktu": round(self.waktu_mulai, 3),
+            "span": {nama: round(detik, 6) for nama, detik in self.span.items()},
+            "counter": dict(self.counter),
+        }
+
+
+@contextmanager
+def span(nama):
+    """Catat durasi blok with sebagai span bernama pada instrumentasi yang aktif."""
+    instrumentasi = _instrumentasi_aktif.get()
+    if instrumentasi is None:
+        yield
+        return
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        instrumentasi.tambah_durasi(nama, time.perf_counter() - mulai)
+
+
+def hitung(nama, n=1):
+    """Tambah counter bernama pada instrumentasi yang aktif."""
+    instrumentasi = _instrumentasi_aktif.get()
+    if instrumentasi is not None:
+        instrumentasi.tambah_counter(nama, n)
+
+
+def tulis_jsonl(path, rekaman):
+    """Tambahkan satu rekaman lembar sebagai satu baris JSON."""
+    baris = json.dumps(rekaman, ensure_ascii=False) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(baris)
+
+
+class AgregatPrometheus:
+    """
+    Agregasi rekaman beberapa lembar menjadi histogram durasi per tahap dan total counter,
+    lalu ditulis dalam format teks Prometheus (cocok untuk textfile collector node_exporter).
+    """
+
+    def __init__(self, bucket=BUCKET_DURASI):
+        self.bucket = tuple(bucket)
+        self.histogram = {}
+        self.counter = {}
+        self.jumlah_lembar = 0
+        self._lock = threading.Lock()
+
+    def tambah(self, rekaman):
+        with self._lock:
+            self.jumlah_lembar += 1
+            for nama, detik in rekaman["span"].items():
+                jumlah_bucket, total, banyak = self.histogram.get(nama, ([0] * len(self.bucket), 0.0, 0))
+                for i, batas in enumerate(self.bucket):
+                    if detik <= batas:
+                        jumlah_bucket[i] += 1
+                self.histogram[nama] = (jumlah_bucket, total + detik, banyak + 1)
+            for nama, n in rekaman["counter"].items():
+                self.counter[nama] = self.counter.get(nama, 0) + n
+
+    def teks(self):
+        with self._lock:
+            baris = [
+                "# HELP penilaian_lembar_total Jumlah lembar yang dinilai.",
+                "# TYPE penilaian_lembar_total counter",
+                f"penilaian_lembar_total {self.jumlah_lembar}",
+                "# HELP penilaian_durasi_tahap_detik Durasi setiap tahap penilaian per lembar.",
+                "# TYPE penilaian_durasi_tahap_detik histogram",
+            ]
+            for nama in sorted(self.histogram):
+                jumlah_bucket, total, banyak = self.histogram[nama]
+                for batas, jumlah in zip(self.bucket, jumlah_bucket):
+                    baris.append(f'penilaian_durasi_tahap_detik_bucket{{tahap="{nama}",le="{batas}"}} {jumlah}')
+                baris.append(f'penilaian_durasi_tahap_detik_bucket{{tahap="{nama}",le="+Inf"}} {banyak}')
+                baris.append(f'penilaian_durasi_tahap_detik_sum{{tahap="{nama}"}} {total:.6f}')
+                baris.append(f'penilaian_durasi_tahap_detik_count{{tahap="{nama}"}} {banyak}')
+            baris.append("# HELP penilaian_counter_total Counter penilaian (tanda, uji sel, dll.).")
+            baris.append("# TYPE penilaian_counter_total counter")
+            for nama in sorted(self.counter):
+                baris.append(f'penilaian_counter_total{{nama="{nama}"}} {self.counter[nama]}')
+        return "\n".join(baris) + "\n"
+
+    def tulis(self, path):
+        """Tulis file teks Prometheus secara atomik."""
+        path_sementara = f"{path}.{os.getpid()}.tmp"
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            f.write(self.teks())
+        os.replace(path_sementara, path)
+
+
+def ringkasan_persentil(path, persentil=(50, 99)):
+    """Baca file JSON lines dan hitung persentil durasi per tahap: {tahap: {"p50": ..., ...}}."""
+    durasi = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for baris in f:
+            if not baris.strip():
+                continue
+            for nama, detik in json.loads(baris)["span"].items():
+                durasi.setdefault(nama, []).append(detik)
+
+    ringkasan = {}
+    for nama, nilai in durasi.items():
+        hasil = np.percentile(np.array(nilai), persentil)
+        ringkasan[nama] = {f"p{p}": float(h) for p, h in zip(persentil, hasil)}
+        ringkasan[nama]["jumlah"] = len(nilai)
+    return ringkasan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan p50/p99 durasi per tahap dari file metrik JSON lines")
+    parser.add_argument("path", help="file JSON lines hasil instrumentasi")
+    args = parser.parse_args()
+
+    ringkasan = ringkasan_persentil(args.path)
+    print(f"{'Tahap':32s} {'Jumlah':>7s} {'p50 (ms)':>10s} {'p99 (ms)':>10s}")
+    for nama, nilai in sorted(ringkasan.items(), key=lambda x: -x[1]["p50"]):
+        print(f"{nama:32s} {nilai['jumlah']:7d} {nilai['p50'] * 1000:10.2f} {nilai['p99'] * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Jurnal operasi analisis yang sedang berjalan, agar analisis dapat dilanjutkan setelah proses mati.
+
+Segera setelah dokumen diunggah, continuation token poller disimpan bersama kunci cache dokumen (hash
+SHA-256 isi file, model id, dan versi API) sebagai satu file JSON per operasi. Jika proses mati saat
+menunggu poller.result(), lembar yang sama pada proses berikutnya melanjutkan polling operasi lama dengan
+token tersebut, tanpa mengunggah (dan membayar) ulang. Entri dihapus setelah hasil diterima.
+
+Hasil analisis di Azure hanya disimpan 24 jam, sehingga entri yang lebih tua dianggap kedaluwarsa.
+Operasi yang tidak dapat dilanjutkan (kedaluwarsa atau gagal) dikirim ulang seperti biasa.
+
+Semua operasi tertunda juga dapat dilanjutkan sekaligus ke cache analisis tanpa file aslinya:
+    python jurnal_operasi.py              # daftar operasi tertunda
+    python jurnal_operasi.py --lanjutkan  # tunggu hasilnya dan simpan ke cache
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
+from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+from cache_analisis import cache_dari_lingkungan
+from proyeksi_hasil import tunggu_dan_simpan
+
+# Hasil analisis Azure disimpan 24 jam; beri margin agar token tidak dipakai tepat saat kedaluwarsa
+UMUR_MAKS_DETIK = 23 * 3600
+
+
+class JurnalOperasi:
+    """Continuation token operasi yang belum selesai, satu file JSON per kunci di direktori."""
+
+    def __init__(self, direktori, umur_maks=UMUR_MAKS_DETIK):
+        self.direktori = direktori
+        self.umur_maks = umur_maks
+        os.makedirs(direktori, exist_ok=True)
+
+    def _path(self, kunci):
+        return os.path.join(self.direktori, kunci + ".json")
+
+    def catat(self, kunci, token, model_id, id_operasi=None):
+        """
+        Simpan continuation token dan id operasi untuk kunci dokumen ini. token boleh None jika operasi
+        dipantau tanpa poller SDK (mode proyeksi); operasi seperti ini dilanjutkan dengan id_operasi.
+        """
+        data = {"kunci": kunci, "token": token, "id_operasi": id_operasi, "model_id": model_id,
+                "waktu": time.time()}
+        path = self._path(kunci)
+        path_sementara = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(path_sementara, path)
+
+    def ambil(self, kunci):
+        """Entri (dict) untuk kunci ini, atau None jika tidak ada atau sudah kedaluwarsa (lalu dihapus)."""
+        try:
+            with open(self._path(kunci), "r", encoding="utf-8") as f:
+                entri = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entri.get("waktu", 0) > self.umur_maks:
+            self.hapus(kunci)
+            return None
+        return entri
+
+    def hapus(self, kunci):
+        try:
+            os.remove(self._path(kunci))
+        except OSError:
+            pass
+
+    def daftar(self):
+        """Semua entri yang belum kedaluwarsa, dari yang paling lama."""
+        daftar_entri = []
+        for nama in os.listdir(self.direktori):
+            if nama.endswith(".json"):
+                entri = self.ambil(nama[:-len(".json")])
+                if entri is not None:
+                    daftar_entri.append(entri)
+        daftar_entri.sort(key=lambda entri: entri["waktu"])
+        return daftar_entri
+
+
+def jurnal_dari_lingkungan():
+    """
+    Buat jurnal dari variabel lingkungan AZURE_JURNAL_DIR (default ".jurnal_operasi").
+    Kembalikan None jika AZURE_JURNAL_DIR dikosongkan (jurnal dinonaktifkan).
+    """
+    jurnal_dir = os.getenv("AZURE_JURNAL_DIR", ".jurnal_operasi")
+    if not jurnal_dir:
+        return None
+    return JurnalOperasi(jurnal_dir)
+
+
+def polling_interval_dari_lingkungan():
+    """
+    Jeda polling (detik) dari variabel lingkungan AZURE_POLLING_INTERVAL, atau None (default SDK).
+    Jeda ini dipakai jika layanan tidak mengirim header Retry-After.
+    """
+    nilai = os.getenv("AZURE_POLLING_INTERVAL")
+    return float(nilai) if nilai else None
+
+
+def lanjutkan_semua(client, jurnal, cache, polling_interval=None):
+    """
+    Lanjutkan semua operasi di jurnal dan simpan hasilnya ke cache dengan kunci yang sama, sehingga lembar
+    tersebut diambil dari cache saat diproses lagi. Kembalikan (jumlah berhasil, jumlah gagal).
+    """
+    opsi = {"polling_interval": polling_interval} if polling_interval is not None else {}
+    berhasil = gagal = 0
+    for entri in jurnal.daftar():
+        kunci = entri["kunci"]
+        try:
+            if entri.get("token") is None:
+                # Operasi mode proyeksi: respons mentah langsung ditulis ke file cache
+                tunggu_dan_simpan(client, entri["model_id"], entri["id_operasi"], cache, kunci, polling_interval)
+                jurnal.hapus(kunci)
+                berhasil += 1
+                print(f"{kunci[:12]}: hasil disimpan ke cache")
+                continue
+            poller = client.begin_analyze_document(entri["model_id"], None, continuation_token=entri["token"], **opsi)
+            result = poller.result()
+        except HttpResponseError as e:
+            # Operasi kedaluwarsa atau gagal: tidak dapat dilanjutkan, lembar akan dikirim ulang
+            print(f"{kunci[:12]}: tidak dapat dilanjutkan ({e.status_code}), entri dihapus")
+            jurnal.hapus(kunci)
+            gagal += 1
+            continue
+        cache.simpan(kunci, result)
+        jurnal.hapus(kunci)
+        berhasil += 1
+        print(f"{kunci[:12]}: hasil disimpan ke cache")
+    return berhasil, gagal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daftar atau lanjutkan operasi analisis yang tertunda")
+    parser.add_argument("--lanjutkan", action="store_true", help="tunggu hasil semua operasi dan simpan ke cache")
+    parser.add_argument("--polling-interval", type=float,
+                        help="jeda polling (detik) jika layanan tidak mengirim Retry-After (default AZURE_POLLING_INTERVAL)")
+    args = parser.parse_args()
+
+    # Muat variabel lingkungan dari file .env
+    load_dotenv()
+    jurnal = jurnal_dari_lingkungan()
+    if jurnal is None:
+        parser.error("jurnal dinonaktifkan (AZURE_JURNAL_DIR kosong)")
+
+    if not args.lanjutkan:
+        sekarang = time.time()
+        for entri in jurnal.daftar():
+            umur = (sekarang - entri["waktu"]) / 60
+            print(f"{entri['kunci'][:12]}  {entri['model_id']}  {umur:.0f} menit lalu")
+        return
+
+    cache = cache_dari_lingkungan()
+    if cache is None:
+        parser.error("--lanjutkan membutuhkan cache analisis (AZURE_CACHE_DIR)")
+    client = DocumentIntelligenceClient(
+        endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+    )
+    polling_interval = args.polling_interval if args.polling_interval is not None else polling_interval_dari_lingkungan()
+    berhasil, gagal = lanjutkan_semua(client, jurnal, cache, polling_interval)
+    print(f"Selesai: {berhasil} dilanjutkan, {gagal} tidak dapat dilanjutkan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Kaskade detektor jawaban yang diurutkan berdasarkan biaya terukur.
+
+Detektor dijalankan dari yang termurah, dan setiap detektor hanya menerima nomor soal yang belum
+terselesaikan. Jawaban dengan skor minimal ambang_selesai dianggap yakin. Jawaban akhir setiap soal
+dipilih dengan aturan tetap: jawaban yakin dari detektor dengan prioritas tertinggi (urutan
+daftar_detektor saat penjadwal dibuat); jika tidak ada yang yakin, jawaban dengan skor tertinggi
+(skor sama dimenangkan prioritas lebih tinggi). Soal dianggap selesai begitu tidak ada detektor yang
+belum dijalankan yang dapat mengalahkan jawabannya. Jawaban yakin dari detektor murah yang prioritasnya
+di atas semua detektor yang tersisa langsung selesai, sehingga lembar bersih hanya membayar detektor
+pertama dan detektor geometri hanya menerima soal yang belum terjawab dengan yakin.
+
+Biaya per soal setiap detektor diukur setiap kali dijalankan (rata-rata bergerak eksponensial).
+Penjadwal yang sama dipakai ulang antar lembar, sehingga urutannya mengikuti biaya sebenarnya.
+Urutan hanya menentukan detektor mana yang perlu dijalankan, bukan jawaban yang dipilih: hasilnya
+sama dengan menjalankan semua detektor pada semua soal, asalkan jawaban detektor untuk satu soal
+tidak bergantung pada soal lain yang diminta.
+"""
+
+import threading
+import time
+
+from instrumentasi import hitung, span
+
+# Skor minimal jawaban yang dianggap yakin
+AMBANG_SELESAI = 0.6
+
+
+class Detektor:
+    """
+    Satu detektor dalam kaskade.
+    fungsi(konteks, soal) mengembalikan (jawaban, skor) berupa list sepanjang jumlah soal;
+    soal adalah himpunan nomor soal yang perlu dijawab. Jawaban satu soal tidak boleh bergantung
+    pada soal lain di himpunan itu. skor_maksimum adalah batas atas skor yang dapat diberikan.
+    """
+
+    __slots__ = ("nama", "fungsi", "biaya_per_soal", "jumlah_panggilan", "skor_maksimum", "prioritas")
+
+    def __init__(self, nama, fungsi, biaya_awal, skor_maksimum=1.0):
+        self.nama = nama
+        self.fungsi = fungsi
+        # Perkiraan biaya awal (detik per soal) sebelum ada pengukuran
+        self.biaya_per_soal = biaya_awal
+        self.jumlah_panggilan = 0
+        self.skor_maksimum = skor_maksimum
+        # Diisi PenjadwalDetektor dari urutan daftar_detektor (0 = prioritas tertinggi)
+        self.prioritas = 0
+
+    def kunci(self, skor, ambang_selesai):
+        """
+        Kunci pembanding jawaban. Jawaban yakin (skor >= ambang_selesai) mengalahkan yang tidak yakin dan
+        dibandingkan berdasarkan prioritas; jawaban tidak yakin berdasarkan skor, lalu prioritas.
+        Kunci naik bersama skor, sehingga kunci(skor_maksimum) adalah kunci tertinggi detektor ini.
+        """
+        if skor >= ambang_selesai:
+            return (1, -self.prioritas, skor)
+        return (0, skor, -self.prioritas)
+
+
+class PenjadwalDetektor:
+    """Urutkan detektor berdasarkan biaya per soal yang terukur dan jalankan sebagai kaskade."""
+
+    def __init__(self, daftar_detektor, bobot_baru=0.2, ambang_selesai=AMBANG_SELESAI):
+        self.daftar_detektor = list(daftar_detektor)
+        for prioritas, detektor in enumerate(self.daftar_detektor):
+            detektor.prioritas = prioritas
+        self.bobot_baru = bobot_baru
+        self.ambang_selesai = ambang_selesai
+        self._lock = threading.Lock()
+
+    def urutan(self):
+        """Detektor terurut dari biaya per soal terendah."""
+        with self._lock:
+            return sorted(self.daftar_detektor, key=lambda d: d.biaya_per_soal)
+
+    def catat_biaya(self, detektor, durasi, jumlah_soal):
+        biaya = durasi / max(jumlah_soal, 1)
+        with self._lock:
+            if detektor.jumlah_panggilan == 0:
+                detektor.biaya_per_soal = biaya
+            else:
+                detektor.biaya_per_soal += self.bobot_baru * (biaya - detektor.biaya_per_soal)
+            detektor.jumlah_panggilan += 1
+
+    def jalankan(self, konteks, jumlah_soal=40):
+        """
+        Jalankan kaskade untuk satu lembar.
+        Kembalikan (jawaban, skor, metode) berupa list sepanjang jumlah_soal; metode berisi nama
+        detektor yang memberi jawaban terpilih, atau "-" jika soal tidak terjawab.
+        """
+        jawaban = ["-"] * jumlah_soal
+        skor = [0.0] * jumlah_soal
+        metode = ["-"] * jumlah_soal
+        kunci = [None] * jumlah_soal
+        belum_selesai = set(range(1, jumlah_soal + 1))
+        sisa = self.urutan()
+
+        while sisa and belum_selesai:
+            detektor = sisa.pop(0)
+            soal = frozenset(belum_selesai)
+            mulai = time.perf_counter()
+            with span(f"deteksi_{detektor.nama}"):
+                jawaban_detektor, skor_detektor = detektor.fungsi(konteks, soal)
+            durasi = time.perf_counter() - mulai
+            self.catat_biaya(detektor, durasi, len(soal))
+            hitung(f"soal_diproses_{detektor.nama}", len(soal))
+
+            # Kunci tertinggi yang masih dapat diberikan detektor yang belum dijalankan
+            batas = max((d.kunci(d.skor_maksimum, self.ambang_selesai) for d in sisa), default=None)
+            for nomor_soal in soal:
+                i = nomor_soal - 1
+                if jawaban_detektor[i] != "-":
+                    kunci_detektor = detektor.kunci(skor_detektor[i], self.ambang_selesai)
+                    if kunci[i] is None or kunci_detektor > kunci[i]:
+                        jawaban[i] = jawaban_detektor[i]
+                        skor[i] = skor_detektor[i]
+                        metode[i] = detektor.nama
+                        kunci[i] = kunci_detektor
+                if kunci[i] is not None and (batas is None or kunci[i] > batas):
+                    belum_selesai.discard(nomor_soal)
+
+            print(f"Detektor {detektor.nama}: {len(soal)} soal diproses, "
+                  f"{len(soal) - len(belum_selesai)} terselesaikan ({durasi * 1000:.1f} ms)")
+
+        if belum_selesai:
+            print(f"{len(belum_selesai)} soal belum terselesaikan setelah semua detektor dijalankan")
+
+        return jawaban, skor, metode
@@ -0,0 +1,427 @@
+"""
+Layanan penilaian lembar jawaban berbasis HTTP.
+
+Proses layanan hanya dimulai sekali: import SDK, pembuatan DocumentIntelligenceClient (beserta koneksi
+TLS-nya), dan cache hasil analisis dipakai ulang untuk semua lembar. Upload masuk ke antrean berukuran
+terbatas dan diproses oleh sekumpulan worker, sehingga waktu per lembar tinggal waktu analisis Azure
+ditambah beberapa milidetik untuk penilaian.
+
+Endpoint:
+  POST /jobs[?siswa=<id>]    isi body = file lembar jawaban (gambar/PDF) -> 202 {"job_id": ...}
+                             siswa (opsional) dicatat bersama hasil di database hasil
+                             503 jika antrean penuh, 413 jika file terlalu besar
+  GET  /jobs/<job_id>        status job: antri, diproses, selesai, atau gagal
+  GET  /jobs/<job_id>/hasil  hasil penilaian (200), 409 jika job belum selesai
+  GET  /kesehatan            ukuran antrean, jumlah worker, dan statistik cache
+  GET  /metrik               histogram durasi per tahap dan counter dalam format teks Prometheus
+
+Contoh:
+  python layanan_penilaian.py --port 8080 --worker 4
+  python layanan_penilaian.py --roi-file roi.json   # potong lembar ke ROI tabel jawaban setelah 3 lembar
+  curl --data-binary @lembar.jpg http://127.0.0.1:8080/jobs
+  curl --data-binary @lembar.jpg "http://127.0.0.1:8080/jobs?siswa=12"
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+from cache_analisis import analisis_dengan_cache, cache_dari_lingkungan
+from ekspor_hasil import buka_penulis_hasil
+from instrumentasi import AgregatPrometheus, Instrumentasi, tulis_jsonl
+from jurnal_operasi import jurnal_dari_lingkungan, polling_interval_dari_lingkungan
+from penilaian import KUNCI_JAWABAN, nilai_lembar
+from roi_lembar import PembelajarROI, analisis_dengan_roi
+from penyimpanan_hasil import UJIAN_DEFAULT, PenyimpananHasil, id_ujian_dari_path
+from skema_ujian import SKEMA_DEFAULT, muat_ujian
+from template_lembar import cache_template_dari_lingkungan
+
+STATUS_ANTRI = "antri"
+STATUS_DIPROSES = "diproses"
+STATUS_SELESAI = "selesai"
+STATUS_GAGAL = "gagal"
+
+# Batas ukuran file yang diterima per upload (dalam byte)
+BATAS_UKURAN_UPLOAD_DEFAULT = 50 * 1024 * 1024
+
+
+class _KeluaranPerThread:
+    """
+    Pengganti sys.stdout yang membuang keluaran print dari thread worker.
+    Fungsi penilaian mencetak banyak log per lembar; tanpa ini log dari beberapa worker akan bercampur.
+    """
+
+    def __init__(self, asli):
+        self.asli = asli
+        self._lokal = threading.local()
+
+    def bisukan(self, aktif):
+        self._lokal.bisu = aktif
+
+    def write(self, teks):
+        if getattr(self._lokal, "bisu", False):
+            return len(teks)
+        return self.asli.write(teks)
+
+    def flush(self):
+        self.asli.flush()
+
+    def __getattr__(self, nama):
+        return getattr(self.asli, nama)
+
+
+class Job:
+    """Satu permintaan penilaian beserta status dan hasilnya."""
+
+    __slots__ = ("id", "status", "file_bytes", "siswa", "hasil", "galat", "metrik",
+                 "waktu_masuk", "waktu_mulai", "waktu_selesai")
+
+    def __init__(self, file_bytes, siswa=None):
+        self.id = uuid.uuid4().hex
+        self.status = STATUS_ANTRI
+        self.file_bytes = file_bytes
+        # Identitas siswa (opsional) untuk riwayat per siswa di database hasil
+        self.siswa = siswa
+        self.hasil = None
+        self.galat = None
+        self.metrik = None
+        self.waktu_masuk = time.time()
+        self.waktu_mulai = None
+        self.waktu_selesai = None
+
+    def ringkasan(self):
+        """Status job dalam bentuk dict yang dapat diserialisasi ke JSON."""
+        data = {"job_id": self.id, "status": self.status}
+        if self.siswa is not None:
+            data["siswa"] = self.siswa
+        if self.waktu_mulai is not None:
+            data["waktu_antri"] = round(self.waktu_mulai - self.waktu_masuk, 4)
+        if self.waktu_selesai is not None:
+            data["waktu_proses"] = round(self.waktu_selesai - self.waktu_mulai, 4)
+        if self.galat is not None:
+            data["galat"] = self.galat
+        return data
+
+
+class LayananPenilaian:
+    """
+    Antrean job terbatas dengan sekumpulan worker yang memakai satu client dan cache bersama.
+    Job yang sudah selesai disimpan sampai jumlahnya melebihi maks_job_tersimpan (yang terlama dibuang).
+    """
+
+    def __init__(self, client, cache=None, jumlah_worker=2, ukuran_antrean=32,
+                 maks_job_tersimpan=1000, kunci_jawaban=None, model_id="prebuilt-layout", verbose=False,
+                 metrik_jsonl=None, pembelajar_roi=None, cache_template=None, skema=None, penulis_hasil=None,
+                 penyimpanan=None, id_ujian=UJIAN_DEFAULT, jurnal=None, polling_interval=None):
+        self.client = client
+        self.cache = cache
+        # JurnalOperasi (opsional): operasi yang tertinggal saat layanan mati dilanjutkan tanpa unggah ulang
+        self.jurnal = jurnal
+        self.polling_interval = polling_interval
+        self.jumlah_worker = jumlah_worker
+        self.maks_job_tersimpan = maks_job_tersimpan
+        # Tanpa skema dan kunci dipakai KUNCI_JAWABAN (40 soal A-D); skema tanpa kunci: lembar tidak dinilai
+        self.kunci_jawaban = KUNCI_JAWABAN if kunci_jawaban is None and skema is None else kunci_jawaban
+        # SkemaUjian (opsional): jumlah soal dan pilihan jawaban, default 40 soal A-D
+        self.skema = skema
+        self.model_id = model_id
+        self.verbose = verbose
+        self.metrik_jsonl = metrik_jsonl
+        self.agregat_metrik = AgregatPrometheus()
+        # PembelajarROI dan CacheTemplate bersama semua worker (opsional)
+        self.pembelajar_roi = pembelajar_roi
+        self.cache_template = cache_template
+        # Penulis CSV/Parquet (opsional): satu baris per lembar yang selesai dinilai
+        self.penulis_hasil = penulis_hasil
+        # PenyimpananHasil SQLite (opsional): lembar selesai maupun gagal dicatat dengan id_ujian
+        self.penyimpanan = penyimpanan
+        self.id_ujian = id_ujian
+
+        self.antrean = queue.Queue(maxsize=ukuran_antrean)
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._lock_metrik = threading.Lock()
+        self._worker = []
+
+        if not verbose and not isinstance(sys.stdout, _KeluaranPerThread):
+            sys.stdout = _KeluaranPerThread(sys.stdout)
+
+    def mulai(self):
+        """Jalankan thread worker."""
+        for i in range(self.jumlah_worker):
+            t = threading.Thread(target=self._jalankan_worker, name=f"worker-penilaian-{i}", daemon=True)
+            t.start()
+            self._worker.append(t)
+
+    def hentikan(self):
+        """Hentikan semua worker setelah job yang sedang diproses selesai."""
+        for _ in self._worker:
+            self.antrean.put(None)
+        for t in self._worker:
+            t.join()
+        self._worker = []
+        if self.penulis_hasil is not None:
+            self.penulis_hasil.tutup()
+        if self.penyimpanan is not None:
+            self.penyimpanan.tutup()
+
+    def kirim(self, file_bytes, siswa=None):
+        """Masukkan file (opsional dengan identitas siswa) ke antrean. Kembalikan Job, atau None jika antrean penuh."""
+        job = Job(file_bytes, siswa)
+        with self._lock:
+            try:
+                self.antrean.put_nowait(job)
+            except queue.Full:
+                return None
+            self.jobs[job.id] = job
+            self._buang_job_lama()
+        return job
+
+    def ambil_job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _buang_job_lama(self):
+        # Hanya job yang sudah selesai/gagal yang dibuang, mulai dari yang paling lama
+        if len(self.jobs) <= self.maks_job_tersimpan:
+            return
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.maks_job_tersimpan:
+                break
+            if self.jobs[job_id].status in (STATUS_SELESAI, STATUS_GAGAL):
+                del self.jobs[job_id]
+
+    def _jalankan_worker(self):
+        if isinstance(sys.stdout, _KeluaranPerThread):
+            sys.stdout.bisukan(True)
+        while True:
+            job = self.antrean.get()
+            if job is None:
+                break
+            self.proses(job)
+
+    def proses(self, job):
+        """Analisis dan nilai satu job; hasil atau pesan galat disimpan pada job."""
+        job.status = STATUS_DIPROSES
+        job.waktu_mulai = time.time()
+        instrumentasi = Instrumentasi(lembar=job.id)
+        try:
+            with instrumentasi.aktif():
+                if self.pembelajar_roi is not None:
+                    result = analisis_dengan_roi(self.client, job.file_bytes, self.pembelajar_roi, self.model_id, self.cache,
+                                                 jurnal=self.jurnal, polling_interval=self.polling_interval)
+                else:
+                    result = analisis_dengan_cache(self.client, job.file_bytes, self.model_id, self.cache,
+                                                   self.jurnal, self.polling_interval)
+                job.hasil = nilai_lembar(result, self.kunci_jawaban, bandingkan_himpunan=False,
+                                         cache_template=self.cache_template, skema=self.skema)
+            job.status = STATUS_SELESAI
+            if self.penulis_hasil is not None:
+                self.penulis_hasil.tulis(job.id, job.hasil)
+            if self.penyimpanan is not None:
+                self.penyimpanan.tambah(job.id, job.hasil, self.id_ujian, siswa=job.siswa)
+        except Exception as e:
+            job.galat = f"{type(e).__name__}: {e}"
+            job.status = STATUS_GAGAL
+            if self.penyimpanan is not None:
+                # Galat penyimpanan (misalnya DB terkunci) tidak boleh menghentikan thread worker
+                try:
+                    self.penyimpanan.tambah(job.id, None, self.id_ujian, siswa=job.siswa, galat=job.galat)
+                except Exception as e_simpan:
+                    print(f"Gagal mencatat job {job.id} ke penyimpanan: {type(e_simpan).__name__}: {e_simpan}",
+                          file=sys.stderr)
+        finally:
+            # File tidak dibutuhkan lagi setelah diproses
+            job.file_bytes = None
+            job.waktu_selesai = time.time()
+            self._catat_metrik(job, instrumentasi)
+
+    def _catat_metrik(self, job, instrumentasi):
+        job.metrik = instrumentasi.rekaman()
+        job.metrik["status"] = job.status
+        self.agregat_metrik.tambah(job.metrik)
+        if self.metrik_jsonl:
+            with self._lock_metrik:
+                tulis_jsonl(self.metrik_jsonl, job.metrik)
+
+    def kesehatan(self):
+        with self._lock:
+            job_tersimpan = len(self.jobs)
+        data = {
+            "antrean": self.antrean.qsize(),
+            "kapasitas_antrean": self.antrean.maxsize,
+            "worker": self.jumlah_worker,
+            "job_tersimpan": job_tersimpan,
+        }
+        if self.cache is not None:
+            data["cache"] = self.cache.statistik()
+        if self.cache_template is not None:
+            data["template"] = self.cache_template.statistik()
+        if self.pembelajar_roi is not None:
+            data["roi"] = self.pembelajar_roi.roi()
+        return data
+
+
+class PenanganPermintaan(BaseHTTPRequestHandler):
+    """Handler HTTP; objek LayananPenilaian diambil dari atribut server."""
+
+    def _kirim_json(self, kode, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(kode)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._kirim_json(404, {"galat": "endpoint tidak ditemukan"})
+            return
+        siswa = parse_qs(url.query).get("siswa", [None])[0] or None
+
+        panjang = int(self.headers.get("Content-Length") or 0)
+        if panjang <= 0:
+            self._kirim_json(400, {"galat": "body kosong, kirim isi file lembar jawaban"})
+            return
+        if panjang > self.server.batas_ukuran_upload:
+            self._kirim_json(413, {"galat": "file terlalu besar"})
+            return
+
+        file_bytes = self.rfile.read(panjang)
+        job = self.server.layanan.kirim(file_bytes, siswa)
+        if job is None:
+            self._kirim_json(503, {"galat": "antrean penuh, coba lagi nanti"})
+            return
+        self._kirim_json(202, job.ringkasan())
+
+    def do_GET(self):
+        bagian = [b for b in self.path.split("?")[0].split("/") if b]
+        layanan = self.server.layanan
+
+        if bagian == ["kesehatan"]:
+            self._kirim_json(200, layanan.kesehatan())
+            return
+
+        if bagian == ["metrik"]:
+            body = layanan.agregat_metrik.teks().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if len(bagian) in (2, 3) and bagian[0] == "jobs":
+            job = layanan.ambil_job(bagian[1])
+            if job is None:
+                self._kirim_json(404, {"galat": "job tidak ditemukan"})
+            elif len(bagian) == 2:
+                self._kirim_json(200, job.ringkasan())
+            elif bagian[2] != "hasil":
+                self._kirim_json(404, {"galat": "endpoint tidak ditemukan"})
+            elif job.status == STATUS_SELESAI:
+                self._kirim_json(200, dict(job.ringkasan(), hasil=job.hasil, metrik=job.metrik))
+            elif job.status == STATUS_GAGAL:
+                self._kirim_json(500, job.ringkasan())
+            else:
+                self._kirim_json(409, job.ringkasan())
+            return
+
+        self._kirim_json(404, {"galat": "endpoint tidak ditemukan"})
+
+    def log_message(self, format, *args):
+        if self.server.layanan.verbose:
+            super().log_message(format, *args)
+
+
+def buat_server(layanan, host="127.0.0.1", port=8080, batas_ukuran_upload=BATAS_UKURAN_UPLOAD_DEFAULT):
+    """Buat ThreadingHTTPServer yang meneruskan permintaan ke layanan."""
+    server = ThreadingHTTPServer((host, port), PenanganPermintaan)
+    server.layanan = layanan
+    server.batas_ukuran_upload = batas_ukuran_upload
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan HTTP penilaian lembar jawaban")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--worker", type=int, default=2, help="jumlah worker penilaian")
+    parser.add_argument("--ukuran-antrean", type=int, default=32, help="kapasitas antrean job")
+    parser.add_argument("--maks-job", type=int, default=1000, help="jumlah job yang hasilnya disimpan")
+    parser.add_argument("--batas-upload-mb", type=int, default=BATAS_UKURAN_UPLOAD_DEFAULT // (1024 * 1024))
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log penilaian dan log HTTP")
+    parser.add_argument("--metrik-jsonl", help="tambahkan metrik per lembar ke file JSON lines ini")
+    parser.add_argument("--roi-file", help="pelajari ROI tabel jawaban, simpan/muat di file JSON ini")
+    parser.add_argument("--roi-sampel", type=int, default=3, help="jumlah lembar penuh sebelum ROI dipakai")
+    parser.add_argument("--ujian", help="file ujian JSON berisi jumlah soal, pilihan, dan kunci jawaban")
+    parser.add_argument("--ekspor", help="tulis satu baris per lembar ke file CSV atau .parquet ini")
+    parser.add_argument("--db", help="simpan hasil per lembar dan per soal ke database SQLite ini")
+    parser.add_argument("--polling-interval", type=float,
+                        help="jeda polling (detik) jika layanan tidak mengirim Retry-After (default AZURE_POLLING_INTERVAL)")
+    args = parser.parse_args()
+    skema, kunci_jawaban = muat_ujian(args.ujian) if args.ujian else (None, None)
+    id_ujian = id_ujian_dari_path(args.ujian)
+
+    penyimpanan = None
+    if args.db:
+        penyimpanan = PenyimpananHasil(args.db)
+        if skema is None:
+            penyimpanan.simpan_kunci(id_ujian, SKEMA_DEFAULT, KUNCI_JAWABAN)
+        elif kunci_jawaban is not None:
+            penyimpanan.simpan_kunci(id_ujian, skema, kunci_jawaban)
+
+    # Muat variabel lingkungan dari file .env
+    load_dotenv()
+
+    # Client dibuat sekali dan dipakai bersama oleh semua worker
+    client = DocumentIntelligenceClient(
+        endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+    )
+
+    layanan = LayananPenilaian(
+        client,
+        cache=cache_dari_lingkungan(),
+        jurnal=jurnal_dari_lingkungan(),
+        polling_interval=args.polling_interval if args.polling_interval is not None else polling_interval_dari_lingkungan(),
+        cache_template=cache_template_dari_lingkungan(),
+        kunci_jawaban=kunci_jawaban,
+        skema=skema,
+        jumlah_worker=args.worker,
+        ukuran_antrean=args.ukuran_antrean,
+        maks_job_tersimpan=args.maks_job,
+        verbose=args.verbose,
+        metrik_jsonl=args.metrik_jsonl,
+        pembelajar_roi=PembelajarROI.muat(args.roi_file, jumlah_sampel=args.roi_sampel) if args.roi_file else None,
+        penulis_hasil=buka_penulis_hasil(args.ekspor) if args.ekspor else None,
+        penyimpanan=penyimpanan,
+        id_ujian=id_ujian,
+    )
+    layanan.mulai()
+
+    server = buat_server(layanan, args.host, args.port, args.batas_upload_mb * 1024 * 1024)
+    print(f"Layanan penilaian berjalan di http://{args.host}:{args.port} ({args.worker} worker)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        layanan.hentikan()
+
+
+if __name__ == "__main__":
+    main()
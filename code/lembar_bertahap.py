@@ -0,0 +1,201 @@
+"""
+Penilaian bertahap untuk PDF berisi banyak lembar jawaban (satu kelas dalam satu file).
+
+`AnalyzeResult` dipecah per siswa berdasarkan page_number (default satu halaman per siswa, atau
+beberapa halaman per siswa). Setiap siswa dinilai lewat generator: indeks tabel, geometri, dan tanda
+silang hanya dibangun untuk halaman siswa tersebut, lalu dilepas sebelum siswa berikutnya diproses,
+sehingga memori tambahan tidak bertambah dengan jumlah halaman.
+
+Dengan --proyeksi, respons Azure (atau entri cache) diurai bertahap menjadi proyeksi ramping berisi
+bagian yang dipakai penilaian saja, sehingga model SDK lengkap untuk seluruh PDF tidak pernah dibangun.
+
+Contoh:
+  python lembar_bertahap.py kelas.pdf --halaman-per-siswa 2 --output hasil.jsonl --proyeksi
+  python lembar_bertahap.py kelas.pdf --profile profil/ --profile-lembar 5   # profil siswa terlambat
+"""
+
+import argparse
+import contextlib
+import json
+import os
+
+from dotenv import load_dotenv
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+from cache_analisis import analisis_dengan_cache, cache_dari_lingkungan
+from ekspor_hasil import buka_penulis_hasil
+from jurnal_operasi import jurnal_dari_lingkungan, polling_interval_dari_lingkungan
+from masukan_dokumen import DokumenFile
+from penilaian import KUNCI_JAWABAN, nilai_lembar
+from penyimpanan_hasil import PenyimpananHasil, id_ujian_dari_path
+from profil_lembar import JUMLAH_LEMBAR_DEFAULT, ProfilLembar
+from proyeksi_hasil import analisis_proyeksi
+from skema_ujian import SKEMA_DEFAULT, muat_ujian
+from template_lembar import cache_template_dari_lingkungan
+
+
+def halaman_tabel(table):
+    """Nomor halaman sebuah tabel (dari bounding region tabel atau sel pertamanya), None jika tidak diketahui."""
+    for sumber in [table] + list(table.cells[:1]):
+        regions = getattr(sumber, 'bounding_regions', None)
+        if regions:
+            page_number = getattr(regions[0], 'page_number', None)
+            if page_number is not None:
+                return page_number
+    return None
+
+
+class HasilHalaman:
+    """
+    Tampilan AnalyzeResult yang hanya memuat halaman tertentu beserta tabel di halaman tersebut.
+    Objek halaman dan tabel tidak disalin; hanya referensinya yang dipilih.
+    """
+
+    def __init__(self, pages, tables, styles=None):
+        self.pages = pages
+        self.tables = tables
+        self.styles = styles or []
+
+
+def kelompok_halaman(result, halaman_per_siswa=1):
+    """
+    Bagi halaman menjadi kelompok berisi halaman_per_siswa halaman berurutan (urut page_number).
+    Hasilkan (nomor_siswa, HasilHalaman) satu per satu. Tabel tanpa nomor halaman dimasukkan ke
+    kelompok pertama.
+    """
+    if halaman_per_siswa < 1:
+        raise ValueError("halaman_per_siswa minimal 1")
+
+    pages = sorted(result.pages or [], key=lambda page: page.page_number)
+
+    # Indeks tabel per halaman dibangun sekali untuk seluruh dokumen
+    tabel_per_halaman = {}
+    for table in result.tables or []:
+        tabel_per_halaman.setdefault(halaman_tabel(table), []).append(table)
+    tabel_tanpa_halaman = tabel_per_halaman.pop(None, [])
+
+    # Gaya tulisan (tulisan tangan) tidak dipecah per halaman
+    styles = result.styles or []
+
+    for nomor_siswa, awal in enumerate(range(0, len(pages), halaman_per_siswa), start=1):
+        pages_siswa = pages[awal:awal + halaman_per_siswa]
+        tables = list(tabel_tanpa_halaman) if nomor_siswa == 1 else []
+        for page in pages_siswa:
+            tables.extend(tabel_per_halaman.get(page.page_number, ()))
+        yield nomor_siswa, HasilHalaman(pages_siswa, tables, styles)
+
+
+def nilai_per_siswa(result, kunci_jawaban=None, halaman_per_siswa=1, verbose=False, penjadwal=None,
+                    cache_template=None, skema=None, profil=None):
+    """
+    Generator penilaian per siswa untuk hasil analisis multi-halaman.
+    Hasilkan dict hasil nilai_lembar ditambah "siswa" (nomor urut) dan "halaman" (daftar page_number)
+    segera setelah setiap siswa selesai dinilai. Log rinci penilaian hanya dicetak jika verbose.
+    Dengan cache_template, struktur tabel jawaban cukup diturunkan sekali untuk satu kelas.
+    skema (SkemaUjian, opsional) menentukan jumlah soal dan pilihan jawaban.
+    profil (ProfilLembar, opsional) memprofilkan penilaian setiap siswa.
+    """
+    for nomor_siswa, hasil_halaman in kelompok_halaman(result, halaman_per_siswa):
+        konteks_profil = profil.lembar(f"siswa-{nomor_siswa}") if profil is not None else contextlib.nullcontext()
+        if verbose:
+            with konteks_profil:
+                hasil = nilai_lembar(hasil_halaman, kunci_jawaban, penjadwal, bandingkan_himpunan=False,
+                                     cache_template=cache_template, skema=skema)
+        else:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), konteks_profil:
+                hasil = nilai_lembar(hasil_halaman, kunci_jawaban, penjadwal, bandingkan_himpunan=False,
+                                     cache_template=cache_template, skema=skema)
+
+        hasil["siswa"] = nomor_siswa
+        hasil["halaman"] = [page.page_number for page in hasil_halaman.pages]
+        yield hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nilai PDF berisi banyak lembar jawaban, satu siswa per kelompok halaman")
+    parser.add_argument("file", help="file PDF hasil scan satu kelas")
+    parser.add_argument("--halaman-per-siswa", type=int, default=1)
+    parser.add_argument("--output", help="tulis hasil per siswa ke file JSON lines ini")
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log penilaian rinci setiap siswa")
+    parser.add_argument("--ujian", help="file ujian JSON berisi jumlah soal, pilihan, dan kunci jawaban")
+    parser.add_argument("--ekspor", help="tulis satu baris per siswa ke file CSV atau .parquet ini")
+    parser.add_argument("--db", help="simpan hasil per siswa dan per soal ke database SQLite ini")
+    parser.add_argument("--proyeksi", action="store_true",
+                        help="urai respons secara bertahap menjadi proyeksi ramping (hemat memori untuk PDF besar)")
+    parser.add_argument("--polling-interval", type=float,
+                        help="jeda polling (detik) jika layanan tidak mengirim Retry-After (default AZURE_POLLING_INTERVAL)")
+    parser.add_argument("--profile", metavar="DIREKTORI",
+                        help="profilkan penilaian setiap siswa (cProfile + tracemalloc), simpan yang terlambat di sini")
+    parser.add_argument("--profile-lembar", type=int, default=JUMLAH_LEMBAR_DEFAULT,
+                        help="jumlah siswa terlambat yang profilnya disimpan")
+    parser.add_argument("--siswa", metavar="FILE",
+                        help="file berisi id siswa satu per baris, urut sesuai lembar di PDF (disimpan ke --db)")
+    args = parser.parse_args()
+    skema, kunci_jawaban = muat_ujian(args.ujian) if args.ujian else (None, None)
+    id_ujian = id_ujian_dari_path(args.ujian)
+    # Nomor urut lembar di PDF bukan id siswa: tanpa --siswa, lembar disimpan tanpa id siswa
+    daftar_siswa = []
+    if args.siswa:
+        with open(args.siswa, "r", encoding="utf-8") as f:
+            daftar_siswa = [baris.strip() for baris in f if baris.strip()]
+
+    # Muat variabel lingkungan dari file .env
+    load_dotenv()
+
+    client = DocumentIntelligenceClient(
+        endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+    )
+    # PDF satu kelas bisa berukuran puluhan MB: file dialirkan dari disk, tidak dibaca utuh ke memori
+    dokumen = DokumenFile(args.file)
+    # Analisis PDF satu kelas lama; jika proses mati saat menunggu, operasinya dilanjutkan dari jurnal
+    polling_interval = args.polling_interval if args.polling_interval is not None else polling_interval_dari_lingkungan()
+    analisis = analisis_proyeksi if args.proyeksi else analisis_dengan_cache
+    result = analisis(client, dokumen, "prebuilt-layout", cache_dari_lingkungan(), jurnal_dari_lingkungan(),
+                      polling_interval)
+
+    # Profil hanya dibuat dengan --profile; tanpa itu penilaian berjalan tanpa hook profil sama sekali
+    profil = ProfilLembar(args.profile, args.profile_lembar) if args.profile else None
+    hasil_per_siswa = nilai_per_siswa(
+        result, kunci_jawaban, halaman_per_siswa=args.halaman_per_siswa, verbose=args.verbose,
+        cache_template=cache_template_dari_lingkungan(), skema=skema, profil=profil,
+    )
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    penulis = buka_penulis_hasil(args.ekspor) if args.ekspor else None
+    penyimpanan = None
+    if args.db:
+        penyimpanan = PenyimpananHasil(args.db)
+        # Skema tanpa kunci: hasil disimpan tanpa skor, kunci disimpan nanti lewat --nilai-ulang
+        if skema is None:
+            penyimpanan.simpan_kunci(id_ujian, SKEMA_DEFAULT, KUNCI_JAWABAN)
+        elif kunci_jawaban is not None:
+            penyimpanan.simpan_kunci(id_ujian, skema, kunci_jawaban)
+    try:
+        for hasil in hasil_per_siswa:
+            skor = "belum dinilai" if hasil["skor"] is None else f"skor {hasil['skor']}/{hasil['jumlah_soal']}"
+            print(f"Siswa {hasil['siswa']} (halaman {hasil['halaman']}): "
+                  f"{skor}, tidak terdeteksi {len(hasil['tidak_terdeteksi'])}")
+            if output:
+                output.write(json.dumps(hasil, ensure_ascii=False) + "\n")
+                output.flush()
+            if penulis:
+                penulis.tulis(hasil["siswa"], hasil)
+            if penyimpanan:
+                nomor = hasil["siswa"]
+                siswa = daftar_siswa[nomor - 1] if nomor <= len(daftar_siswa) else None
+                penyimpanan.tambah(f"{args.file}#{nomor}", hasil, id_ujian, siswa=siswa)
+    finally:
+        if output:
+            output.close()
+        if penulis:
+            penulis.tutup()
+        if penyimpanan:
+            penyimpanan.tutup()
+        if profil:
+            terlambat = profil.tulis()
+            print(f"Profil {len(terlambat)} siswa terlambat ditulis ke {args.profile} (lihat ringkasan.txt)")
+
+
+if __name__ == "__main__":
+    main()
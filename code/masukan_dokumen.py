@@ -0,0 +1,81 @@
+"""
+Masukan dokumen dari disk tanpa memuat seluruh isi file ke memori.
+
+Sebelumnya setiap lembar dibaca utuh dengan f.read() lalu dibungkus AnalyzeDocumentRequest(bytes_source=...),
+sehingga satu dokumen yang sedang diproses menempati memori beberapa kali ukuran filenya: bytes mentah,
+string base64 (4/3 kali), dan body JSON permintaan. DokumenFile menggantikannya:
+- kunci cache dihitung dengan membaca file per blok ke satu buffer yang dipakai ulang, dan disimpan
+  sehingga file hanya dibaca sekali untuk cache, jurnal, dan deduplikasi dalam batch;
+- body unggahan adalah file itu sendiri (application/octet-stream), yang dialirkan per blok oleh transport
+  HTTP SDK; retry SDK memutar balik posisi file sebelum mengirim ulang.
+
+Hash harus selesai sebelum unggah agar cache dapat diperiksa lebih dulu, sehingga unggahan membaca file
+untuk kedua kalinya, dari page cache sistem operasi dan tanpa salinan di heap Python.
+
+Contoh:
+    python masukan_dokumen.py lembar/*.pdf   # cetak ukuran dan kunci cache setiap file
+"""
+
+import argparse
+import os
+
+from cache_analisis import awal_kunci_cache
+
+# Ukuran blok baca untuk hashing (byte)
+UKURAN_BLOK = 1024 * 1024
+
+
+class DokumenFile:
+    """Dokumen di disk yang dianalisis langsung dari file-nya; lihat cache_analisis.body_unggahan()."""
+
+    __slots__ = ("path", "ukuran", "_kunci")
+
+    def __init__(self, path):
+        self.path = path
+        self.ukuran = os.path.getsize(path)
+        # (model_id, api_version) -> kunci cache
+        self._kunci = {}
+
+    def kunci_cache(self, model_id, api_version):
+        """Kunci cache yang sama dengan buat_kunci_cache(isi_file, model_id, api_version)."""
+        kunci = self._kunci.get((model_id, api_version))
+        if kunci is None:
+            h = awal_kunci_cache(model_id, api_version)
+            buffer = bytearray(min(UKURAN_BLOK, max(self.ukuran, 1)))
+            tampilan = memoryview(buffer)
+            with open(self.path, "rb", buffering=0) as f:
+                while True:
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    h.update(tampilan[:n])
+            kunci = self._kunci[(model_id, api_version)] = h.hexdigest()
+        return kunci
+
+    def buka(self):
+        """File terbuka (BufferedReader) untuk body unggahan; SDK mengirimnya sebagai application/octet-stream."""
+        return open(self.path, "rb")
+
+    def baca(self):
+        """Seluruh isi file sebagai bytes, untuk langkah yang memang membutuhkannya (praproses, ROI)."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def __repr__(self):
+        return f"DokumenFile({self.path!r}, {self.ukuran} byte)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cetak ukuran dan kunci cache dokumen tanpa memuat file ke memori")
+    parser.add_argument("file", nargs="+")
+    parser.add_argument("--model", default="prebuilt-layout")
+    parser.add_argument("--api-version", default="2024-11-30")
+    args = parser.parse_args()
+
+    for path in args.file:
+        dokumen = DokumenFile(path)
+        print(f"{dokumen.kunci_cache(args.model, args.api_version)}  {dokumen.ukuran:>10d}  {path}")
+
+
+if __name__ == "__main__":
+    main()
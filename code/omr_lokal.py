@@ -0,0 +1,577 @@
+"""
+Pembaca lembar jawaban lokal (OMR) yang memakai ulang geometri sel dari satu analisis Azure.
+
+Satu lembar referensi dianalisis dengan prebuilt-layout. Posisi sel pilihan setiap soal (posisi_jawaban dari
+analisis_posisi_jawaban) disimpan sebagai TataLetakOMR dalam koordinat ternormalisasi (0..1) terhadap halaman,
+bersama posisi garis tabel dan profil tinta gambar referensi. Lembar berikutnya dengan formulir yang sama
+dibaca langsung dari gambarnya, tanpa panggilan ke Azure:
+
+1. Registrasi per sumbu (skala dan geseran). Profil piksel tinta per baris dan per kolom seluruh halaman
+   dicocokkan dengan profil referensi (korelasi), sehingga geseran tepat satu baris tabel tidak ikut cocok.
+   Hasilnya lalu dihaluskan dengan mencocokkan garis tabel yang diketahui ke profil di dalam tabel. Skor
+   registrasi adalah proporsi garis tabel yang ditemukan.
+2. Rasio isi: proporsi piksel tinta di bagian dalam setiap sel pilihan (tepi sel dibuang agar garis tabel tidak
+   terhitung), dihitung sekaligus dengan integral image. Tinta huruf cetak dikurangi dengan kuartil bawah rasio
+   huruf yang sama di seluruh lembar.
+3. Keputusan per soal: pilihan dengan kelebihan isi terbesar jika melewati ambang_isi. Kepercayaan adalah
+   selisih relatif terhadap pilihan kedua (dua tanda menghasilkan kepercayaan rendah); untuk soal kosong,
+   jaraknya dari ambang.
+
+Lembar dianggap ambigu jika registrasi lemah atau kepercayaan salah satu soal di bawah ambang; hanya lembar
+ambigu yang dikirim ke Azure. Rotasi tidak diestimasi: scan yang miring membuat garis tabel tidak ditemukan,
+sehingga lembar tersebut dikirim ke Azure. PDF dan TIFF multi-halaman selalu dikirim ke Azure. Membutuhkan Pillow.
+
+Contoh:
+    python omr_lokal.py lembar/*.jpg --referensi lembar/001.jpg --tata-letak omr.json --ujian ujian.json \\
+        --output hasil.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from cache_analisis import analisis_dengan_cache, cache_dari_lingkungan
+from ekspor_hasil import buka_penulis_hasil
+from geometri_lembar import SheetGeometry
+from indeks_tabel import buat_indeks_tabel
+from instrumentasi import hitung, span
+from masukan_dokumen import DokumenFile
+from penilaian import KUNCI_JAWABAN, analisis_posisi_jawaban, cocokkan_jawaban, nilai_lembar
+from penyimpanan_hasil import PenyimpananHasil, id_ujian_dari_path
+from skema_ujian import SKEMA_DEFAULT, SkemaUjian, muat_ujian
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow hanya dibutuhkan jika lembar dibaca secara lokal
+    Image = None
+
+VERSI_TATA_LETAK = 1
+# Sisi terpanjang gambar kerja (piksel); gambar yang lebih besar diperkecil sebelum dibaca
+UKURAN_KERJA = 1600
+# Jumlah bin profil tinta referensi per sumbu
+JUMLAH_BIN_PROFIL = 256
+# Rentang pencarian registrasi kasar: skala 1 +- SKALA_MAKS dan geseran +- GESERAN_MAKS x ukuran halaman
+SKALA_MAKS = 0.04
+GESERAN_MAKS = 0.05
+# Tahap registrasi kasar: (sigma penghalusan profil dalam bin, langkah skala, langkah geseran dalam piksel
+# gambar kerja). Setiap tahap mencari +- dua langkah tahap sebelumnya di sekitar hasilnya
+TAHAP_REGISTRASI = ((4.0, 0.004, 4.0), (1.0, 0.001, 1.0), (0.0, 0.00025, 0.5))
+# Rentang penghalusan dengan garis tabel: skala +- LANGKAH_SKALA_HALUS x 2 dan geseran +- GESERAN_HALUS piksel
+LANGKAH_SKALA_HALUS = 0.00025
+GESERAN_HALUS = 3
+# Bagian tepi sel yang dibuang di setiap sisi saat mengukur isi, sebagai rasio ukuran sel
+TEPI_SEL = 0.2
+# Piksel lebih gelap dari rasio ini terhadap kecerahan kertas dianggap tinta (pensil dan pulpen)
+RASIO_TINTA = 0.6
+# Jarak maksimum (rasio halaman) antar tepi sel yang dianggap satu garis tabel
+TOLERANSI_GARIS = 0.004
+
+AMBANG_ISI = 0.06
+AMBANG_KEPERCAYAAN = 0.5
+AMBANG_KORELASI = 0.6
+AMBANG_REGISTRASI = 0.8
+
+
+def baca_gambar(sumber):
+    """
+    Gambar satu halaman (path atau bytes) sebagai array uint8 grayscale, diperkecil ke UKURAN_KERJA.
+    Kembalikan None untuk PDF dan gambar multi-halaman, yang tidak dapat dibaca secara lokal.
+    """
+    if Image is None:
+        raise RuntimeError("Pembacaan lembar lokal membutuhkan Pillow: pip install pillow")
+    if isinstance(sumber, bytes):
+        sumber = io.BytesIO(sumber)
+    with Image.open(sumber) as gambar:
+        if gambar.format == "PDF" or getattr(gambar, "n_frames", 1) > 1:
+            return None
+        gambar = gambar.convert("L")
+        gambar.thumbnail((UKURAN_KERJA, UKURAN_KERJA), Image.BILINEAR)
+        return np.asarray(gambar)
+
+
+def piksel_gelap(gambar):
+    """
+    Mask piksel tinta (bool): lebih gelap dari RASIO_TINTA x kecerahan kertas (median gambar). Ambang Otsu tidak
+    dipakai karena tinta hanya sebagian kecil halaman, sehingga Otsu cenderung membelah derau kertas.
+    """
+    histogram = np.bincount(gambar.ravel(), minlength=256)
+    kertas = int(np.searchsorted(np.cumsum(histogram), gambar.size / 2))
+    return gambar < RASIO_TINTA * kertas
+
+
+def _rata_bin(kumulatif, awal, akhir):
+    # Rata-rata profil pada interval [awal, akhir) piksel dari jumlah kumulatifnya (interpolasi linear,
+    # di luar gambar dianggap putih), untuk array posisi berbentuk apa pun
+    sumbu = np.arange(len(kumulatif), dtype=np.float64)
+    lebar = np.maximum(akhir - awal, 1e-9)
+    return (np.interp(akhir, sumbu, kumulatif) - np.interp(awal, sumbu, kumulatif)) / lebar
+
+
+def _kumulatif(profil):
+    return np.concatenate(([0.0], np.cumsum(profil, dtype=np.float64)))
+
+
+def profil_ternormalisasi(profil, jumlah_bin=JUMLAH_BIN_PROFIL):
+    """Profil tinta per piksel diringkas menjadi jumlah_bin rata-rata di sepanjang halaman."""
+    batas = np.linspace(0, len(profil), jumlah_bin + 1)
+    return _rata_bin(_kumulatif(profil), batas[:-1], batas[1:])
+
+
+def _z(nilai):
+    # Standarisasi di sumbu terakhir untuk korelasi Pearson
+    nilai = nilai - nilai.mean(axis=-1, keepdims=True)
+    return nilai / np.maximum(np.sqrt((nilai * nilai).mean(axis=-1, keepdims=True)), 1e-9)
+
+
+def _gaussian(nilai, sigma):
+    # Penghalusan Gaussian 1-D (sigma dalam satuan elemen), tepi dianggap nol
+    if sigma <= 0:
+        return nilai
+    radius = int(3 * sigma) + 1
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    return np.convolve(nilai, kernel / kernel.sum(), mode="same")
+
+
+def registrasi_kasar(profil, referensi):
+    """
+    Skala dan geseran (piksel) yang memetakan posisi ternormalisasi u ke piksel skala * u * panjang + geseran,
+    dipilih dengan korelasi profil terhadap profil referensi. Garis tabel yang berulang membuat korelasi profil
+    tajam bergerigi, sehingga pencarian dimulai dari profil yang dihaluskan (selubung tabel dan kop) lalu
+    dipersempit per TAHAP_REGISTRASI. Kembalikan (skala, geseran, korelasi) tahap terakhir.
+    """
+    panjang = len(profil)
+    piksel_per_bin = panjang / len(referensi)
+    batas = np.linspace(0.0, 1.0, len(referensi) + 1)
+    skala, geseran = 1.0, 0.0
+    rentang_skala, rentang_geseran = SKALA_MAKS, GESERAN_MAKS * panjang
+    for sigma, langkah_skala, langkah_geseran in TAHAP_REGISTRASI:
+        kumulatif = _kumulatif(_gaussian(profil, sigma * piksel_per_bin))
+        z_referensi = _z(_gaussian(referensi, sigma))
+        daftar_skala = skala + np.arange(-rentang_skala, rentang_skala + 1e-9, langkah_skala)
+        daftar_geseran = geseran + np.arange(-rentang_geseran, rentang_geseran + 1e-9, langkah_geseran)
+
+        # (skala, geseran, bin + 1) posisi batas bin dalam piksel
+        posisi = daftar_skala[:, None, None] * batas[None, None, :] * panjang + daftar_geseran[None, :, None]
+        nilai = _rata_bin(kumulatif, posisi[..., :-1], posisi[..., 1:])
+        korelasi = (_z(nilai) * z_referensi[None, None, :]).mean(axis=-1)
+        i, j = np.unravel_index(int(np.argmax(korelasi)), korelasi.shape)
+        skala, geseran = float(daftar_skala[i]), float(daftar_geseran[j])
+        # Tahap berikutnya mencari di sekitar hasil ini, selebar dua langkah tahap ini
+        rentang_skala, rentang_geseran = 2 * langkah_skala, 2 * langkah_geseran
+    return skala, geseran, float(korelasi[i, j])
+
+
+def haluskan_dengan_garis(profil, garis, skala, geseran):
+    """
+    Haluskan (skala, geseran) agar posisi garis tabel (ternormalisasi) jatuh di puncak profil. profil diukur di
+    dalam rentang tabel saja, sehingga garis tabel bernilai mendekati 1. Kembalikan (skala, geseran, proporsi
+    garis yang ditemukan).
+    """
+    panjang = len(profil)
+    # Maksimum jendela 3 piksel: garis tipis tetap ditemukan walaupun posisinya dibulatkan
+    puncak = profil.copy()
+    puncak[1:] = np.maximum(puncak[1:], profil[:-1])
+    puncak[:-1] = np.maximum(puncak[:-1], profil[1:])
+    puncak = np.concatenate((puncak, [0.0]))
+
+    daftar_skala = skala + np.arange(-2, 3) * LANGKAH_SKALA_HALUS
+    daftar_geseran = geseran + np.arange(-GESERAN_HALUS, GESERAN_HALUS + 1, dtype=np.float64)
+    posisi = np.rint(daftar_skala[:, None, None] * garis[None, None, :] * panjang + daftar_geseran[None, :, None])
+    indeks = posisi.astype(np.int64)
+    # Indeks di luar gambar membaca elemen terakhir (0)
+    indeks[(indeks < 0) | (indeks >= panjang)] = panjang
+    nilai = puncak[indeks]
+    skor = nilai.mean(axis=-1)
+    i, j = np.unravel_index(int(np.argmax(skor)), skor.shape)
+    return float(daftar_skala[i]), float(daftar_geseran[j]), float((nilai[i, j] >= 0.5).mean())
+
+
+def _kelompokkan_garis(tepi):
+    # Gabungkan tepi sel yang berdekatan menjadi satu posisi garis (rata-rata)
+    garis = []
+    kelompok = []
+    for nilai in sorted(tepi):
+        if kelompok and nilai - kelompok[-1] > TOLERANSI_GARIS:
+            garis.append(sum(kelompok) / len(kelompok))
+            kelompok = []
+        kelompok.append(nilai)
+    if kelompok:
+        garis.append(sum(kelompok) / len(kelompok))
+    return garis
+
+
+class TataLetakOMR:
+    """
+    Geometri formulir untuk pembacaan lokal: kotak sel pilihan per soal, garis tabel, dan profil tinta referensi,
+    semuanya ternormalisasi terhadap ukuran halaman.
+    """
+
+    __slots__ = ("pilihan", "soal", "kotak", "garis_x", "garis_y", "profil_x", "profil_y")
+
+    def __init__(self, pilihan, soal, kotak, garis_x, garis_y, profil_x, profil_y):
+        self.pilihan = tuple(pilihan)
+        # Nomor soal yang terpetakan, berurutan; kotak[i, j] = (x0, y0, x1, y1) soal[i] pilihan[j], NaN jika tidak ada
+        self.soal = list(soal)
+        self.kotak = np.asarray(kotak, dtype=np.float64)
+        self.garis_x = np.asarray(garis_x, dtype=np.float64)
+        self.garis_y = np.asarray(garis_y, dtype=np.float64)
+        self.profil_x = np.asarray(profil_x, dtype=np.float64)
+        self.profil_y = np.asarray(profil_y, dtype=np.float64)
+
+    @classmethod
+    def dari_hasil(cls, result, gambar, skema=SKEMA_DEFAULT, cache_template=None):
+        """
+        Bangun tata letak dari hasil analisis Azure lembar referensi dan gambarnya (baca_gambar).
+        Raise ValueError jika tabel jawaban atau ukuran halaman tidak ditemukan.
+        """
+        indeks_tabel = buat_indeks_tabel(result)
+        geometri = SheetGeometry(result, indeks_tabel)
+        tabel_jawaban_idx, posisi_jawaban = analisis_posisi_jawaban(result, indeks_tabel, geometri, cache_template, skema)
+        if tabel_jawaban_idx is None or not posisi_jawaban:
+            raise ValueError("tabel jawaban tidak ditemukan pada lembar referensi")
+
+        regions = result.tables[tabel_jawaban_idx].bounding_regions or []
+        nomor_halaman = regions[0].page_number if regions else 1
+        page = next((p for p in result.pages or [] if p.page_number == nomor_halaman), None)
+        if page is None or not page.width or not page.height:
+            raise ValueError("ukuran halaman tabel jawaban tidak diketahui")
+
+        soal = sorted(posisi_jawaban)
+        kotak = np.full((len(soal), len(skema.pilihan), 4), np.nan)
+        tepi_x, tepi_y = [], []
+        for i, nomor_soal in enumerate(soal):
+            for j, pilihan in enumerate(skema.pilihan):
+                info = posisi_jawaban[nomor_soal].get(pilihan)
+                if info is None or info["kotak"] is None:
+                    continue
+                x0, y0, x1, y1 = info["kotak"]
+                kotak[i, j] = (x0 / page.width, y0 / page.height, x1 / page.width, y1 / page.height)
+                tepi_x.extend(kotak[i, j, [0, 2]].tolist())
+                tepi_y.extend(kotak[i, j, [1, 3]].tolist())
+
+        gelap = piksel_gelap(gambar)
+        return cls(
+            skema.pilihan, soal, kotak, _kelompokkan_garis(tepi_x), _kelompokkan_garis(tepi_y),
+            profil_ternormalisasi(gelap.mean(axis=0)), profil_ternormalisasi(gelap.mean(axis=1)),
+        )
+
+    @classmethod
+    def dari_dict(cls, data):
+        kotak = np.array([[k if k is not None else [np.nan] * 4 for k in baris] for baris in data["kotak"]])
+        return cls(data["pilihan"], data["soal"], kotak, data["garis_x"], data["garis_y"],
+                   data["profil_x"], data["profil_y"])
+
+    def ke_dict(self):
+        return {
+            "versi": VERSI_TATA_LETAK,
+            "pilihan": "".join(self.pilihan),
+            "soal": self.soal,
+            "kotak": [[None if np.isnan(k).any() else [round(v, 5) for v in k.tolist()] for k in baris]
+                      for baris in self.kotak],
+            "garis_x": [round(v, 5) for v in self.garis_x.tolist()],
+            "garis_y": [round(v, 5) for v in self.garis_y.tolist()],
+            "profil_x": [round(v, 5) for v in self.profil_x.tolist()],
+            "profil_y": [round(v, 5) for v in self.profil_y.tolist()],
+        }
+
+    @classmethod
+    def muat(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("versi") != VERSI_TATA_LETAK:
+            raise ValueError(f"versi tata letak {data.get('versi')} tidak didukung")
+        return cls.dari_dict(data)
+
+    def simpan(self, path):
+        """Tulis tata letak ke file JSON secara atomik."""
+        path_sementara = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            json.dump(self.ke_dict(), f)
+        os.replace(path_sementara, path)
+
+    def soal_tidak_terpetakan(self, skema):
+        """Nomor soal skema yang tidak memiliki sel di tata letak ini (selalu dianggap ambigu)."""
+        terpetakan = set(self.soal)
+        return [nomor for nomor in range(1, skema.jumlah_soal + 1) if nomor not in terpetakan]
+
+
+class HasilOMR:
+    """Hasil pembacaan lokal satu lembar."""
+
+    __slots__ = ("jawaban", "kepercayaan", "rasio_isi", "korelasi", "skor_registrasi", "soal_ambigu")
+
+    def __init__(self, jawaban, kepercayaan, rasio_isi, korelasi, skor_registrasi, soal_ambigu):
+        self.jawaban = jawaban
+        self.kepercayaan = kepercayaan
+        self.rasio_isi = rasio_isi
+        self.korelasi = korelasi
+        self.skor_registrasi = skor_registrasi
+        self.soal_ambigu = soal_ambigu
+
+    @property
+    def registrasi_berhasil(self):
+        return self.korelasi >= AMBANG_KORELASI and self.skor_registrasi >= AMBANG_REGISTRASI
+
+    @property
+    def ambigu(self):
+        return not self.registrasi_berhasil or bool(self.soal_ambigu)
+
+
+def registrasi(gelap, tata_letak):
+    """
+    Transformasi per sumbu dari koordinat ternormalisasi tata letak ke piksel gambar.
+    Kembalikan ((skala_x, geseran_x), (skala_y, geseran_y), korelasi, skor_registrasi).
+    """
+    tinggi, lebar = gelap.shape
+    skala_x, geseran_x, korelasi_x = registrasi_kasar(gelap.mean(axis=0), tata_letak.profil_x)
+    skala_y, geseran_y, korelasi_y = registrasi_kasar(gelap.mean(axis=1), tata_letak.profil_y)
+
+    # Profil di dalam rentang tabel saja: garis tabel mengisi hampir seluruh rentang tersebut
+    def rentang(garis, skala, geseran, panjang):
+        awal = int(np.clip(skala * garis[0] * panjang + geseran + GESERAN_HALUS, 0, panjang - 1))
+        akhir = int(np.clip(skala * garis[-1] * panjang + geseran - GESERAN_HALUS, awal + 1, panjang))
+        return awal, akhir
+
+    y0, y1 = rentang(tata_letak.garis_y, skala_y, geseran_y, tinggi)
+    x0, x1 = rentang(tata_letak.garis_x, skala_x, geseran_x, lebar)
+    skala_x, geseran_x, proporsi_x = haluskan_dengan_garis(
+        gelap[y0:y1].mean(axis=0), tata_letak.garis_x, skala_x, geseran_x
+    )
+    skala_y, geseran_y, proporsi_y = haluskan_dengan_garis(
+        gelap[:, x0:x1].mean(axis=1), tata_letak.garis_y, skala_y, geseran_y
+    )
+    return (skala_x, geseran_x), (skala_y, geseran_y), min(korelasi_x, korelasi_y), min(proporsi_x, proporsi_y)
+
+
+def rasio_isi_sel(gelap, kotak, transformasi_x, transformasi_y):
+    """Proporsi piksel gelap di bagian dalam setiap kotak (array (..., 4) ternormalisasi); NaN untuk kotak NaN."""
+    tinggi, lebar = gelap.shape
+    (skala_x, geseran_x), (skala_y, geseran_y) = transformasi_x, transformasi_y
+    x0 = kotak[..., 0] * skala_x * lebar + geseran_x
+    x1 = kotak[..., 2] * skala_x * lebar + geseran_x
+    y0 = kotak[..., 1] * skala_y * tinggi + geseran_y
+    y1 = kotak[..., 3] * skala_y * tinggi + geseran_y
+    tepi_x = (x1 - x0) * TEPI_SEL
+    tepi_y = (y1 - y0) * TEPI_SEL
+
+    valid = ~np.isnan(kotak).any(axis=-1)
+    def piksel(nilai, batas):
+        return np.clip(np.rint(np.where(valid, nilai, 0)), 0, batas).astype(np.int64)
+
+    ix0, ix1 = piksel(x0 + tepi_x, lebar), piksel(x1 - tepi_x, lebar)
+    iy0, iy1 = piksel(y0 + tepi_y, tinggi), piksel(y1 - tepi_y, tinggi)
+    ix1 = np.maximum(ix1, ix0)
+    iy1 = np.maximum(iy1, iy0)
+
+    # Integral image hanya untuk daerah yang memuat semua sel (tabel jawaban), bukan seluruh halaman
+    x_awal, y_awal = int(ix0[valid].min(initial=0)), int(iy0[valid].min(initial=0))
+    x_akhir, y_akhir = int(ix1[valid].max(initial=0)), int(iy1[valid].max(initial=0))
+    daerah = gelap[y_awal:y_akhir, x_awal:x_akhir]
+    integral = np.zeros((daerah.shape[0] + 1, daerah.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(daerah, axis=0, dtype=np.int32), axis=1, out=integral[1:, 1:])
+    ix0, ix1 = np.clip(ix0 - x_awal, 0, daerah.shape[1]), np.clip(ix1 - x_awal, 0, daerah.shape[1])
+    iy0, iy1 = np.clip(iy0 - y_awal, 0, daerah.shape[0]), np.clip(iy1 - y_awal, 0, daerah.shape[0])
+    jumlah = integral[iy1, ix1] - integral[iy0, ix1] - integral[iy1, ix0] + integral[iy0, ix0]
+    luas = (ix1 - ix0) * (iy1 - iy0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rasio = jumlah / luas
+    rasio[~valid | (luas == 0)] = np.nan
+    return rasio
+
+
+def putuskan_jawaban(rasio_isi, pilihan, ambang_isi=AMBANG_ISI):
+    """
+    Jawaban dan kepercayaan per soal dari rasio isi (soal x pilihan). Tinta huruf cetak dikurangi dengan
+    kuartil bawah rasio setiap pilihan di seluruh lembar. Kembalikan (jawaban, kepercayaan).
+    """
+    with warnings.catch_warnings():
+        # Pilihan tanpa sel sama sekali menghasilkan NaN (dan peringatan "All-NaN slice")
+        warnings.simplefilter("ignore", RuntimeWarning)
+        dasar = np.nanpercentile(rasio_isi, 25, axis=0)
+    kelebihan = np.nan_to_num(rasio_isi - np.nan_to_num(dasar)[None, :], nan=-np.inf)
+
+    urutan = np.argsort(-kelebihan, axis=1)
+    baris = np.arange(len(kelebihan))
+    terbaik = kelebihan[baris, urutan[:, 0]]
+    kedua = np.maximum(kelebihan[baris, urutan[:, 1]], 0.0) if kelebihan.shape[1] > 1 else np.zeros(len(kelebihan))
+
+    terisi = terbaik >= ambang_isi
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kepercayaan = np.where(
+            terisi,
+            (terbaik - kedua) / np.where(terisi, terbaik, 1.0),
+            (ambang_isi - terbaik) / ambang_isi,
+        )
+    kepercayaan = np.clip(np.nan_to_num(kepercayaan, nan=0.0, neginf=0.0, posinf=0.0), 0.0, 1.0)
+    jawaban = [pilihan[urutan[i, 0]] if terisi[i] else "-" for i in range(len(kelebihan))]
+    return jawaban, kepercayaan.tolist()
+
+
+def baca_lembar(gambar, tata_letak, skema=SKEMA_DEFAULT, ambang_isi=AMBANG_ISI,
+                ambang_kepercayaan=AMBANG_KEPERCAYAAN):
+    """
+    Baca jawaban satu lembar (array grayscale dari baca_gambar) dengan tata letak formulir.
+    Soal yang tidak terpetakan di tata letak dijawab "-" dengan kepercayaan 0 dan dianggap ambigu.
+    """
+    with span("omr_registrasi"):
+        gelap = piksel_gelap(gambar)
+        transformasi_x, transformasi_y, korelasi, skor_registrasi = registrasi(gelap, tata_letak)
+    with span("omr_rasio_isi"):
+        rasio_isi = rasio_isi_sel(gelap, tata_letak.kotak, transformasi_x, transformasi_y)
+        jawaban_terpetakan, kepercayaan_terpetakan = putuskan_jawaban(rasio_isi, tata_letak.pilihan, ambang_isi)
+
+    jawaban = ["-"] * skema.jumlah_soal
+    kepercayaan = [0.0] * skema.jumlah_soal
+    for nomor_soal, j, k in zip(tata_letak.soal, jawaban_terpetakan, kepercayaan_terpetakan):
+        if skema.nomor_valid(nomor_soal):
+            jawaban[nomor_soal - 1] = j
+            kepercayaan[nomor_soal - 1] = k
+    soal_ambigu = [i + 1 for i, k in enumerate(kepercayaan) if k < ambang_kepercayaan]
+    return HasilOMR(jawaban, kepercayaan, rasio_isi, korelasi, skor_registrasi, soal_ambigu)
+
+
+def nilai_hasil_omr(hasil_omr, kunci_jawaban, skema=SKEMA_DEFAULT):
+    """Dict hasil penilaian dengan format yang sama seperti nilai_lembar, dari jawaban yang dibaca lokal."""
+    metode = ["omr_lokal" if j != "-" else "-" for j in hasil_omr.jawaban]
+    distribusi_metode = {"omr_lokal": len(metode) - metode.count("-")}
+    hasil = cocokkan_jawaban(hasil_omr.jawaban, kunci_jawaban, metode, distribusi_metode, skema)
+    hasil.update({
+        "jawaban": hasil_omr.jawaban,
+        "metode": metode,
+        "kepercayaan": [round(k, 4) for k in hasil_omr.kepercayaan],
+        "distribusi_metode": distribusi_metode,
+        "jumlah_soal": len(kunci_jawaban),
+        "jawaban_himpunan": None,
+    })
+    return hasil
+
+
+def _buat_client():
+    from azure.core.credentials import AzureKeyCredential
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+    return DocumentIntelligenceClient(
+        endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nilai lembar secara lokal dari geometri sel; lembar ambigu ke Azure")
+    parser.add_argument("file", nargs="+", help="file lembar jawaban (gambar; PDF selalu ke Azure)")
+    parser.add_argument("--tata-letak", required=True, help="file JSON tata letak; dibuat dari --referensi jika belum ada")
+    parser.add_argument("--referensi", help="lembar referensi yang dianalisis Azure untuk membuat tata letak")
+    parser.add_argument("--ujian", help="file ujian JSON berisi jumlah soal, pilihan, dan kunci jawaban")
+    parser.add_argument("--ambang-isi", type=float, default=AMBANG_ISI,
+                        help="kelebihan rasio piksel gelap minimum agar sel dianggap ditandai")
+    parser.add_argument("--ambang-kepercayaan", type=float, default=AMBANG_KEPERCAYAAN,
+                        help="soal dengan kepercayaan di bawah ini membuat lembar dikirim ke Azure")
+    parser.add_argument("--tanpa-azure", action="store_true", help="lewati lembar ambigu alih-alih mengirimnya ke Azure")
+    parser.add_argument("--output", help="tambahkan hasil per lembar ke file JSON lines ini")
+    parser.add_argument("--ekspor", help="tulis satu baris per lembar ke file CSV atau .parquet ini")
+    parser.add_argument("--db", help="simpan hasil ke database SQLite ini")
+    args = parser.parse_args()
+
+    # Muat variabel lingkungan dari file .env
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    skema, kunci_jawaban = muat_ujian(args.ujian) if args.ujian else (None, None)
+    kunci_jawaban = kunci_jawaban or KUNCI_JAWABAN
+    if skema is None:
+        skema = SKEMA_DEFAULT if len(kunci_jawaban) == SKEMA_DEFAULT.jumlah_soal else SkemaUjian(len(kunci_jawaban))
+    id_ujian = id_ujian_dari_path(args.ujian)
+    cache = cache_dari_lingkungan()
+    client = None
+
+    if os.path.exists(args.tata_letak):
+        tata_letak = TataLetakOMR.muat(args.tata_letak)
+    else:
+        if not args.referensi:
+            parser.error("--tata-letak belum ada; berikan --referensi untuk membuatnya")
+        gambar = baca_gambar(args.referensi)
+        if gambar is None:
+            parser.error("--referensi harus berupa gambar satu halaman")
+        client = _buat_client()
+        result = analisis_dengan_cache(client, DokumenFile(args.referensi), "prebuilt-layout", cache)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            tata_letak = TataLetakOMR.dari_hasil(result, gambar, skema)
+        tata_letak.simpan(args.tata_letak)
+        print(f"Tata letak disimpan ke {args.tata_letak}: {len(tata_letak.soal)} soal, "
+              f"{len(tata_letak.garis_x)} garis vertikal, {len(tata_letak.garis_y)} garis horizontal")
+    tidak_terpetakan = tata_letak.soal_tidak_terpetakan(skema)
+    if tidak_terpetakan:
+        print(f"Peringatan: {len(tidak_terpetakan)} soal tidak ada di tata letak; semua lembar akan dikirim ke Azure")
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    penulis = buka_penulis_hasil(args.ekspor) if args.ekspor else None
+    penyimpanan = PenyimpananHasil(args.db) if args.db else None
+    jumlah = {"lokal": 0, "azure": 0, "dilewati": 0, "gagal": 0}
+    mulai = time.perf_counter()
+    try:
+        for path in args.file:
+            try:
+                hasil_omr = None
+                gambar = baca_gambar(path) if not path.lower().endswith(".pdf") else None
+                if gambar is not None:
+                    hasil_omr = baca_lembar(gambar, tata_letak, skema, args.ambang_isi, args.ambang_kepercayaan)
+
+                if hasil_omr is not None and not hasil_omr.ambigu:
+                    hitung("omr_lokal")
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        hasil = nilai_hasil_omr(hasil_omr, kunci_jawaban, skema)
+                    hasil["sumber"] = "omr_lokal"
+                    jumlah["lokal"] += 1
+                else:
+                    if hasil_omr is None:
+                        alasan = "bukan gambar satu halaman"
+                    elif not hasil_omr.registrasi_berhasil:
+                        alasan = f"registrasi lemah (korelasi {hasil_omr.korelasi:.2f}, garis {hasil_omr.skor_registrasi:.2f})"
+                    else:
+                        alasan = f"soal ambigu {hasil_omr.soal_ambigu}"
+                    if args.tanpa_azure:
+                        print(f"{path}: DILEWATI, {alasan}")
+                        jumlah["dilewati"] += 1
+                        continue
+                    hitung("omr_ke_azure")
+                    if client is None:
+                        client = _buat_client()
+                    result = analisis_dengan_cache(client, DokumenFile(path), "prebuilt-layout", cache)
+                    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                        hasil = nilai_lembar(result, kunci_jawaban, bandingkan_himpunan=False, skema=skema)
+                    hasil["sumber"] = "azure"
+                    jumlah["azure"] += 1
+                    print(f"{path}: dikirim ke Azure, {alasan}")
+            except Exception as e:
+                jumlah["gagal"] += 1
+                print(f"{path}: GAGAL {type(e).__name__}: {e}")
+                if penyimpanan:
+                    penyimpanan.tambah(path, None, id_ujian, galat=f"{type(e).__name__}: {e}")
+                continue
+
+            print(f"{path}: skor {hasil['skor']}/{hasil['jumlah_soal']} ({hasil['sumber']})")
+            if output:
+                output.write(json.dumps(dict(hasil, lembar=path), ensure_ascii=False) + "\n")
+            if penulis:
+                penulis.tulis(path, hasil)
+            if penyimpanan:
+                penyimpanan.tambah(path, hasil, id_ujian)
+    finally:
+        if output:
+            output.close()
+        if penulis:
+            penulis.tutup()
+        if penyimpanan:
+            penyimpanan.tutup()
+
+    durasi = time.perf_counter() - mulai
+    print(f"Selesai dalam {durasi:.1f} s: {json.dumps(jumlah)}")
+
+
+if __name__ == "__main__":
+    main()
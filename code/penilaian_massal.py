@@ -0,0 +1,226 @@
+"""
+Penilaian massal dan analisis butir soal untuk satu angkatan.
+
+Jawaban N siswa disusun sebagai matriks uint8 N x Q (kode SkemaUjian: 0 = tidak terdeteksi,
+1..jumlah_pilihan = pilihan sesuai urutan), lalu jumlah benar/salah/tidak terdeteksi, skor, tingkat
+kesukaran, dan daya beda setiap soal dihitung sekaligus dengan NumPy tanpa loop per siswa.
+
+- Tingkat kesukaran (p): proporsi siswa yang menjawab benar pada soal tersebut.
+- Daya beda (D): selisih proporsi benar kelompok atas dan kelompok bawah (27% skor tertinggi dan
+  terendah).
+
+Contoh (hasil JSON lines dari lembar_bertahap.py --output):
+    python penilaian_massal.py hasil.jsonl --ujian ujian.json
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from penilaian import KUNCI_JAWABAN
+from skema_ujian import KODE_KOSONG, SKEMA_DEFAULT, SkemaUjian, muat_ujian
+
+# Proporsi kelompok atas/bawah untuk daya beda
+PROPORSI_KELOMPOK = 0.27
+
+
+def _tabel_byte_ke_kode(skema):
+    # Tabel bytes.translate: byte ASCII huruf pilihan (besar dan kecil) -> kode; byte lain (termasuk "-") -> 0
+    tabel = bytearray(256)
+    for kode, huruf in enumerate(skema.pilihan, start=1):
+        if ord(huruf) < 128:
+            tabel[ord(huruf)] = kode
+            tabel[ord(huruf.lower())] = kode
+    return bytes(tabel)
+
+
+def matriks_jawaban(daftar_jawaban, skema=SKEMA_DEFAULT):
+    """
+    Susun list jawaban per siswa (list huruf, "-" untuk tidak terdeteksi) menjadi matriks uint8
+    N x jumlah_soal. Jawaban yang lebih pendek diisi "-", yang lebih panjang dipotong.
+    """
+    jumlah_soal = skema.jumlah_soal
+    tabel = _tabel_byte_ke_kode(skema)
+    baris = []
+    for jawaban in daftar_jawaban:
+        teks = "".join(jawaban[:jumlah_soal])
+        if len(teks) != min(len(jawaban), jumlah_soal) or not teks.isascii():
+            # Jawaban bukan huruf tunggal ASCII: konversi per soal
+            baris.append(skema.ke_kode([huruf.upper() for huruf in jawaban]).tobytes())
+            continue
+        baris.append(teks.ljust(jumlah_soal, "-").encode("ascii").translate(tabel))
+    if not baris:
+        return np.zeros((0, jumlah_soal), dtype=np.uint8)
+    return np.frombuffer(b"".join(baris), dtype=np.uint8).reshape(len(baris), jumlah_soal)
+
+
+def _angka(nilai):
+    # NaN (angkatan terlalu kecil) -> None agar tetap JSON-serializable
+    return float(nilai) if np.isfinite(nilai) else None
+
+
+class HasilMassal:
+    """Hasil penilaian satu angkatan: array per siswa (panjang N) dan per soal (panjang Q)."""
+
+    __slots__ = ("skema", "kunci", "benar", "salah", "tidak_terdeteksi", "nilai",
+                 "tingkat_kesukaran", "daya_beda", "sebaran_pilihan")
+
+    def __init__(self, skema, kunci, benar, salah, tidak_terdeteksi, nilai, tingkat_kesukaran, daya_beda,
+                 sebaran_pilihan):
+        self.skema = skema
+        self.kunci = kunci
+        # Per siswa: jumlah benar (= skor), salah, tidak terdeteksi, dan nilai 0-100
+        self.benar = benar
+        self.salah = salah
+        self.tidak_terdeteksi = tidak_terdeteksi
+        self.nilai = nilai
+        # Per soal: proporsi benar, daya beda, dan jumlah siswa per kode (Q x (jumlah_pilihan + 1))
+        self.tingkat_kesukaran = tingkat_kesukaran
+        self.daya_beda = daya_beda
+        self.sebaran_pilihan = sebaran_pilihan
+
+    @property
+    def skor(self):
+        return self.benar
+
+    @property
+    def jumlah_siswa(self):
+        return len(self.benar)
+
+    def butir(self):
+        """Analisis per soal sebagai list dict (JSON-serializable)."""
+        hasil = []
+        for idx in range(self.skema.jumlah_soal):
+            sebaran = self.sebaran_pilihan[idx].tolist()
+            hasil.append({
+                "nomor_soal": idx + 1,
+                "kunci": self.skema.huruf(int(self.kunci[idx])),
+                "tingkat_kesukaran": _angka(self.tingkat_kesukaran[idx]),
+                "daya_beda": _angka(self.daya_beda[idx]),
+                "sebaran": {self.skema.huruf(kode): sebaran[kode] for kode in range(len(sebaran))},
+            })
+        return hasil
+
+
+def nilai_massal(matriks, kunci_jawaban, skema=SKEMA_DEFAULT):
+    """
+    Nilai matriks jawaban uint8 N x Q terhadap kunci (list huruf atau array kode uint8).
+    Kembalikan HasilMassal.
+    """
+    matriks = np.asarray(matriks, dtype=np.uint8)
+    kunci = kunci_jawaban if isinstance(kunci_jawaban, np.ndarray) else skema.ke_kode(kunci_jawaban)
+    kunci = kunci.astype(np.uint8, copy=False)
+    jumlah_siswa, jumlah_soal = matriks.shape
+
+    terdeteksi = matriks != KODE_KOSONG
+    cocok = matriks == kunci
+    # Kunci berkode 0 (tidak ada di skema) tidak pernah dihitung benar
+    cocok &= terdeteksi
+
+    benar = cocok.sum(axis=1, dtype=np.int32)
+    tidak_terdeteksi = jumlah_soal - terdeteksi.sum(axis=1, dtype=np.int32)
+    salah = jumlah_soal - benar - tidak_terdeteksi
+    nilai = benar * (100.0 / jumlah_soal)
+
+    if jumlah_siswa:
+        tingkat_kesukaran = cocok.sum(axis=0, dtype=np.int64) / jumlah_siswa
+    else:
+        tingkat_kesukaran = np.full(jumlah_soal, np.nan)
+
+    if jumlah_siswa >= 2:
+        ukuran_kelompok = max(1, int(round(jumlah_siswa * PROPORSI_KELOMPOK)))
+        urutan = np.argsort(benar, kind="stable")
+        kelompok_bawah = cocok[urutan[:ukuran_kelompok]]
+        kelompok_atas = cocok[urutan[-ukuran_kelompok:]]
+        daya_beda = (kelompok_atas.sum(axis=0, dtype=np.int64) - kelompok_bawah.sum(axis=0, dtype=np.int64)) / ukuran_kelompok
+    else:
+        daya_beda = np.full(jumlah_soal, np.nan)
+
+    # Sebaran kode per soal: satu perbandingan uint8 per kode (lebih cepat dari bincount int64)
+    sebaran_pilihan = np.stack(
+        [(matriks == kode).sum(axis=0, dtype=np.int64) for kode in range(skema.jumlah_pilihan + 1)], axis=1
+    )
+
+    return HasilMassal(skema, kunci, benar, salah, tidak_terdeteksi, nilai, tingkat_kesukaran, daya_beda,
+                       sebaran_pilihan)
+
+
+def kategori_kesukaran(p):
+    if p is None:
+        return "-"
+    if p > 0.7:
+        return "mudah"
+    if p >= 0.3:
+        return "sedang"
+    return "sukar"
+
+
+def kategori_daya_beda(d):
+    if d is None:
+        return "-"
+    if d >= 0.4:
+        return "baik sekali"
+    if d >= 0.3:
+        return "baik"
+    if d >= 0.2:
+        return "cukup"
+    return "jelek"
+
+
+def tampilkan_analisis_butir(hasil):
+    """Cetak ringkasan angkatan dan tabel analisis butir soal."""
+    print("\n" + "="*60)
+    print("ANALISIS BUTIR SOAL".center(60))
+    print("="*60)
+    print(f"Jumlah siswa: {hasil.jumlah_siswa}")
+    if hasil.jumlah_siswa:
+        print(f"Nilai rata-rata: {hasil.nilai.mean():.1f} (min {hasil.nilai.min():.1f}, maks {hasil.nilai.max():.1f})")
+        print(f"Rata-rata tidak terdeteksi per lembar: {hasil.tidak_terdeteksi.mean():.2f}")
+
+    pilihan = hasil.skema.pilihan
+    print("\n| No. | Kunci |   p   | Kesukaran |   D   | Daya Beda   | " + " ".join(f"{p:>5s}" for p in pilihan + ("-",)))
+    for butir in hasil.butir():
+        p = butir["tingkat_kesukaran"]
+        d = butir["daya_beda"]
+        teks_p = f"{p:5.2f}" if p is not None else "  -  "
+        teks_d = f"{d:5.2f}" if d is not None else "  -  "
+        sebaran = " ".join(f"{butir['sebaran'][huruf]:5d}" for huruf in pilihan + ("-",))
+        print(f"| {butir['nomor_soal']:3d} | {butir['kunci']:5s} | {teks_p} | {kategori_kesukaran(p):9s} | "
+              f"{teks_d} | {kategori_daya_beda(d):11s} | {sebaran}")
+
+
+def baca_jawaban_jsonl(path):
+    """Baca list jawaban per lembar dari file JSON lines (field "jawaban")."""
+    with open(path, "r", encoding="utf-8") as f:
+        for baris in f:
+            baris = baris.strip()
+            if baris:
+                yield json.loads(baris)["jawaban"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Penilaian massal dan analisis butir soal dari hasil JSON lines")
+    parser.add_argument("file", nargs="+", help="file JSON lines berisi field \"jawaban\" per lembar")
+    parser.add_argument("--ujian", help="file ujian JSON berisi jumlah soal, pilihan, dan kunci jawaban")
+    parser.add_argument("--output", help="tulis analisis butir ke file JSON ini")
+    args = parser.parse_args()
+
+    skema, kunci_jawaban = muat_ujian(args.ujian) if args.ujian else (None, None)
+    if kunci_jawaban is None:
+        kunci_jawaban = KUNCI_JAWABAN
+    if skema is None:
+        skema = SkemaUjian(len(kunci_jawaban), SKEMA_DEFAULT.pilihan)
+
+    matriks = np.concatenate([matriks_jawaban(baca_jawaban_jsonl(path), skema) for path in args.file])
+    hasil = nilai_massal(matriks, kunci_jawaban, skema)
+    tampilkan_analisis_butir(hasil)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"skema": skema.ke_dict(), "jumlah_siswa": hasil.jumlah_siswa, "butir": hasil.butir()},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
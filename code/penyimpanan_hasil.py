@@ -0,0 +1,267 @@
+"""
+Penyimpanan hasil penilaian di SQLite.
+
+Tabel:
+  ujian   : id ujian, jumlah soal, pilihan, dan kunci jawaban
+  lembar  : satu baris per lembar (ujian, siswa, status, skor, jumlah benar/salah/tidak terdeteksi,
+            jawaban sebagai string "AB-D...")
+  jawaban : satu baris per soal per lembar (jawaban, metode deteksi, skor kepercayaan)
+Indeks pada ujian, siswa, dan status lembar, sehingga kueri seperti "semua lembar ujian X dengan lebih
+dari 5 soal tidak terdeteksi" atau "riwayat siswa Y" tidak memindai seluruh tabel.
+
+Worker menambahkan hasil ke buffer; buffer ditulis dalam satu transaksi per batch (executemany) untuk
+throughput. Database memakai mode WAL sehingga pembacaan laporan tidak memblokir penulisan. Penilaian
+ulang memakai jawaban yang tersimpan dan penilaian_massal, tanpa menganalisis ulang lembar.
+
+Contoh:
+    python penyimpanan_hasil.py hasil.db --ujian uts-1 --min-tidak-terdeteksi 5
+    python penyimpanan_hasil.py hasil.db --siswa 12
+    python penyimpanan_hasil.py hasil.db --ujian uts-1 --nilai-ulang ujian.json
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from penilaian_massal import matriks_jawaban, nilai_massal
+from skema_ujian import SKEMA_DEFAULT, SkemaUjian, muat_ujian
+
+UKURAN_BATCH_DEFAULT = 500
+UJIAN_DEFAULT = "default"
+
+STATUS_SELESAI = "selesai"
+STATUS_GAGAL = "gagal"
+
+SKEMA_DB = """
+CREATE TABLE IF NOT EXISTS ujian (
+    id TEXT PRIMARY KEY,
+    jumlah_soal INTEGER NOT NULL,
+    pilihan TEXT NOT NULL,
+    kunci TEXT,
+    diperbarui REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lembar (
+    id INTEGER PRIMARY KEY,
+    lembar TEXT NOT NULL,
+    ujian TEXT NOT NULL,
+    siswa TEXT,
+    status TEXT NOT NULL,
+    skor INTEGER,
+    jumlah_soal INTEGER,
+    benar INTEGER,
+    salah INTEGER,
+    tidak_terdeteksi INTEGER,
+    jawaban TEXT,
+    galat TEXT,
+    waktu REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lembar_ujian ON lembar (ujian, tidak_terdeteksi);
+CREATE INDEX IF NOT EXISTS idx_lembar_siswa ON lembar (siswa, waktu);
+CREATE INDEX IF NOT EXISTS idx_lembar_status ON lembar (status);
+CREATE TABLE IF NOT EXISTS jawaban (
+    lembar_id INTEGER NOT NULL REFERENCES lembar (id) ON DELETE CASCADE,
+    nomor_soal INTEGER NOT NULL,
+    jawaban TEXT NOT NULL,
+    metode TEXT,
+    kepercayaan REAL,
+    PRIMARY KEY (lembar_id, nomor_soal)
+) WITHOUT ROWID;
+"""
+
+
+def id_ujian_dari_path(path):
+    """Id ujian dari nama file ujian, misalnya "data/uts-1.json" -> "uts-1"."""
+    return os.path.splitext(os.path.basename(path))[0] if path else UJIAN_DEFAULT
+
+
+class PenyimpananHasil:
+    """
+    Satu koneksi SQLite yang dipakai bersama beberapa thread worker. Hasil ditampung sampai
+    ukuran_batch lembar lalu ditulis dalam satu transaksi; panggil flush() atau tutup() untuk sisanya.
+    """
+
+    def __init__(self, path, ukuran_batch=UKURAN_BATCH_DEFAULT):
+        self.path = path
+        self.ukuran_batch = ukuran_batch
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._koneksi = sqlite3.connect(path, check_same_thread=False)
+        self._koneksi.execute("PRAGMA journal_mode=WAL")
+        self._koneksi.execute("PRAGMA synchronous=NORMAL")
+        self._koneksi.execute("PRAGMA foreign_keys=ON")
+        self._koneksi.executescript(SKEMA_DB)
+        self._koneksi.row_factory = sqlite3.Row
+
+    def simpan_kunci(self, ujian, skema, kunci_jawaban):
+        """Simpan atau perbarui skema dan kunci jawaban ujian."""
+        with self._lock, self._koneksi:
+            self._koneksi.execute(
+                "INSERT INTO ujian (id, jumlah_soal, pilihan, kunci, diperbarui) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET jumlah_soal = excluded.jumlah_soal, pilihan = excluded.pilihan, "
+                "kunci = excluded.kunci, diperbarui = excluded.diperbarui",
+                (ujian, skema.jumlah_soal, "".join(skema.pilihan), "".join(kunci_jawaban), time.time()),
+            )
+
+    def tambah(self, lembar, hasil=None, ujian=UJIAN_DEFAULT, siswa=None, galat=None):
+        """
+        Tambahkan hasil satu lembar (dict nilai_lembar) ke buffer; hasil None berarti lembar gagal
+        dinilai dengan pesan galat. Buffer ditulis saat mencapai ukuran_batch.
+        """
+        with self._lock:
+            self._buffer.append((str(lembar), hasil, ujian, None if siswa is None else str(siswa), galat, time.time()))
+            if len(self._buffer) >= self.ukuran_batch:
+                self._tulis_buffer()
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self._tulis_buffer()
+
+    def tutup(self):
+        self.flush()
+        with self._lock:
+            self._koneksi.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tutup()
+
+    def _tulis_buffer(self):
+        with self._koneksi:
+            baris_jawaban = []
+            for lembar, hasil, ujian, siswa, galat, waktu in self._buffer:
+                if hasil is None:
+                    self._koneksi.execute(
+                        "INSERT INTO lembar (lembar, ujian, siswa, status, galat, waktu) VALUES (?, ?, ?, ?, ?, ?)",
+                        (lembar, ujian, siswa, STATUS_GAGAL, galat, waktu),
+                    )
+                    continue
+
+                jawaban = hasil.get("jawaban") or []
+                cursor = self._koneksi.execute(
+                    "INSERT INTO lembar (lembar, ujian, siswa, status, skor, jumlah_soal, benar, salah, "
+                    "tidak_terdeteksi, jawaban, waktu) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (lembar, ujian, siswa, STATUS_SELESAI, hasil.get("skor"), hasil.get("jumlah_soal"),
+                     len(hasil.get("benar", ())), len(hasil.get("salah", ())),
+                     len(hasil.get("tidak_terdeteksi", ())), "".join(jawaban), waktu),
+                )
+                lembar_id = cursor.lastrowid
+                metode = hasil.get("metode") or []
+                kepercayaan = hasil.get("kepercayaan") or []
+                for idx, huruf in enumerate(jawaban):
+                    baris_jawaban.append((
+                        lembar_id, idx + 1, huruf,
+                        metode[idx] if idx < len(metode) else None,
+                        float(kepercayaan[idx]) if idx < len(kepercayaan) else None,
+                    ))
+            self._koneksi.executemany(
+                "INSERT INTO jawaban (lembar_id, nomor_soal, jawaban, metode, kepercayaan) VALUES (?, ?, ?, ?, ?)",
+                baris_jawaban,
+            )
+        self._buffer = []
+
+    def _kueri(self, sql, parameter=()):
+        with self._lock:
+            return [dict(baris) for baris in self._koneksi.execute(sql, parameter)]
+
+    def lembar_ujian(self, ujian, min_tidak_terdeteksi=None, status=None):
+        """Lembar suatu ujian, opsional hanya yang tidak terdeteksinya lebih dari min_tidak_terdeteksi."""
+        sql = "SELECT * FROM lembar WHERE ujian = ?"
+        parameter = [ujian]
+        if min_tidak_terdeteksi is not None:
+            sql += " AND tidak_terdeteksi > ?"
+            parameter.append(min_tidak_terdeteksi)
+        if status is not None:
+            sql += " AND status = ?"
+            parameter.append(status)
+        return self._kueri(sql + " ORDER BY id", parameter)
+
+    def riwayat_siswa(self, siswa):
+        """Semua lembar seorang siswa dari yang terlama."""
+        return self._kueri("SELECT * FROM lembar WHERE siswa = ? ORDER BY waktu", (str(siswa),))
+
+    def jawaban_lembar(self, lembar_id):
+        """Jawaban, metode, dan skor kepercayaan per soal untuk satu lembar."""
+        return self._kueri("SELECT * FROM jawaban WHERE lembar_id = ? ORDER BY nomor_soal", (lembar_id,))
+
+    def kunci(self, ujian):
+        """(SkemaUjian, kunci_jawaban) yang tersimpan untuk ujian, atau (None, None)."""
+        baris = self._kueri("SELECT * FROM ujian WHERE id = ?", (ujian,))
+        if not baris:
+            return None, None
+        skema = SkemaUjian(baris[0]["jumlah_soal"], tuple(baris[0]["pilihan"]))
+        return skema, list(baris[0]["kunci"]) if baris[0]["kunci"] else None
+
+    def matriks_jawaban(self, ujian, skema):
+        """(id lembar, matriks uint8 N x Q) dari jawaban tersimpan lembar yang selesai dinilai."""
+        baris = self._kueri(
+            "SELECT id, jawaban FROM lembar WHERE ujian = ? AND status = ? ORDER BY id", (ujian, STATUS_SELESAI)
+        )
+        return [b["id"] for b in baris], matriks_jawaban([b["jawaban"] for b in baris], skema)
+
+    def nilai_ulang(self, ujian, skema=None, kunci_jawaban=None):
+        """
+        Nilai ulang semua lembar ujian dari jawaban tersimpan dengan kunci baru (atau kunci tersimpan),
+        lalu perbarui skor dan jumlah benar/salah/tidak terdeteksi. Kembalikan HasilMassal.
+        """
+        if kunci_jawaban is None:
+            skema, kunci_jawaban = self.kunci(ujian)
+            if kunci_jawaban is None:
+                raise ValueError(f"kunci jawaban ujian {ujian!r} belum disimpan")
+        skema = skema or SkemaUjian(len(kunci_jawaban), SKEMA_DEFAULT.pilihan)
+
+        id_lembar, matriks = self.matriks_jawaban(ujian, skema)
+        hasil = nilai_massal(matriks, kunci_jawaban, skema)
+        with self._lock, self._koneksi:
+            self._koneksi.executemany(
+                "UPDATE lembar SET skor = ?, benar = ?, salah = ?, tidak_terdeteksi = ?, jumlah_soal = ? WHERE id = ?",
+                zip(hasil.benar.tolist(), hasil.benar.tolist(), hasil.salah.tolist(),
+                    hasil.tidak_terdeteksi.tolist(), [skema.jumlah_soal] * len(id_lembar), id_lembar),
+            )
+        return hasil
+
+
+def penyimpanan_dari_lingkungan():
+    """Buat PenyimpananHasil dari variabel lingkungan HASIL_DB, atau None jika tidak diisi."""
+    path = os.getenv("HASIL_DB")
+    return PenyimpananHasil(path) if path else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kueri dan penilaian ulang hasil penilaian yang tersimpan di SQLite")
+    parser.add_argument("db", help="file database SQLite")
+    parser.add_argument("--ujian", default=UJIAN_DEFAULT, help="id ujian")
+    parser.add_argument("--siswa", help="tampilkan riwayat siswa ini")
+    parser.add_argument("--min-tidak-terdeteksi", type=int, help="hanya lembar dengan tidak terdeteksi lebih dari ini")
+    parser.add_argument("--nilai-ulang", metavar="UJIAN_JSON", help="nilai ulang lembar ujian dengan kunci dari file ini")
+    args = parser.parse_args()
+
+    with PenyimpananHasil(args.db) as penyimpanan:
+        if args.nilai_ulang:
+            skema, kunci_jawaban = muat_ujian(args.nilai_ulang)
+            if kunci_jawaban is None:
+                parser.error(f"{args.nilai_ulang} tidak berisi \"kunci\"; lembar tidak dapat dinilai ulang")
+            penyimpanan.simpan_kunci(args.ujian, skema, kunci_jawaban)
+            hasil = penyimpanan.nilai_ulang(args.ujian, skema, kunci_jawaban)
+            print(f"{hasil.jumlah_siswa} lembar ujian {args.ujian} dinilai ulang")
+            return
+
+        if args.siswa:
+            daftar = penyimpanan.riwayat_siswa(args.siswa)
+        else:
+            daftar = penyimpanan.lembar_ujian(args.ujian, args.min_tidak_terdeteksi)
+        for baris in daftar:
+            if baris["status"] == STATUS_GAGAL:
+                print(f"{baris['id']:6d} | {baris['ujian']:12s} | {baris['lembar']:24s} | GAGAL: {baris['galat']}")
+            else:
+                print(f"{baris['id']:6d} | {baris['ujian']:12s} | {baris['lembar']:24s} | "
+                      f"skor {baris['skor']}/{baris['jumlah_soal']}, tidak terdeteksi {baris['tidak_terdeteksi']}")
+        print(f"{len(daftar)} lembar")
+
+
+if __name__ == "__main__":
+    main()
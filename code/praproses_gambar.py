@@ -0,0 +1,218 @@
+"""
+Praproses gambar lembar jawaban di sisi klien sebelum dikirim ke Azure (opsional).
+
+Hasil scan 600 dpi berwarna berukuran beberapa MB per lembar, padahal deteksi jawaban cukup dengan
+gambar abu-abu beresolusi lebih rendah. Praproses mengubah gambar menjadi grayscale, memperkecil ke
+DPI target, dan (opsional) binarisasi dengan ambang Otsu, lalu menyimpan ulang dalam format ringkas:
+PNG 1-bit atau TIFF CCITT G4 untuk gambar biner, JPEG untuk grayscale. PDF dikirim apa adanya.
+Jika hasil praproses tidak lebih kecil, byte asli yang dipakai.
+
+Membutuhkan Pillow (pip install pillow). Laporan byte/latensi yang dihemat dan pengecekan bahwa jawaban
+tidak berubah pada set referensi:
+  python praproses_gambar.py referensi/*.jpg --dpi 200 --biner --jumlah-proses 4 --cek-jawaban
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageSequence
+except ImportError:  # Pillow hanya dibutuhkan jika praproses diaktifkan
+    Image = None
+
+# DPI yang diasumsikan jika file gambar tidak menyimpan informasi DPI
+DPI_ASUMSI = 300
+DPI_TARGET_DEFAULT = 200
+
+
+def ambang_otsu(histogram):
+    """Ambang Otsu (0-255) dari histogram 256 bin: memaksimalkan varians antar kelas."""
+    histogram = np.asarray(histogram, dtype=float)
+    nilai = np.arange(len(histogram))
+    w0 = np.cumsum(histogram)
+    w1 = w0[-1] - w0
+    m0 = np.cumsum(histogram * nilai)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rata0 = m0 / w0
+        rata1 = (m0[-1] - m0) / w1
+        varians = w0 * w1 * (rata0 - rata1) ** 2
+    return int(np.argmax(np.nan_to_num(varians)))
+
+
+def _praproses_bingkai(img, dpi_target, biner, dpi_asumsi):
+    dpi_awal = img.info.get("dpi", (dpi_asumsi, dpi_asumsi))[0] or dpi_asumsi
+    img = img.convert("L")
+
+    dpi_akhir = dpi_awal
+    if dpi_target and dpi_awal > dpi_target:
+        skala = dpi_target / dpi_awal
+        ukuran = (max(1, round(img.width * skala)), max(1, round(img.height * skala)))
+        img = img.resize(ukuran, Image.LANCZOS)
+        dpi_akhir = dpi_target
+
+    if biner:
+        ambang = ambang_otsu(img.histogram())
+        img = img.point(lambda p: 255 if p > ambang else 0).convert("1", dither=Image.NONE)
+
+    return img, float(dpi_awal), float(dpi_akhir)
+
+
+def praproses_gambar(file_bytes, dpi_target=DPI_TARGET_DEFAULT, biner=False, kualitas_jpeg=80, dpi_asumsi=DPI_ASUMSI):
+    """
+    Praproses satu file gambar (JPEG, PNG, TIFF multi-halaman, BMP).
+    Kembalikan (bytes_hasil, info) dengan info berisi ukuran awal/akhir, DPI, format, dan waktu praproses.
+    """
+    if Image is None:
+        raise RuntimeError("Praproses gambar membutuhkan Pillow: pip install pillow")
+
+    mulai = time.perf_counter()
+    info = {
+        "ukuran_awal": len(file_bytes),
+        "ukuran_akhir": len(file_bytes),
+        "format": None,
+        "dpi_awal": None,
+        "dpi_akhir": None,
+    }
+
+    # PDF dikirim apa adanya
+    if file_bytes[:5] == b"%PDF-":
+        info["format"] = "PDF"
+        info["waktu_praproses"] = time.perf_counter() - mulai
+        return file_bytes, info
+
+    with Image.open(io.BytesIO(file_bytes)) as gambar:
+        bingkai = []
+        for frame in ImageSequence.Iterator(gambar):
+            img, dpi_awal, dpi_akhir = _praproses_bingkai(frame, dpi_target, biner, dpi_asumsi)
+            bingkai.append(img)
+
+    keluaran = io.BytesIO()
+    dpi = (dpi_akhir, dpi_akhir)
+    if len(bingkai) > 1:
+        kompresi = "group4" if biner else "tiff_deflate"
+        bingkai[0].save(keluaran, format="TIFF", save_all=True, append_images=bingkai[1:],
+                        compression=kompresi, dpi=dpi)
+        info["format"] = "TIFF"
+    elif biner:
+        bingkai[0].save(keluaran, format="PNG", optimize=True, dpi=dpi)
+        info["format"] = "PNG"
+    else:
+        bingkai[0].save(keluaran, format="JPEG", quality=kualitas_jpeg, optimize=True, dpi=dpi)
+        info["format"] = "JPEG"
+
+    hasil = keluaran.getvalue()
+    info["dpi_awal"] = dpi_awal
+    info["dpi_akhir"] = dpi_akhir
+
+    # Pakai byte asli jika praproses tidak memperkecil file
+    if len(hasil) >= len(file_bytes):
+        hasil = file_bytes
+        info["format"] = "asli"
+    info["ukuran_akhir"] = len(hasil)
+    info["waktu_praproses"] = time.perf_counter() - mulai
+    return hasil, info
+
+
+def _praproses_file(path, opsi):
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    hasil, info = praproses_gambar(file_bytes, **opsi)
+    return path, file_bytes, hasil, info
+
+
+def praproses_batch(daftar_path, jumlah_proses=None, **opsi):
+    """
+    Praproses banyak file secara paralel di beberapa proses (default: jumlah core CPU).
+    Hasilkan (path, bytes_asli, bytes_hasil, info) sesuai urutan daftar_path.
+    """
+    with ProcessPoolExecutor(max_workers=jumlah_proses) as executor:
+        yield from executor.map(_praproses_file, daftar_path, [opsi] * len(daftar_path))
+
+
+def _analisis_dan_nilai(client, file_bytes):
+    # Tanpa cache, agar latensi analisis yang diukur adalah latensi sebenarnya
+    from cache_analisis import analisis_dengan_cache
+    from penilaian import nilai_lembar
+
+    mulai = time.perf_counter()
+    result = analisis_dengan_cache(client, file_bytes)
+    durasi = time.perf_counter() - mulai
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        hasil = nilai_lembar(result, bandingkan_himpunan=False)
+    return hasil["jawaban"], durasi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Praproses gambar lembar jawaban dan laporan penghematan")
+    parser.add_argument("file", nargs="+", help="file gambar lembar jawaban (set referensi)")
+    parser.add_argument("--dpi", type=int, default=DPI_TARGET_DEFAULT, help="DPI target")
+    parser.add_argument("--biner", action="store_true", help="binarisasi dengan ambang Otsu")
+    parser.add_argument("--kualitas-jpeg", type=int, default=80)
+    parser.add_argument("--jumlah-proses", type=int, default=None, help="jumlah proses paralel (default: jumlah core)")
+    parser.add_argument("--output-dir", help="simpan hasil praproses ke direktori ini")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0,
+                        help="perkiraan bandwidth unggah untuk menghitung latensi yang dihemat")
+    parser.add_argument("--cek-jawaban", action="store_true",
+                        help="analisis file asli dan hasil praproses dengan Azure, bandingkan jawaban dan latensinya")
+    args = parser.parse_args()
+
+    client = None
+    if args.cek_jawaban:
+        from dotenv import load_dotenv
+        from azure.core.credentials import AzureKeyCredential
+        from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+        load_dotenv()
+        client = DocumentIntelligenceClient(
+            endpoint=os.getenv("AZURE_ENDPOINT"), credential=AzureKeyCredential(os.getenv("AZURE_KEY"))
+        )
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    opsi = {"dpi_target": args.dpi, "biner": args.biner, "kualitas_jpeg": args.kualitas_jpeg}
+    total_awal = total_akhir = 0
+    jawaban_sama = jumlah_dicek = 0
+
+    for path, asli, hasil, info in praproses_batch(args.file, args.jumlah_proses, **opsi):
+        total_awal += info["ukuran_awal"]
+        total_akhir += info["ukuran_akhir"]
+        hemat = info["ukuran_awal"] - info["ukuran_akhir"]
+        # Perkiraan latensi yang dihemat: waktu unggah yang dihemat dikurangi waktu praproses
+        hemat_latensi = hemat * 8 / (args.bandwidth_mbps * 1e6) - info["waktu_praproses"]
+        print(f"{os.path.basename(path)}: {info['ukuran_awal'] / 1024:.0f} KB -> {info['ukuran_akhir'] / 1024:.0f} KB "
+              f"({info['format']}, hemat {hemat / max(info['ukuran_awal'], 1) * 100:.1f}%), "
+              f"praproses {info['waktu_praproses'] * 1000:.0f} ms, perkiraan latensi hemat {hemat_latensi * 1000:.0f} ms")
+
+        if args.output_dir:
+            nama = os.path.splitext(os.path.basename(path))[0] + "." + (info["format"] or "bin").lower()
+            with open(os.path.join(args.output_dir, nama), "wb") as f:
+                f.write(hasil)
+
+        if client is not None:
+            jawaban_asli, durasi_asli = _analisis_dan_nilai(client, asli)
+            jawaban_praproses, durasi_praproses = _analisis_dan_nilai(client, hasil)
+            sama = jawaban_asli == jawaban_praproses
+            jumlah_dicek += 1
+            jawaban_sama += sama
+            beda = [i + 1 for i, (a, b) in enumerate(zip(jawaban_asli, jawaban_praproses)) if a != b]
+            print(f"  analisis {durasi_asli * 1000:.0f} ms -> {(durasi_praproses + info['waktu_praproses']) * 1000:.0f} ms "
+                  f"(termasuk praproses); jawaban {'SAMA' if sama else 'BERBEDA pada soal ' + str(beda)}")
+
+    print(f"\nTotal: {total_awal / 1024 / 1024:.2f} MB -> {total_akhir / 1024 / 1024:.2f} MB "
+          f"(hemat {(total_awal - total_akhir) / max(total_awal, 1) * 100:.1f}%)")
+    if jumlah_dicek:
+        print(f"Jawaban identik pada {jawaban_sama}/{jumlah_dicek} lembar referensi")
+        if jawaban_sama != jumlah_dicek:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Mode profil per lembar: cProfile dan tracemalloc untuk setiap lembar, hanya N lembar terlambat yang disimpan.
+
+Satu ProfilLembar dibuat per run lalu setiap penilaian lembar dibungkus `with profil.lembar(nama):`.
+Selama blok itu cProfile aktif dan tracemalloc mencatat alokasi; setelah blok selesai, durasinya
+dibandingkan dengan lembar lain dan hanya --profile-lembar lembar terlambat yang disimpan di memori.
+Saat ditutup, setiap lembar tersimpan ditulis ke direktori profil:
+  NN-<lembar>.pstats        statistik cProfile (python -m pstats, snakeviz, gprof2dot)
+  NN-<lembar>.collapsed     stack terlipat "a;b;c <mikrodetik>" untuk flamegraph.pl, speedscope, inferno
+  NN-<lembar>.alokasi.txt   puncak memori dan alokasi teratas per baris yang masih hidup di akhir lembar
+  ringkasan.txt             durasi lembar terlambat dibandingkan median semua lembar
+
+cProfile hanya merekam panggilan langsung (pemanggil -> yang dipanggil), bukan stack penuh. Stack terlipat
+disusun dari graf panggilan itu dengan membagi waktu kumulatif setiap fungsi secara proporsional ke
+pemanggilnya (cara yang sama dengan flameprof), sehingga perkiraan untuk fungsi yang dipanggil dari
+banyak tempat.
+
+Mode ini tidak menambah biaya sama sekali jika tidak dipakai: pemanggil hanya membuat ProfilLembar
+saat --profile diberikan, dan tanpa itu tidak ada hook profil maupun tracemalloc yang terpasang.
+Jika aktif, durasi yang dibandingkan sudah termasuk overhead cProfile dan tracemalloc.
+"""
+
+import contextlib
+import cProfile
+import heapq
+import os
+import pstats
+import re
+import statistics
+import time
+import tracemalloc
+
+# Jumlah lembar terlambat yang disimpan dan jumlah baris alokasi teratas per lembar
+JUMLAH_LEMBAR_DEFAULT = 5
+JUMLAH_ALOKASI = 25
+# Kedalaman stack tracemalloc; alokasi dikelompokkan per baris dari frame terdalam
+FRAME_TRACEMALLOC = 1
+# Stack dengan waktu di bawah ini (mikrodetik) tidak ditulis ke file stack terlipat
+WAKTU_STACK_MIN = 1.0
+
+_KARAKTER_TIDAK_AMAN = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class RekamanProfil:
+    """Profil satu lembar: durasi, statistik cProfile, dan ringkasan alokasi tracemalloc."""
+
+    __slots__ = ("nama", "urutan", "durasi", "profil", "puncak_memori", "alokasi")
+
+    def __init__(self, nama, urutan, durasi, profil, puncak_memori, alokasi):
+        self.nama = nama
+        self.urutan = urutan
+        self.durasi = durasi
+        self.profil = profil
+        self.puncak_memori = puncak_memori
+        # list (ukuran byte, jumlah blok, "file:baris")
+        self.alokasi = alokasi
+
+    def __lt__(self, lain):
+        return (self.durasi, self.urutan) < (lain.durasi, lain.urutan)
+
+
+def _label_fungsi(fungsi):
+    file, baris, nama = fungsi
+    if file == "~":
+        # Fungsi bawaan, misalnya "<method 'append' of 'list' objects>"
+        return nama.replace(";", ",")
+    return f"{nama} ({os.path.basename(file)}:{baris})".replace(";", ",")
+
+
+def stack_terlipat(stats):
+    """
+    Susun stack terlipat dari pstats.Stats. Kembalikan dict "a;b;c" -> mikrodetik waktu sendiri.
+    Waktu sebuah fungsi di suatu jalur = waktu sendirinya x (waktu kumulatif dari pemanggil di jalur itu
+    / waktu kumulatif totalnya). Panggilan rekursif (fungsi yang sudah ada di jalur) dilewati.
+    """
+    data = stats.stats
+    dipanggil = {}
+    for fungsi, (_, _, _, _, pemanggil) in data.items():
+        for asal, (_, _, _, ct) in pemanggil.items():
+            dipanggil.setdefault(asal, []).append((fungsi, ct))
+
+    akar = [fungsi for fungsi, nilai in data.items() if not any(asal in data for asal in nilai[4])]
+    hasil = {}
+    # (fungsi, jalur label, himpunan fungsi di jalur, waktu kumulatif yang dialokasikan ke jalur ini)
+    tumpukan = [(fungsi, (), frozenset(), data[fungsi][3]) for fungsi in akar]
+    while tumpukan:
+        fungsi, jalur, di_jalur, kumulatif = tumpukan.pop()
+        _, _, tt, ct, _ = data[fungsi]
+        fraksi = kumulatif / ct if ct > 0 else 0.0
+        jalur = jalur + (_label_fungsi(fungsi),)
+        sendiri = tt * fraksi * 1e6
+        if sendiri >= WAKTU_STACK_MIN:
+            kunci = ";".join(jalur)
+            hasil[kunci] = hasil.get(kunci, 0.0) + sendiri
+        di_jalur = di_jalur | {fungsi}
+        for anak, ct_anak in dipanggil.get(fungsi, ()):
+            if anak in di_jalur or ct_anak * fraksi * 1e6 < WAKTU_STACK_MIN:
+                continue
+            tumpukan.append((anak, jalur, di_jalur, ct_anak * fraksi))
+    return hasil
+
+
+class ProfilLembar:
+    """Kumpulkan profil per lembar dan simpan jumlah_lembar lembar terlambat ke direktori."""
+
+    def __init__(self, direktori, jumlah_lembar=JUMLAH_LEMBAR_DEFAULT, jumlah_alokasi=JUMLAH_ALOKASI):
+        self.direktori = direktori
+        self.jumlah_lembar = jumlah_lembar
+        self.jumlah_alokasi = jumlah_alokasi
+        self.durasi = []
+        # Min-heap RekamanProfil: lembar tercepat di antara yang disimpan ada di puncak
+        self._terlambat = []
+
+    @contextlib.contextmanager
+    def lembar(self, nama):
+        """Profilkan blok with sebagai satu lembar bernama."""
+        mulai_tracemalloc = not tracemalloc.is_tracing()
+        if mulai_tracemalloc:
+            tracemalloc.start(FRAME_TRACEMALLOC)
+        tracemalloc.reset_peak()
+        snapshot_awal = tracemalloc.take_snapshot()
+        profil = cProfile.Profile()
+        mulai = time.perf_counter()
+        profil.enable()
+        try:
+            yield
+        finally:
+            profil.disable()
+            durasi = time.perf_counter() - mulai
+            puncak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if mulai_tracemalloc:
+                tracemalloc.stop()
+            self._catat(nama, durasi, profil, puncak, snapshot, snapshot_awal)
+
+    def _catat(self, nama, durasi, profil, puncak, snapshot, snapshot_awal):
+        self.durasi.append(durasi)
+        if len(self._terlambat) >= self.jumlah_lembar and durasi <= self._terlambat[0].durasi:
+            return
+        # Hanya lembar yang disimpan yang ringkasan alokasinya dihitung
+        saring = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        selisih = snapshot.filter_traces(saring).compare_to(snapshot_awal.filter_traces(saring), "lineno")
+        alokasi = [
+            (stat.size_diff, stat.count_diff, f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}")
+            for stat in selisih if stat.size_diff > 0
+        ][:self.jumlah_alokasi]
+        rekaman = RekamanProfil(nama, len(self.durasi), durasi, profil, puncak, alokasi)
+        if len(self._terlambat) < self.jumlah_lembar:
+            heapq.heappush(self._terlambat, rekaman)
+        else:
+            heapq.heapreplace(self._terlambat, rekaman)
+
+    def tulis(self):
+        """Tulis profil lembar terlambat dan ringkasan ke direktori. Kembalikan daftar RekamanProfil (terlambat dulu)."""
+        os.makedirs(self.direktori, exist_ok=True)
+        terlambat = sorted(self._terlambat, reverse=True)
+        median = statistics.median(self.durasi) if self.durasi else 0.0
+        baris_ringkasan = [
+            f"{len(self.durasi)} lembar diprofilkan, median {median * 1000:.1f} ms; "
+            f"{len(terlambat)} lembar terlambat:",
+        ]
+        for peringkat, rekaman in enumerate(terlambat, 1):
+            awalan = os.path.join(self.direktori, f"{peringkat:02d}-{_KARAKTER_TIDAK_AMAN.sub('_', str(rekaman.nama))}")
+            stats = pstats.Stats(rekaman.profil)
+            stats.dump_stats(f"{awalan}.pstats")
+            with open(f"{awalan}.collapsed", "w", encoding="utf-8") as f:
+                for stack, mikrodetik in sorted(stack_terlipat(stats).items()):
+                    f.write(f"{stack} {int(round(mikrodetik))}\n")
+            with open(f"{awalan}.alokasi.txt", "w", encoding="utf-8") as f:
+                f.write(f"Puncak memori tracemalloc: {rekaman.puncak_memori / 1024:.1f} KiB\n")
+                f.write("Alokasi teratas yang masih hidup di akhir lembar (per baris):\n")
+                for ukuran, jumlah, lokasi in rekaman.alokasi:
+                    f.write(f"{ukuran / 1024:10.1f} KiB {jumlah:8d} blok  {lokasi}\n")
+
+            kelipatan = f", {rekaman.durasi / median:.1f}x median" if median > 0 else ""
+            baris_ringkasan.append(
+                f"{peringkat:2d}. {rekaman.nama} (lembar ke-{rekaman.urutan}): {rekaman.durasi * 1000:.1f} ms"
+                f"{kelipatan}, puncak memori {rekaman.puncak_memori / 1024:.0f} KiB -> {os.path.basename(awalan)}.*"
+            )
+        with open(os.path.join(self.direktori, "ringkasan.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(baris_ringkasan) + "\n")
+        return terlambat
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.tulis()
+        return False
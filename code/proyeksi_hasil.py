@@ -0,0 +1,506 @@
+"""
+Proyeksi ramping hasil analisis yang diurai langsung dari JSON mentah secara bertahap.
+
+Penilaian hanya memakai sebagian kecil respons Azure: isi dan polygon `pages[].lines`, `selection_marks`,
+sel `tables[].cells`, dan `styles`. Model SDK (`AnalyzeResult`) menyimpan seluruh respons sebagai dict
+JSON (termasuk `words`, `content`, `paragraphs`, `spans`) selama hasil dipakai, sehingga scan PDF banyak
+halaman memakan ratusan MB per dokumen.
+
+PembacaJSONBertahap membaca JSON per potongan (file atau stream HTTP) dan hanya mengurai nilai yang
+dibutuhkan; bagian lain dilewati elemen per elemen tanpa pernah disimpan. Hasilnya adalah ProyeksiHasil:
+objek ber-`__slots__` dengan nama atribut sama dengan model SDK (pages, lines, selection_marks, tables,
+cells, styles, ...), sehingga semua detektor dan lembar_bertahap dapat memakainya tanpa perubahan.
+Polygon disimpan sebagai array('d').
+
+analisis_proyeksi() mengunggah dokumen dengan SDK (tanpa poller), lalu memantau operasi dengan GET
+streaming dan memproyeksikan hasil saat respons dibaca. JSON mentah `analyzeResult` ditulis langsung ke
+cache analisis selama pembacaan (formatnya sama dengan `AnalyzeResult.as_dict()`), dan hit cache juga
+dibaca sebagai proyeksi.
+
+Lihat benchmark_proyeksi.py untuk pengukuran RSS pada respons sintetis 100 halaman.
+"""
+
+import codecs
+import json
+import os
+import re
+import time
+from array import array
+
+from azure.core.exceptions import HttpResponseError
+from azure.core.rest import HttpRequest
+
+from cache_analisis import body_unggahan, kunci_dokumen
+from instrumentasi import hitung, span
+
+UKURAN_POTONGAN = 64 * 1024
+POLLING_INTERVAL_DEFAULT = 1.0
+
+STATUS_BERHASIL = "succeeded"
+STATUS_GAGAL = ("failed", "canceled")
+
+_SPASI = re.compile(r"[ \t\n\r]*")
+# Sisa buffer yang mungkin masih bagian dari angka terpotong, misalnya "1700." atau "1e-"
+_SISA_ANGKA = re.compile(r"[0-9.eE+-]*")
+
+
+class PembacaJSONBertahap:
+    """
+    Pembaca JSON dari iterable potongan bytes. Hanya menyimpan buffer kecil: nilai diurai satu per satu
+    dengan nilai(), dilewati dengan lewati(), dan objek/larik ditelusuri dengan objek()/larik().
+    Bagian yang sudah dibaca dapat direkam apa adanya ke file teks (rekam/selesai_rekam).
+    Buffer diisi ulang sampai minimal ukuran_potongan karakter baru.
+    """
+
+    def __init__(self, potongan, ukuran_potongan=UKURAN_POTONGAN):
+        self._sumber = iter(potongan)
+        self._ukuran_potongan = ukuran_potongan
+        self._dekoder_utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._dekoder_json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._habis = False
+        self._rekaman = None
+        self._awal_rekam = 0
+
+    def _isi(self):
+        # Buang bagian yang sudah dibaca lalu tambah potongan berikutnya; False jika sumber habis
+        if self._habis:
+            return False
+        if self._rekaman is not None:
+            self._rekaman.write(self._buf[self._awal_rekam:self._pos])
+            self._awal_rekam = 0
+        bagian = [self._buf[self._pos:]]
+        panjang = 0
+        while panjang < self._ukuran_potongan:
+            potongan = next(self._sumber, None)
+            if potongan is None:
+                bagian.append(self._dekoder_utf8.decode(b"", final=True))
+                self._habis = True
+                break
+            teks = self._dekoder_utf8.decode(potongan)
+            bagian.append(teks)
+            panjang += len(teks)
+        self._buf = "".join(bagian)
+        self._pos = 0
+        return True
+
+    def _lihat(self):
+        """Karakter bukan spasi berikutnya (tanpa dikonsumsi), atau "" di akhir data."""
+        while True:
+            pos = _SPASI.match(self._buf, self._pos).end()
+            self._pos = pos
+            if pos < len(self._buf):
+                return self._buf[pos]
+            if not self._isi():
+                return ""
+
+    def _harap(self, karakter):
+        if self._lihat() != karakter:
+            raise ValueError(f"JSON tidak valid: diharapkan {karakter!r} pada posisi {self._pos}")
+        self._pos += 1
+
+    def nilai(self):
+        """Urai satu nilai JSON lengkap (dipakai untuk nilai kecil seperti satu garis atau satu sel)."""
+        self._lihat()
+        while True:
+            try:
+                hasil, akhir = self._dekoder_json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Nilai terpotong di akhir buffer
+                if not self._isi():
+                    raise
+                continue
+            if not self._habis and _SISA_ANGKA.fullmatch(self._buf, akhir):
+                # Angka di akhir buffer mungkin masih berlanjut di potongan berikutnya: "1700" + ".5",
+                # atau "1e" + "-3" (raw_decode berhenti sebelum "." atau "e" yang belum lengkap)
+                self._isi()
+                continue
+            self._pos = akhir
+            return hasil
+
+    def _lewati_string(self):
+        # Posisi pada tanda kutip pembuka; cari kutip penutup yang tidak di-escape tanpa menyimpan isi string
+        i = self._pos + 1
+        while True:
+            buf = self._buf
+            j = buf.find('"', i)
+            if j < 0:
+                # Simpan deretan backslash di akhir buffer agar escape tetap terbaca setelah diisi ulang
+                k = len(buf)
+                while k > i and buf[k - 1] == "\\":
+                    k -= 1
+                self._pos = k
+                if not self._isi():
+                    raise ValueError("JSON tidak valid: string tidak ditutup")
+                i = 0
+                continue
+            jumlah_backslash = 0
+            while j - 1 - jumlah_backslash >= 0 and buf[j - 1 - jumlah_backslash] == "\\":
+                jumlah_backslash += 1
+            if jumlah_backslash % 2 == 0:
+                self._pos = j + 1
+                return
+            i = j + 1
+
+    def lewati(self):
+        """Lewati satu nilai. Objek dan larik dilewati per elemen, string besar tanpa dibuat sama sekali."""
+        karakter = self._lihat()
+        if karakter == '"':
+            self._lewati_string()
+        elif karakter == "[":
+            for _ in self.larik():
+                self._lewati_elemen()
+        elif karakter == "{":
+            for _ in self.objek():
+                self._lewati_elemen()
+        else:
+            self.nilai()
+
+    def _lewati_elemen(self):
+        # Elemen kecil (misalnya satu kata) lebih cepat diurai dengan decoder C lalu dibuang
+        if self._lihat() == '"':
+            self._lewati_string()
+        else:
+            self.nilai()
+
+    def objek(self):
+        """Telusuri objek: hasilkan setiap kunci; pemanggil wajib membaca atau melewati nilainya."""
+        self._harap("{")
+        if self._lihat() == "}":
+            self._pos += 1
+            return
+        while True:
+            kunci = self.nilai()
+            self._harap(":")
+            yield kunci
+            karakter = self._lihat()
+            self._pos += 1
+            if karakter == "}":
+                return
+            if karakter != ",":
+                raise ValueError(f"JSON tidak valid: diharapkan ',' atau '}}' pada posisi {self._pos - 1}")
+
+    def larik(self):
+        """Telusuri larik: hasilkan indeks setiap elemen; pemanggil wajib membaca atau melewati elemennya."""
+        self._harap("[")
+        if self._lihat() == "]":
+            self._pos += 1
+            return
+        indeks = 0
+        while True:
+            yield indeks
+            indeks += 1
+            karakter = self._lihat()
+            self._pos += 1
+            if karakter == "]":
+                return
+            if karakter != ",":
+                raise ValueError(f"JSON tidak valid: diharapkan ',' atau ']' pada posisi {self._pos - 1}")
+
+    def rekam(self, keluaran):
+        """Mulai menyalin teks JSON mentah dari posisi nilai berikutnya ke keluaran (file teks)."""
+        self._lihat()
+        self._rekaman = keluaran
+        self._awal_rekam = self._pos
+
+    def selesai_rekam(self):
+        self._rekaman.write(self._buf[self._awal_rekam:self._pos])
+        self._rekaman = None
+
+
+class ProyeksiWilayah:
+    __slots__ = ("page_number", "polygon")
+
+    def __init__(self, page_number, polygon):
+        self.page_number = page_number
+        self.polygon = polygon
+
+
+class ProyeksiGaris:
+    __slots__ = ("content", "polygon")
+
+    def __init__(self, content, polygon):
+        self.content = content
+        self.polygon = polygon
+
+
+class ProyeksiTanda:
+    __slots__ = ("state", "confidence", "polygon")
+
+    def __init__(self, state, confidence, polygon):
+        self.state = state
+        self.confidence = confidence
+        self.polygon = polygon
+
+
+class ProyeksiHalaman:
+    __slots__ = ("page_number", "width", "height", "unit", "lines", "selection_marks")
+
+    def __init__(self):
+        self.page_number = None
+        self.width = None
+        self.height = None
+        self.unit = None
+        self.lines = []
+        self.selection_marks = []
+
+
+class ProyeksiSel:
+    __slots__ = ("row_index", "column_index", "row_span", "column_span", "kind", "content", "bounding_regions")
+
+    def __init__(self, row_index, column_index, row_span, column_span, kind, content, bounding_regions):
+        self.row_index = row_index
+        self.column_index = column_index
+        self.row_span = row_span
+        self.column_span = column_span
+        self.kind = kind
+        self.content = content
+        self.bounding_regions = bounding_regions
+
+
+class ProyeksiTabel:
+    __slots__ = ("row_count", "column_count", "cells", "bounding_regions")
+
+    def __init__(self):
+        self.row_count = None
+        self.column_count = None
+        self.cells = []
+        self.bounding_regions = None
+
+
+class ProyeksiGaya:
+    __slots__ = ("is_handwritten", "confidence")
+
+    def __init__(self, is_handwritten, confidence):
+        self.is_handwritten = is_handwritten
+        self.confidence = confidence
+
+
+class ProyeksiHasil:
+    """Bagian AnalyzeResult yang dipakai penilaian: pages, tables, dan styles."""
+
+    __slots__ = ("pages", "tables", "styles")
+
+    def __init__(self):
+        self.pages = []
+        self.tables = []
+        self.styles = []
+
+
+def _polygon(data):
+    return array("d", data) if data else None
+
+
+def _wilayah(data):
+    if not data:
+        return None
+    return [ProyeksiWilayah(region.get("pageNumber"), _polygon(region.get("polygon"))) for region in data]
+
+
+def _baca_halaman(pembaca):
+    halaman = ProyeksiHalaman()
+    for kunci in pembaca.objek():
+        if kunci == "pageNumber":
+            halaman.page_number = pembaca.nilai()
+        elif kunci == "width":
+            halaman.width = pembaca.nilai()
+        elif kunci == "height":
+            halaman.height = pembaca.nilai()
+        elif kunci == "unit":
+            halaman.unit = pembaca.nilai()
+        elif kunci == "lines":
+            for _ in pembaca.larik():
+                data = pembaca.nilai()
+                halaman.lines.append(ProyeksiGaris(data.get("content", ""), _polygon(data.get("polygon"))))
+        elif kunci == "selectionMarks":
+            for _ in pembaca.larik():
+                data = pembaca.nilai()
+                halaman.selection_marks.append(
+                    ProyeksiTanda(data.get("state"), data.get("confidence", 0.0), _polygon(data.get("polygon")))
+                )
+        else:
+            # words, spans, barcodes, formulas, ...
+            pembaca.lewati()
+    return halaman
+
+
+def _baca_tabel(pembaca):
+    tabel = ProyeksiTabel()
+    for kunci in pembaca.objek():
+        if kunci == "rowCount":
+            tabel.row_count = pembaca.nilai()
+        elif kunci == "columnCount":
+            tabel.column_count = pembaca.nilai()
+        elif kunci == "cells":
+            for _ in pembaca.larik():
+                data = pembaca.nilai()
+                tabel.cells.append(ProyeksiSel(
+                    data.get("rowIndex"), data.get("columnIndex"), data.get("rowSpan"), data.get("columnSpan"),
+                    data.get("kind"), data.get("content", ""), _wilayah(data.get("boundingRegions")),
+                ))
+        elif kunci == "boundingRegions":
+            tabel.bounding_regions = _wilayah(pembaca.nilai())
+        else:
+            pembaca.lewati()
+    return tabel
+
+
+def _baca_hasil(pembaca):
+    hasil = ProyeksiHasil()
+    for kunci in pembaca.objek():
+        if kunci == "pages":
+            for _ in pembaca.larik():
+                hasil.pages.append(_baca_halaman(pembaca))
+        elif kunci == "tables":
+            for _ in pembaca.larik():
+                hasil.tables.append(_baca_tabel(pembaca))
+        elif kunci == "styles":
+            for _ in pembaca.larik():
+                data = pembaca.nilai()
+                hasil.styles.append(ProyeksiGaya(data.get("isHandwritten"), data.get("confidence")))
+        else:
+            # content, paragraphs, sections, figures, documents, ...
+            pembaca.lewati()
+    return hasil
+
+
+def proyeksi_dari_potongan(potongan):
+    """Proyeksikan JSON AnalyzeResult (format `as_dict()`) dari iterable potongan bytes."""
+    return _baca_hasil(PembacaJSONBertahap(potongan))
+
+
+def proyeksi_dari_file(path):
+    """Proyeksikan file JSON AnalyzeResult (misalnya entri cache analisis) tanpa memuat seluruh isinya."""
+    with open(path, "rb") as f:
+        return proyeksi_dari_potongan(iter(lambda: f.read(UKURAN_POTONGAN), b""))
+
+
+def baca_respons_operasi(potongan, rekaman=None):
+    """
+    Baca respons GET analyzeResults/<id>. Kembalikan (status, ProyeksiHasil atau None, galat atau None).
+    Pembacaan berhenti begitu status diketahui belum selesai. Jika rekaman (file teks) diberikan, JSON
+    mentah `analyzeResult` disalin ke sana selama diurai.
+    """
+    pembaca = PembacaJSONBertahap(potongan)
+    status = hasil = galat = None
+    for kunci in pembaca.objek():
+        if kunci == "status":
+            status = pembaca.nilai()
+            if status != STATUS_BERHASIL and status not in STATUS_GAGAL:
+                break
+        elif kunci == "analyzeResult":
+            if rekaman is not None:
+                pembaca.rekam(rekaman)
+            hasil = _baca_hasil(pembaca)
+            if rekaman is not None:
+                pembaca.selesai_rekam()
+        elif kunci == "error":
+            galat = pembaca.nilai()
+        else:
+            pembaca.lewati()
+    return status, hasil, galat
+
+
+def _url_operasi(client, model_id, id_operasi):
+    api_version = getattr(getattr(client, "_config", None), "api_version", "")
+    return f"documentModels/{model_id}/analyzeResults/{id_operasi}?api-version={api_version}"
+
+
+def tunggu_proyeksi(client, model_id, id_operasi, polling_interval=None, rekaman=None):
+    """
+    Pantau operasi dengan GET streaming sampai selesai dan kembalikan ProyeksiHasil. Jeda antar GET
+    mengikuti Retry-After, atau polling_interval (default 1 detik). Operasi gagal memunculkan HttpResponseError.
+    """
+    url = _url_operasi(client, model_id, id_operasi)
+    jeda_default = polling_interval if polling_interval is not None else POLLING_INTERVAL_DEFAULT
+    while True:
+        response = client.send_request(HttpRequest("GET", url), stream=True)
+        try:
+            if response.status_code != 200:
+                response.read()
+                raise HttpResponseError(response=response)
+            status, hasil, galat = baca_respons_operasi(response.iter_bytes(), rekaman)
+            retry_after = response.headers.get("Retry-After")
+        finally:
+            response.close()
+        if status == STATUS_BERHASIL:
+            if hasil is None:
+                raise HttpResponseError(message="Respons operasi tidak memuat analyzeResult")
+            return hasil
+        if status in STATUS_GAGAL:
+            raise HttpResponseError(message=f"Analisis {status}: {json.dumps(galat, ensure_ascii=False)}")
+        try:
+            jeda = float(retry_after) if retry_after else jeda_default
+        except ValueError:
+            jeda = jeda_default
+        time.sleep(jeda)
+
+
+def tunggu_dan_simpan(client, model_id, id_operasi, cache=None, kunci=None, polling_interval=None):
+    """
+    tunggu_proyeksi, dan jika cache diberikan, JSON mentah analyzeResult ditulis ke file sementara cache
+    selama diurai lalu menjadi entri kunci setelah operasi berhasil.
+    """
+    if cache is None:
+        return tunggu_proyeksi(client, model_id, id_operasi, polling_interval)
+    path_sementara = cache.path_sementara(kunci)
+    try:
+        with open(path_sementara, "w", encoding="utf-8") as rekaman:
+            hasil = tunggu_proyeksi(client, model_id, id_operasi, polling_interval, rekaman)
+    except BaseException:
+        try:
+            os.remove(path_sementara)
+        except OSError:
+            pass
+        raise
+    cache.simpan_file(kunci, path_sementara)
+    return hasil
+
+
+def analisis_proyeksi(client, dokumen, model_id="prebuilt-layout", cache=None, jurnal=None,
+                      polling_interval=None):
+    """
+    Seperti analisis_dengan_cache, tetapi mengembalikan ProyeksiHasil dan tidak pernah membangun model SDK
+    lengkap: hit cache dibaca bertahap dari file, dan respons Azure diurai bertahap dari stream HTTP.
+    Operasi dicatat di jurnal dengan id operasinya sehingga dapat dilanjutkan setelah proses mati.
+    """
+    api_version = getattr(getattr(client, "_config", None), "api_version", "")
+    kunci = None
+    if cache is not None:
+        with span("cache_ambil"):
+            kunci = kunci_dokumen(dokumen, model_id, api_version)
+            path = cache.path_entri(kunci)
+            hasil = proyeksi_dari_file(path) if path is not None else None
+        if hasil is not None:
+            hitung("cache_hit")
+            print(f"Hasil analisis diambil dari cache ({kunci[:12]})")
+            return hasil
+        hitung("cache_miss")
+    elif jurnal is not None:
+        kunci = kunci_dokumen(dokumen, model_id, api_version)
+
+    entri = jurnal.ambil(kunci) if jurnal is not None else None
+    if entri is not None and entri.get("id_operasi"):
+        try:
+            with span("tunggu_polling"):
+                hasil = tunggu_dan_simpan(client, model_id, entri["id_operasi"], cache, kunci, polling_interval)
+            hitung("operasi_dilanjutkan")
+            print(f"Operasi analisis dilanjutkan dari jurnal ({kunci[:12]})")
+            jurnal.hapus(kunci)
+            return hasil
+        except HttpResponseError as e:
+            print(f"Operasi di jurnal tidak dapat dilanjutkan ({e.status_code}), mengunggah ulang")
+            jurnal.hapus(kunci)
+
+    # Unggah tanpa poller SDK: polling dilakukan sendiri dengan GET streaming
+    with span("unggah_analisis"), body_unggahan(dokumen) as body:
+        poller = client.begin_analyze_document(model_id, body, polling=False)
+    id_operasi = poller.details["operation_id"]
+    if jurnal is not None:
+        jurnal.catat(kunci, None, model_id, id_operasi)
+    with span("tunggu_polling"):
+        hasil = tunggu_dan_simpan(client, model_id, id_operasi, cache, kunci, polling_interval)
+    if jurnal is not None:
+        jurnal.hapus(kunci)
+    return hasil
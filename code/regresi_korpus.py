@@ -0,0 +1,350 @@
+"""
+Gerbang regresi throughput dan kelengkapan deteksi atas korpus hasil analisis yang direkam.
+
+Korpus adalah direktori berisi hasil analisis (JSON format `AnalyzeResult.as_dict()`, sama dengan entri
+cache analisis) dan manifest.json yang mencatat jawaban sebenarnya dan skema ujian setiap lembar:
+  {"versi": 1, "lembar": [{"file": "...", "jawaban": "AB-D...", "ujian": {"jumlah_soal": 40, "pilihan": "ABCD"}}]}
+Korpus bawaan (korpus_regresi/) direkam dari hasil_sintetis.py dengan --rekam; lembar nyata dengan
+jawaban yang sudah diperiksa ditambahkan dengan --tambah.
+
+Setiap putaran menilai seluruh korpus dengan nilai_lembar() (kaskade detektor, tanpa pembanding
+himpunan) lalu menjalankan setiap detektor sendiri-sendiri pada semua soal. Dilaporkan:
+  lembar_per_detik            throughput nilai_lembar (hasil sudah dimuat; waktu terbaik dari --ulang)
+  kalibrasi_per_detik         putaran beban kalibrasi Python murni per detik, diukur di proses yang sama
+  lembar_per_kalibrasi        lembar_per_detik / kalibrasi_per_detik: throughput yang tidak bergantung
+                              pada kecepatan mesin, dipakai untuk gerbang
+  terdeteksi / benar          proporsi soal yang dijawab oleh detektor dan proporsi soal yang sama dengan
+                              jawaban sebenarnya, untuk kaskade dan per metode. Untuk kaskade, jawaban
+                              fallback di luar detektor (metode "-", misalnya pola jawaban) tidak dihitung
+                              terdeteksi, tetapi tetap dihitung benar jika cocok
+  ms_per_lembar per metode    waktu detektor sendiri-sendiri
+Laporan dibandingkan dengan baseline.json di korpus. Program keluar dengan status gagal jika
+lembar_per_kalibrasi turun lebih dari --ambang-throughput (relatif) atau proporsi terdeteksi/benar turun
+lebih dari --ambang-deteksi (absolut). lembar_per_detik dan waktu per metode hanya dilaporkan.
+
+Contoh:
+    python regresi_korpus.py korpus_regresi                     # jalankan dan bandingkan dengan baseline
+    python regresi_korpus.py korpus_regresi --simpan-baseline   # perbarui baseline setelah perubahan yang disengaja
+    python regresi_korpus.py korpus_regresi --tambah .cache_analisis/ab/abcd....json --jawaban CBCD... --ujian ujian.json
+    python regresi_korpus.py korpus_regresi --rekam             # rekam ulang korpus sintetis
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+
+from geometri_lembar import SheetGeometry
+from indeks_tabel import buat_indeks_tabel
+from penilaian import (
+    KonteksLembar,
+    analisis_posisi_jawaban,
+    buat_penjadwal_detektor,
+    detektor_baris,
+    detektor_himpunan,
+    detektor_huruf_tidak_muncul,
+    detektor_tanda_silang,
+    kumpulkan_tanda_silang,
+    nilai_lembar,
+)
+from skema_ujian import SkemaUjian, muat_ujian
+
+VERSI_KORPUS = 1
+# Jumlah elemen beban kalibrasi (sekitar 50 ms per putaran)
+UKURAN_KALIBRASI = 60_000
+FILE_MANIFEST = "manifest.json"
+FILE_BASELINE = "baseline.json"
+
+METODE = {
+    "huruf_tidak_muncul": detektor_huruf_tidak_muncul,
+    "himpunan": detektor_himpunan,
+    "baris": detektor_baris,
+    "tanda_silang": detektor_tanda_silang,
+}
+
+# Lembar sintetis korpus bawaan: (tata_letak, jumlah_soal, pilihan, opsi buat_lembar_sintetis)
+REKAMAN_SINTETIS = (
+    ("vertikal", 40, "ABCD", {}),
+    ("vertikal", 40, "ABCD", {"derau_garis": 40, "tanda_tambahan": 10, "huruf_terbaca": 0.3}),
+    ("vertikal", 100, "ABCDE", {"derau_garis": 80, "rasio_goresan": 0.3, "kosong": 0.1}),
+    ("horizontal", 40, "ABCD", {"huruf_terbaca": 0.5}),
+    ("horizontal", 60, "ABCDE", {"derau_garis": 30, "tanda_tambahan": 20, "huruf_terbaca": 0.8}),
+    ("grid", 40, "ABCD", {"huruf_terbaca": 0.5, "rasio_goresan": 0.5}),
+    ("grid", 100, "ABCD", {"derau_garis": 60, "jumlah_tanda": 70, "huruf_terbaca": 0.5}),
+)
+
+
+def _tulis_json(path, data):
+    sementara = f"{path}.{os.getpid()}.tmp"
+    with open(sementara, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    os.replace(sementara, path)
+
+
+def muat_manifest(direktori):
+    path = os.path.join(direktori, FILE_MANIFEST)
+    if not os.path.exists(path):
+        return {"versi": VERSI_KORPUS, "lembar": []}
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("versi") != VERSI_KORPUS:
+        raise ValueError(f"Versi korpus {manifest.get('versi')} tidak didukung (harus {VERSI_KORPUS})")
+    return manifest
+
+
+def tambah_lembar(direktori, nama, data, jawaban, skema):
+    """Simpan satu hasil analisis (dict as_dict) dengan jawaban sebenarnya ke korpus."""
+    if len(jawaban) != skema.jumlah_soal:
+        raise ValueError(f"jawaban berisi {len(jawaban)} huruf, skema {skema.jumlah_soal} soal")
+    os.makedirs(direktori, exist_ok=True)
+    manifest = muat_manifest(direktori)
+    with open(os.path.join(direktori, nama), "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    manifest["lembar"] = [entri for entri in manifest["lembar"] if entri["file"] != nama]
+    manifest["lembar"].append({"file": nama, "jawaban": "".join(jawaban), "ujian": skema.ke_dict()})
+    _tulis_json(os.path.join(direktori, FILE_MANIFEST), manifest)
+
+
+def rekam_sintetis(direktori):
+    """Rekam ulang korpus bawaan dari hasil_sintetis.py (lembar non-sintetis di manifest tetap dipertahankan)."""
+    from hasil_sintetis import buat_lembar_sintetis
+
+    for i, (tata_letak, jumlah_soal, pilihan, opsi) in enumerate(REKAMAN_SINTETIS):
+        skema = SkemaUjian(jumlah_soal, tuple(pilihan))
+        lembar = buat_lembar_sintetis(skema, tata_letak, seed=i, **opsi)
+        nama = f"sintetis-{i:02d}-{tata_letak}-{jumlah_soal}.json"
+        tambah_lembar(direktori, nama, lembar.data, lembar.jawaban, skema)
+        print(f"Direkam: {nama}")
+
+
+def muat_korpus(direktori, jenis_hasil="sdk"):
+    """Daftar (nama, result, jawaban, skema) untuk setiap lembar di manifest."""
+    korpus = []
+    for entri in muat_manifest(direktori)["lembar"]:
+        path = os.path.join(direktori, entri["file"])
+        if jenis_hasil == "proyeksi":
+            from proyeksi_hasil import proyeksi_dari_file
+
+            result = proyeksi_dari_file(path)
+        else:
+            from azure.ai.documentintelligence.models import AnalyzeResult
+
+            with open(path, "r", encoding="utf-8") as f:
+                result = AnalyzeResult(json.load(f))
+        ujian = entri["ujian"]
+        skema = SkemaUjian(ujian["jumlah_soal"], tuple(ujian["pilihan"]))
+        korpus.append((entri["file"], result, list(entri["jawaban"]), skema))
+    return korpus
+
+
+def beban_kalibrasi(ukuran=UKURAN_KALIBRASI):
+    """Beban Python murni (aritmetika float, dict, list, sort) yang mirip kerja detektor, untuk kalibrasi."""
+    data = [((i * 7919) % 1009) / 7.0 for i in range(ukuran)]
+    kelompok = {}
+    for i, x in enumerate(data):
+        kelompok.setdefault(int(x) % 97, []).append((x, i))
+    return sum(min(isi)[0] for isi in kelompok.values()) + len(sorted(data))
+
+
+def _proporsi(daftar_jawaban, korpus, daftar_metode=None):
+    """
+    (terdeteksi, benar) atas seluruh soal korpus. Jika daftar_metode diberikan (metode per soal dari
+    nilai_lembar), hanya jawaban dengan metode detektor yang dihitung terdeteksi.
+    """
+    total = terdeteksi = benar = 0
+    for i, (jawaban, (_, _, jawaban_benar, skema)) in enumerate(zip(daftar_jawaban, korpus)):
+        total += skema.jumlah_soal
+        if daftar_metode is None:
+            terdeteksi += skema.jumlah_soal - jawaban.count("-")
+        else:
+            metode = daftar_metode[i] or ()
+            terdeteksi += sum(1 for a, m in zip(jawaban, metode) if a != "-" and m != "-")
+        benar += sum(1 for a, b in zip(jawaban, jawaban_benar) if a == b and a != "-")
+    return round(terdeteksi / total, 4), round(benar / total, 4)
+
+
+def jalankan_korpus(korpus, ulang=5):
+    """Nilai seluruh korpus --ulang kali dan ukur setiap metode. Kembalikan laporan (dict)."""
+    detik_kaskade = float("inf")
+    detik_kalibrasi = float("inf")
+    detik_metode = {nama: float("inf") for nama in METODE}
+    jawaban_kaskade = []
+    metode_kaskade = []
+    jawaban_metode = {nama: [] for nama in METODE}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(ulang):
+            # Kalibrasi di setiap putaran, agar kalibrasi dan korpus diukur pada kondisi mesin yang sama
+            mulai = time.perf_counter()
+            beban_kalibrasi()
+            detik_kalibrasi = min(detik_kalibrasi, time.perf_counter() - mulai)
+
+            # Penjadwal baru per putaran, agar setiap putaran mulai dari biaya awal yang sama
+            penjadwal = buat_penjadwal_detektor()
+            jawaban_kaskade = []
+            metode_kaskade = []
+            mulai = time.perf_counter()
+            for _, result, jawaban_benar, skema in korpus:
+                hasil = nilai_lembar(result, jawaban_benar, penjadwal, bandingkan_himpunan=False, skema=skema)
+                jawaban_kaskade.append(hasil["jawaban"])
+                metode_kaskade.append(hasil["metode"])
+            detik_kaskade = min(detik_kaskade, time.perf_counter() - mulai)
+
+            # Setiap metode sendiri-sendiri pada semua soal; konteks dibangun di luar pengukuran
+            konteks_lembar = []
+            for _, result, _, skema in korpus:
+                indeks_tabel = buat_indeks_tabel(result)
+                geometri = SheetGeometry(result, indeks_tabel)
+                _, posisi_jawaban = analisis_posisi_jawaban(result, indeks_tabel, geometri, None, skema)
+                konteks = KonteksLembar(result, indeks_tabel, geometri, kumpulkan_tanda_silang(geometri),
+                                        posisi_jawaban, skema)
+                konteks_lembar.append((konteks, frozenset(range(1, skema.jumlah_soal + 1))))
+            for nama, fungsi in METODE.items():
+                jawaban_metode[nama] = []
+                mulai = time.perf_counter()
+                for konteks, soal in konteks_lembar:
+                    jawaban_metode[nama].append(fungsi(konteks, soal)[0])
+                detik_metode[nama] = min(detik_metode[nama], time.perf_counter() - mulai)
+
+    terdeteksi, benar = _proporsi(jawaban_kaskade, korpus, metode_kaskade)
+    lembar_per_detik = len(korpus) / detik_kaskade
+    kalibrasi_per_detik = 1 / detik_kalibrasi
+    laporan = {
+        "lembar": len(korpus),
+        "soal": sum(skema.jumlah_soal for *_, skema in korpus),
+        "lembar_per_detik": round(lembar_per_detik, 2),
+        "kalibrasi_per_detik": round(kalibrasi_per_detik, 2),
+        "lembar_per_kalibrasi": round(lembar_per_detik / kalibrasi_per_detik, 4),
+        "kaskade": {"terdeteksi": terdeteksi, "benar": benar},
+        "metode": {},
+    }
+    for nama in METODE:
+        terdeteksi, benar = _proporsi(jawaban_metode[nama], korpus)
+        laporan["metode"][nama] = {
+            "ms_per_lembar": round(detik_metode[nama] * 1000 / len(korpus), 3),
+            "terdeteksi": terdeteksi,
+            "benar": benar,
+        }
+    return laporan
+
+
+def bandingkan_baseline(laporan, baseline, ambang_throughput=0.2, ambang_deteksi=0.01):
+    """Daftar pelanggaran (string) laporan terhadap baseline; kosong jika lolos."""
+    pelanggaran = []
+    if laporan["lembar"] != baseline["lembar"] or laporan["soal"] != baseline["soal"]:
+        pelanggaran.append(f"korpus berubah ({baseline['lembar']} -> {laporan['lembar']} lembar); "
+                           f"simpan ulang baseline")
+        return pelanggaran
+
+    if "lembar_per_kalibrasi" not in baseline:
+        pelanggaran.append("baseline tanpa lembar_per_kalibrasi (format lama); simpan ulang baseline")
+        return pelanggaran
+    batas = baseline["lembar_per_kalibrasi"] * (1 - ambang_throughput)
+    if laporan["lembar_per_kalibrasi"] < batas:
+        pelanggaran.append(f"throughput {laporan['lembar_per_kalibrasi']:.4f} lembar/kalibrasi < {batas:.4f} "
+                           f"(baseline {baseline['lembar_per_kalibrasi']:.4f})")
+
+    pasangan = [("kaskade", laporan["kaskade"], baseline["kaskade"])]
+    pasangan += [(nama, laporan["metode"][nama], baseline["metode"].get(nama)) for nama in laporan["metode"]]
+    for nama, sekarang, dasar in pasangan:
+        if dasar is None:
+            continue
+        for ukuran in ("terdeteksi", "benar"):
+            if sekarang[ukuran] < dasar[ukuran] - ambang_deteksi:
+                pelanggaran.append(f"{nama}: {ukuran} {sekarang[ukuran]:.2%} < baseline {dasar[ukuran]:.2%}")
+    return pelanggaran
+
+
+def tampilkan_laporan(laporan, baseline=None):
+    def banding(nilai, dasar, format_nilai):
+        teks = format(nilai, format_nilai)
+        return teks if dasar is None else f"{teks} ({format(dasar, format_nilai)})"
+
+    dasar = baseline or {}
+    print(f"Korpus: {laporan['lembar']} lembar, {laporan['soal']} soal"
+          + ("   [nilai baseline dalam kurung]" if baseline else ""))
+    print(f"Throughput nilai_lembar: {banding(laporan['lembar_per_detik'], dasar.get('lembar_per_detik'), '.2f')} "
+          f"lembar/detik, kalibrasi {banding(laporan['kalibrasi_per_detik'], dasar.get('kalibrasi_per_detik'), '.2f')}"
+          f"/detik")
+    print(f"Throughput relatif: {banding(laporan['lembar_per_kalibrasi'], dasar.get('lembar_per_kalibrasi'), '.4f')} "
+          f"lembar/kalibrasi")
+    kaskade, kaskade_dasar = laporan["kaskade"], dasar.get("kaskade", {})
+    print(f"Kaskade: terdeteksi {banding(kaskade['terdeteksi'], kaskade_dasar.get('terdeteksi'), '.2%')}, "
+          f"benar {banding(kaskade['benar'], kaskade_dasar.get('benar'), '.2%')}")
+    print(f"\n{'Metode':<20} {'ms/lembar':>22} {'terdeteksi':>22} {'benar':>22}")
+    for nama, metrik in laporan["metode"].items():
+        metrik_dasar = dasar.get("metode", {}).get(nama, {})
+        print(f"{nama:<20} {banding(metrik['ms_per_lembar'], metrik_dasar.get('ms_per_lembar'), '.3f'):>22} "
+              f"{banding(metrik['terdeteksi'], metrik_dasar.get('terdeteksi'), '.2%'):>22} "
+              f"{banding(metrik['benar'], metrik_dasar.get('benar'), '.2%'):>22}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerbang regresi throughput dan deteksi atas korpus hasil analisis")
+    parser.add_argument("korpus", help="direktori korpus (manifest.json, hasil analisis, baseline.json)")
+    parser.add_argument("--rekam", action="store_true", help="rekam ulang lembar sintetis korpus bawaan")
+    parser.add_argument("--tambah", metavar="HASIL_JSON", help="tambahkan hasil analisis (format as_dict) ke korpus")
+    parser.add_argument("--jawaban", help="jawaban sebenarnya untuk --tambah, misalnya CBCD-A... ('-' = kosong)")
+    parser.add_argument("--ujian", help="file ujian (jumlah soal dan pilihan) untuk --tambah")
+    parser.add_argument("--hasil", choices=("sdk", "proyeksi"), default="sdk",
+                        help="muat lembar sebagai AnalyzeResult SDK atau ProyeksiHasil")
+    parser.add_argument("--ulang", type=int, default=5, help="putaran pengukuran (diambil yang tercepat)")
+    parser.add_argument("--simpan-baseline", action="store_true", help="tulis laporan ini sebagai baseline")
+    parser.add_argument("--ambang-throughput", type=float, default=0.2,
+                        help="penurunan lembar_per_kalibrasi relatif maksimum (default 0.2 = 20%%)")
+    parser.add_argument("--ambang-deteksi", type=float, default=0.01,
+                        help="penurunan proporsi terdeteksi/benar absolut maksimum (default 0.01)")
+    args = parser.parse_args()
+
+    if args.rekam:
+        rekam_sintetis(args.korpus)
+        return
+    if args.tambah:
+        if not args.jawaban:
+            parser.error("--tambah membutuhkan --jawaban")
+        skema = muat_ujian(args.ujian)[0] if args.ujian else SkemaUjian(len(args.jawaban))
+        jawaban = [huruf.strip().upper() for huruf in args.jawaban]
+        tidak_dikenal = set(jawaban) - skema.himpunan_pilihan - {"-"}
+        if tidak_dikenal:
+            raise SystemExit(f"Jawaban berisi huruf di luar pilihan: {sorted(tidak_dikenal)}")
+        with open(args.tambah, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        nama = os.path.basename(args.tambah)
+        tambah_lembar(args.korpus, nama, data, jawaban, skema)
+        print(f"Ditambahkan ke korpus: {nama}")
+        return
+
+    korpus = muat_korpus(args.korpus, args.hasil)
+    if not korpus:
+        raise SystemExit(f"Korpus {args.korpus} kosong; rekam dengan --rekam atau tambahkan lembar dengan --tambah")
+    laporan = jalankan_korpus(korpus, args.ulang)
+
+    path_baseline = os.path.join(args.korpus, FILE_BASELINE)
+    if args.simpan_baseline:
+        _tulis_json(path_baseline, laporan)
+        tampilkan_laporan(laporan)
+        print(f"\nBaseline disimpan ke {path_baseline}")
+        return
+
+    baseline = None
+    if os.path.exists(path_baseline):
+        with open(path_baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    tampilkan_laporan(laporan, baseline)
+    if baseline is None:
+        print(f"\nBelum ada baseline ({path_baseline}); simpan dengan --simpan-baseline")
+        return
+
+    pelanggaran = bandingkan_baseline(laporan, baseline, args.ambang_throughput, args.ambang_deteksi)
+    if pelanggaran:
+        print("\nRegresi terdeteksi:")
+        for teks in pelanggaran:
+            print(f"  - {teks}")
+        raise SystemExit(1)
+    print("\nTidak ada regresi terhadap baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Pembelajaran ROI (region of interest) tabel jawaban untuk satu angkatan lembar ujian yang sama.
+
+Beberapa lembar pertama dianalisis penuh; posisi tabel jawaban (tabel yang sama dengan yang dipilih
+`pilih_tabel_jawaban`) dicatat sebagai kotak ternormalisasi terhadap ukuran halaman (0..1) dan
+digabung. Setelah cukup sampel, lembar berikutnya dipotong ke ROI tersebut ditambah margin sebelum
+diunggah, sehingga gambar lebih kecil dan kop, nama, serta instruksi tidak ikut menjadi garis teks
+bagi detektor. Koordinat hasil analisis potongan dipetakan kembali ke koordinat gambar asli.
+
+Jika tabel jawaban tidak ditemukan pada potongan, lembar dianalisis penuh dan ROI diperluas dengan
+posisi tabel pada lembar tersebut. Hanya gambar satu halaman yang dipotong; PDF dan TIFF
+multi-halaman dikirim utuh. Pemotongan membutuhkan Pillow.
+"""
+
+import io
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+from cache_analisis import analisis_dengan_cache
+from geometri_lembar import titik_polygon
+from instrumentasi import hitung, span
+from penilaian import pilih_tabel_jawaban
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow hanya dibutuhkan jika ROI dipakai untuk memotong gambar
+    Image = None
+
+# Margin pengaman di setiap sisi ROI, sebagai rasio dari ukuran halaman
+MARGIN_DEFAULT = 0.03
+JUMLAH_SAMPEL_DEFAULT = 3
+
+
+def kotak_tabel_jawaban(result):
+    """
+    Kotak tabel jawaban (x0, y0, x1, y1) ternormalisasi terhadap lebar/tinggi halamannya,
+    None jika tabel jawaban atau ukuran halaman tidak diketahui.
+    """
+    tables = result.tables or []
+    tabel_jawaban_idx = pilih_tabel_jawaban(tables)
+    if tabel_jawaban_idx is None:
+        return None
+
+    regions = tables[tabel_jawaban_idx].bounding_regions
+    if not regions:
+        return None
+    titik = titik_polygon(regions[0].polygon)
+    page = next((p for p in result.pages or [] if p.page_number == regions[0].page_number), None)
+    if titik is None or page is None or not page.width or not page.height:
+        return None
+
+    return (
+        float(titik[:, 0].min() / page.width),
+        float(titik[:, 1].min() / page.height),
+        float(titik[:, 0].max() / page.width),
+        float(titik[:, 1].max() / page.height),
+    )
+
+
+class PembelajarROI:
+    """
+    Gabungan kotak tabel jawaban dari lembar-lembar yang dianalisis penuh.
+    ROI siap dipakai setelah jumlah_sampel lembar dipelajari. Jika path diberikan, ROI disimpan
+    ke file JSON setiap kali berubah sehingga proses lain dapat memuatnya.
+    """
+
+    def __init__(self, jumlah_sampel=JUMLAH_SAMPEL_DEFAULT, margin=MARGIN_DEFAULT, path=None):
+        self.jumlah_sampel = jumlah_sampel
+        self.margin = margin
+        self.path = path
+        self.kotak = None
+        self.jumlah_dipelajari = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def muat(cls, path, jumlah_sampel=JUMLAH_SAMPEL_DEFAULT, margin=MARGIN_DEFAULT):
+        """Muat ROI dari file JSON jika ada, atau buat pembelajar baru yang menyimpan ke path tersebut."""
+        pembelajar = cls(jumlah_sampel, margin, path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            pembelajar.kotak = tuple(data["kotak"]) if data.get("kotak") else None
+            pembelajar.jumlah_dipelajari = data.get("jumlah_dipelajari", 0)
+            pembelajar.jumlah_sampel = data.get("jumlah_sampel", jumlah_sampel)
+            pembelajar.margin = data.get("margin", margin)
+        return pembelajar
+
+    @property
+    def siap(self):
+        return self.kotak is not None and self.jumlah_dipelajari >= self.jumlah_sampel
+
+    def pelajari(self, result):
+        """Gabungkan posisi tabel jawaban dari hasil analisis lembar penuh. Kembalikan True jika ROI berubah."""
+        kotak = kotak_tabel_jawaban(result)
+        if kotak is None:
+            return False
+        with self._lock:
+            if self.kotak is None:
+                self.kotak = kotak
+            else:
+                self.kotak = (
+                    min(self.kotak[0], kotak[0]), min(self.kotak[1], kotak[1]),
+                    max(self.kotak[2], kotak[2]), max(self.kotak[3], kotak[3]),
+                )
+            self.jumlah_dipelajari += 1
+            if self.path:
+                self._simpan()
+        return True
+
+    def _simpan(self):
+        data = {
+            "kotak": list(self.kotak),
+            "jumlah_dipelajari": self.jumlah_dipelajari,
+            "jumlah_sampel": self.jumlah_sampel,
+            "margin": self.margin,
+        }
+        path_sementara = f"{self.path}.{os.getpid()}.tmp"
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(path_sementara, self.path)
+
+    def roi(self):
+        """ROI ternormalisasi (x0, y0, x1, y1) termasuk margin, atau None jika belum siap."""
+        if not self.siap:
+            return None
+        x0, y0, x1, y1 = self.kotak
+        return (
+            max(0.0, x0 - self.margin), max(0.0, y0 - self.margin),
+            min(1.0, x1 + self.margin), min(1.0, y1 + self.margin),
+        )
+
+
+class TransformasiPotongan:
+    """Posisi potongan dalam piksel gambar asli, untuk memetakan koordinat kembali."""
+
+    __slots__ = ("x0", "y0", "lebar", "tinggi", "lebar_asli", "tinggi_asli")
+
+    def __init__(self, x0, y0, lebar, tinggi, lebar_asli, tinggi_asli):
+        self.x0 = x0
+        self.y0 = y0
+        self.lebar = lebar
+        self.tinggi = tinggi
+        self.lebar_asli = lebar_asli
+        self.tinggi_asli = tinggi_asli
+
+
+def potong_gambar(file_bytes, roi):
+    """
+    Potong gambar satu halaman ke ROI ternormalisasi.
+    Kembalikan (bytes_potongan, TransformasiPotongan), atau (file_bytes, None) jika file tidak
+    dipotong (PDF atau gambar multi-halaman).
+    """
+    if file_bytes[:5] == b"%PDF-":
+        return file_bytes, None
+    if Image is None:
+        raise RuntimeError("Pemotongan ROI membutuhkan Pillow: pip install pillow")
+
+    with Image.open(io.BytesIO(file_bytes)) as gambar:
+        if getattr(gambar, "n_frames", 1) > 1:
+            return file_bytes, None
+        lebar_asli, tinggi_asli = gambar.size
+        x0 = int(roi[0] * lebar_asli)
+        y0 = int(roi[1] * tinggi_asli)
+        x1 = min(lebar_asli, int(round(roi[2] * lebar_asli)))
+        y1 = min(tinggi_asli, int(round(roi[3] * tinggi_asli)))
+        potongan = gambar.crop((x0, y0, x1, y1))
+
+        keluaran = io.BytesIO()
+        opsi = {"dpi": gambar.info["dpi"]} if "dpi" in gambar.info else {}
+        if gambar.format == "JPEG":
+            potongan.save(keluaran, format="JPEG", quality=95, **opsi)
+        else:
+            potongan.save(keluaran, format="PNG", **opsi)
+
+    return keluaran.getvalue(), TransformasiPotongan(x0, y0, x1 - x0, y1 - y0, lebar_asli, tinggi_asli)
+
+
+def _petakan_polygon(data, sx, sy, dx, dy):
+    # Telusuri data mentah AnalyzeResult dan ubah setiap "polygon" (list datar x1, y1, x2, y2, ...)
+    if isinstance(data, Mapping):
+        for kunci, nilai in data.items():
+            if kunci == "polygon" and nilai:
+                data[kunci] = [v * sx + dx if i % 2 == 0 else v * sy + dy for i, v in enumerate(nilai)]
+            elif isinstance(nilai, (Mapping, list)):
+                _petakan_polygon(nilai, sx, sy, dx, dy)
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, (Mapping, list)):
+                _petakan_polygon(item, sx, sy, dx, dy)
+
+
+def petakan_balik(result, transformasi):
+    """
+    Ubah koordinat hasil analisis potongan menjadi koordinat gambar asli (piksel), termasuk ukuran
+    halaman. Skala dihitung dari ukuran halaman hasil analisis, sehingga tetap benar jika potongan
+    diperkecil oleh praproses sebelum diunggah.
+    """
+    pages = result.pages or []
+    if not pages or not pages[0].width or not pages[0].height:
+        return result
+    sx = transformasi.lebar / pages[0].width
+    sy = transformasi.tinggi / pages[0].height
+    _petakan_polygon(result, sx, sy, transformasi.x0, transformasi.y0)
+    for page in pages:
+        page.width = transformasi.lebar_asli
+        page.height = transformasi.tinggi_asli
+    return result
+
+
+def analisis_dengan_roi(client, file_bytes, pembelajar, model_id="prebuilt-layout", cache=None, praproses=None,
+                        jurnal=None, polling_interval=None):
+    """
+    Analisis satu lembar memakai ROI yang sudah dipelajari, atau lembar penuh jika ROI belum siap
+    atau tabel jawaban tidak ditemukan pada potongan (lalu ROI dipelajari dari lembar penuh).
+    praproses (opsional) adalah fungsi bytes -> bytes yang dijalankan setelah pemotongan.
+    jurnal dan polling_interval diteruskan ke analisis_dengan_cache.
+    """
+    praproses = praproses or (lambda b: b)
+    roi = pembelajar.roi()
+    if roi is not None:
+        with span("potong_roi"):
+            bytes_potongan, transformasi = potong_gambar(file_bytes, roi)
+        if transformasi is not None:
+            result = analisis_dengan_cache(client, praproses(bytes_potongan), model_id, cache, jurnal, polling_interval)
+            if pilih_tabel_jawaban(result.tables or []) is not None:
+                petakan_balik(result, transformasi)
+                hitung("roi_dipakai")
+                return result
+            hitung("roi_gagal")
+            print("Tabel jawaban tidak ditemukan pada potongan ROI, menganalisis lembar penuh")
+
+    result = analisis_dengan_cache(client, praproses(file_bytes), model_id, cache, jurnal, polling_interval)
+    pembelajar.pelajari(result)
+    return result
@@ -0,0 +1,128 @@
+"""
+Skema ujian: jumlah soal dan daftar pilihan jawaban (misalnya 60 soal A-E).
+
+Setiap pilihan mendapat satu bit, sehingga himpunan huruf yang muncul pada satu soal disimpan sebagai
+bitmask kecil. "Pilihan mana yang tidak muncul" dijawab dengan lookup tabel berukuran 2^jumlah_pilihan
+yang dihitung sekali per skema. Jawaban disimpan sebagai array uint8: 0 untuk tidak terdeteksi ("-"),
+1..jumlah_pilihan untuk pilihan sesuai urutan.
+
+File ujian (JSON) berisi skema beserta kunci jawabannya:
+  {"jumlah_soal": 60, "pilihan": "ABCDE", "kunci": "ABCDE..."}
+"""
+
+import json
+
+import numpy as np
+
+# Bitmask uint8: maksimal 8 pilihan jawaban
+MAKS_PILIHAN = 8
+KODE_KOSONG = 0
+
+
+class SkemaUjian:
+    """Jumlah soal dan pilihan jawaban, beserta tabel bitmask untuk pilihan yang tidak muncul."""
+
+    __slots__ = ("jumlah_soal", "pilihan", "himpunan_pilihan", "_kode", "mask_penuh",
+                 "_kode_hilang", "_jumlah_bit")
+
+    def __init__(self, jumlah_soal=40, pilihan=("A", "B", "C", "D")):
+        pilihan = tuple(pilihan)
+        if jumlah_soal < 1:
+            raise ValueError("jumlah_soal minimal 1")
+        if not 2 <= len(pilihan) <= MAKS_PILIHAN:
+            raise ValueError(f"jumlah pilihan harus 2 sampai {MAKS_PILIHAN}")
+        if len(set(pilihan)) != len(pilihan) or any(len(p) != 1 or p == "-" for p in pilihan):
+            raise ValueError("pilihan harus berupa huruf tunggal yang unik")
+
+        self.jumlah_soal = jumlah_soal
+        self.pilihan = pilihan
+        self.himpunan_pilihan = frozenset(pilihan)
+        # Huruf -> kode (1..jumlah_pilihan); "-" -> 0
+        self._kode = {p: i + 1 for i, p in enumerate(pilihan)}
+        self._kode["-"] = KODE_KOSONG
+        self.mask_penuh = (1 << len(pilihan)) - 1
+
+        # mask huruf yang muncul -> kode satu-satunya pilihan yang tidak muncul (0 jika tidak tepat satu)
+        kode_hilang = []
+        jumlah_bit = []
+        for mask in range(1 << len(pilihan)):
+            hilang = self.mask_penuh & ~mask
+            jumlah_bit.append(bin(mask).count("1"))
+            if hilang and hilang & (hilang - 1) == 0:
+                kode_hilang.append(hilang.bit_length())
+            else:
+                kode_hilang.append(KODE_KOSONG)
+        self._kode_hilang = tuple(kode_hilang)
+        self._jumlah_bit = tuple(jumlah_bit)
+
+    @property
+    def jumlah_pilihan(self):
+        return len(self.pilihan)
+
+    def nomor_valid(self, nomor_soal):
+        return 1 <= nomor_soal <= self.jumlah_soal
+
+    def bit(self, huruf):
+        """Bit untuk satu huruf pilihan (0 jika bukan pilihan)."""
+        kode = self._kode.get(huruf, KODE_KOSONG)
+        return 1 << (kode - 1) if kode else 0
+
+    def kode(self, huruf):
+        """Kode uint8 untuk satu huruf pilihan; 0 untuk "-" atau huruf di luar skema."""
+        return self._kode.get(huruf, KODE_KOSONG)
+
+    def huruf(self, kode):
+        return self.pilihan[kode - 1] if kode else "-"
+
+    def kode_hilang(self, mask):
+        """Kode satu-satunya pilihan yang tidak ada di mask, atau 0 jika yang hilang bukan tepat satu."""
+        return self._kode_hilang[mask]
+
+    def jumlah_hilang(self, mask):
+        return self.jumlah_pilihan - self._jumlah_bit[mask]
+
+    def huruf_dari_mask(self, mask):
+        """Huruf-huruf dalam mask sesuai urutan pilihan, misalnya "BCD"."""
+        return "".join(p for i, p in enumerate(self.pilihan) if mask >> i & 1)
+
+    def ke_kode(self, jawaban):
+        """List huruf jawaban -> array uint8 sepanjang jumlah soal."""
+        kode = np.zeros(self.jumlah_soal, dtype=np.uint8)
+        for i, huruf in enumerate(jawaban[:self.jumlah_soal]):
+            kode[i] = self._kode.get(huruf, KODE_KOSONG)
+        return kode
+
+    def dari_kode(self, kode):
+        """Array kode uint8 -> list huruf jawaban ("-" untuk 0)."""
+        tabel = ("-",) + self.pilihan
+        return [tabel[k] for k in kode.tolist()]
+
+    def ke_dict(self):
+        return {"jumlah_soal": self.jumlah_soal, "pilihan": "".join(self.pilihan)}
+
+
+SKEMA_DEFAULT = SkemaUjian(40, ("A", "B", "C", "D"))
+
+
+def muat_ujian(path):
+    """
+    Baca file ujian JSON. Kembalikan (skema, kunci_jawaban); kunci_jawaban None jika tidak ada.
+    Kunci boleh berupa string ("ABCD...") atau list huruf.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    kunci = data.get("kunci")
+    if kunci is not None:
+        kunci = [huruf.strip().upper() for huruf in kunci]
+    skema = SkemaUjian(
+        data.get("jumlah_soal", len(kunci) if kunci else SKEMA_DEFAULT.jumlah_soal),
+        tuple(data.get("pilihan", SKEMA_DEFAULT.pilihan)),
+    )
+    if kunci is not None:
+        if len(kunci) != skema.jumlah_soal:
+            raise ValueError(f"kunci berisi {len(kunci)} jawaban, skema {skema.jumlah_soal} soal")
+        tidak_dikenal = set(kunci) - skema.himpunan_pilihan
+        if tidak_dikenal:
+            raise ValueError(f"kunci berisi huruf di luar pilihan: {sorted(tidak_dikenal)}")
+    return skema, kunci
@@ -0,0 +1,220 @@
+"""
+Penilaian tanda silang terhadap sel pilihan jawaban secara tervektorisasi.
+
+`hitung_matriks_skor` menghitung seluruh matriks tanda × sel sekaligus dengan NumPy
+(flag di dalam sel, jarak relatif ke pusat sel, serta komponen skor teks/sumber/confidence API),
+lalu `skor_jawaban_per_soal` mengambil argmax per soal. Urutan penjumlahan skor sama dengan
+`is_mark_in_cell`, sehingga hasilnya sama dengan penilaian per pasangan (selisih skor paling
+banyak pada digit terakhir floating point, karena akar kuadrat NumPy memakai sqrt).
+"""
+
+import numpy as np
+
+from instrumentasi import hitung
+
+# Skor tambahan berdasarkan sumber deteksi tanda silang
+SKOR_SUMBER = {
+    "text": 0.3,
+    "selection_mark": 0.2,
+    "intersecting_lines": 0.1,
+}
+
+
+def is_mark_in_cell(mark, pusat_tanda, cell_kotak):
+    """
+    Penilaian satu tanda silang terhadap satu sel (versi skalar, acuan untuk hitung_matriks_skor).
+    mark adalah RekamanTanda, pusat_tanda titik pusatnya (dari KumpulanTanda.pusat),
+    dan cell_kotak batas sel (min_x, min_y, max_x, max_y) dari SheetGeometry.
+    """
+    if cell_kotak is None or np.isnan(pusat_tanda).any():
+        return False, 0.0
+
+    # Inisialisasi skor kepercayaan
+    confidence_score = 0.0
+
+    # Cek apakah mark memiliki konten 'X' (dari deteksi teks)
+    x_text_detected = False
+    if mark.konten is not None and ("X" in mark.konten or "×" in mark.konten or "x" in mark.konten.lower()):
+        x_text_detected = True
+        confidence_score += 0.4  # Tambahkan skor jika teks X terdeteksi
+
+    # Tambahkan skor berdasarkan source
+    if mark.sumber in SKOR_SUMBER:
+        confidence_score += SKOR_SUMBER[mark.sumber]
+
+    # Tambahkan skor berdasarkan confidence dari API
+    confidence_score += mark.confidence * 0.2
+
+    mark_x, mark_y = float(pusat_tanda[0]), float(pusat_tanda[1])
+    min_x, min_y, max_x, max_y = cell_kotak
+
+    # Hitung luas sel
+    cell_width = max_x - min_x
+    cell_height = max_y - min_y
+
+    # Perluas area sel 20% untuk menangkap tanda silang yang mungkin sedikit keluar dari sel
+    margin_x = cell_width * 0.2
+    margin_y = cell_height * 0.2
+    min_x -= margin_x
+    max_x += margin_x
+    min_y -= margin_y
+    max_y += margin_y
+
+    is_inside = min_x <= mark_x <= max_x and min_y <= mark_y <= max_y
+
+    # Jarak relatif ke pusat sel (0 = tepat di pusat, 1 = di tepi sel)
+    cell_center_x = (min_x + max_x) / 2
+    cell_center_y = (min_y + max_y) / 2
+    distance_to_center = (
+        ((mark_x - cell_center_x) / cell_width) ** 2 +
+        ((mark_y - cell_center_y) / cell_height) ** 2
+    ) ** 0.5
+
+    # Semakin dekat ke pusat, semakin tinggi skor
+    if is_inside:
+        position_score = 1.0 - min(distance_to_center, 1.0)
+        confidence_score += position_score * 0.4
+
+    # Jika teks 'X' terdeteksi, berikan toleransi lebih untuk posisi
+    if x_text_detected:
+        near_cell = (
+            abs(mark_x - cell_center_x) < cell_width * 1.5 and
+            abs(mark_y - cell_center_y) < cell_height * 1.5
+        )
+        if near_cell:
+            confidence_score += 0.2
+            is_inside = True
+
+    # Normalisasi skor kepercayaan (maksimum 1.0)
+    confidence_score = min(confidence_score, 1.0)
+
+    return is_inside, confidence_score
+
+
+class MatriksSkor:
+    """Komponen matriks skor berukuran (jumlah tanda, jumlah sel)."""
+
+    __slots__ = ("di_dalam", "jarak_pusat", "skor_teks", "skor_sumber", "skor_api", "skor_posisi", "skor")
+
+    def __init__(self, di_dalam, jarak_pusat, skor_teks, skor_sumber, skor_api, skor_posisi, skor):
+        self.di_dalam = di_dalam
+        self.jarak_pusat = jarak_pusat
+        self.skor_teks = skor_teks
+        self.skor_sumber = skor_sumber
+        self.skor_api = skor_api
+        self.skor_posisi = skor_posisi
+        self.skor = skor
+
+
+def komponen_tanda(kumpulan_tanda):
+    """Hitung komponen skor per tanda: (teks_x, skor_teks, skor_sumber, skor_api), masing-masing (m,)."""
+    tanda = kumpulan_tanda.tanda
+    teks_x = np.array([
+        t.konten is not None and ("X" in t.konten or "×" in t.konten or "x" in t.konten.lower())
+        for t in tanda
+    ], dtype=bool)
+    skor_sumber = np.array([SKOR_SUMBER.get(t.sumber, 0.0) for t in tanda], dtype=float)
+    skor_api = np.array([t.confidence for t in tanda], dtype=float) * 0.2
+    skor_teks = np.where(teks_x, 0.4, 0.0)
+    return teks_x, skor_teks, skor_sumber, skor_api
+
+
+def hitung_matriks_skor(kumpulan_tanda, kotak_sel):
+    """
+    Hitung matriks skor seluruh tanda silang terhadap seluruh sel dalam satu langkah NumPy.
+    kotak_sel berukuran (c, 4); baris NaN (sel tanpa polygon) tidak pernah dianggap memuat tanda.
+    """
+    teks_x, skor_teks, skor_sumber, skor_api = komponen_tanda(kumpulan_tanda)
+    pusat = kumpulan_tanda.pusat
+    kotak = np.asarray(kotak_sel, dtype=float).reshape(-1, 4)
+
+    mark_x = pusat[:, 0:1]
+    mark_y = pusat[:, 1:2]
+    min_x, min_y, max_x, max_y = (kotak[:, k][None, :] for k in range(4))
+
+    cell_width = max_x - min_x
+    cell_height = max_y - min_y
+    margin_x = cell_width * 0.2
+    margin_y = cell_height * 0.2
+    min_x = min_x - margin_x
+    max_x = max_x + margin_x
+    min_y = min_y - margin_y
+    max_y = max_y + margin_y
+
+    di_dalam = (min_x <= mark_x) & (mark_x <= max_x) & (min_y <= mark_y) & (mark_y <= max_y)
+
+    cell_center_x = (min_x + max_x) / 2
+    cell_center_y = (min_y + max_y) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jarak_pusat = (
+            ((mark_x - cell_center_x) / cell_width) ** 2 +
+            ((mark_y - cell_center_y) / cell_height) ** 2
+        ) ** 0.5
+    jarak_pusat = np.nan_to_num(jarak_pusat, nan=np.inf)
+
+    skor_posisi = np.where(di_dalam, (1.0 - np.minimum(jarak_pusat, 1.0)) * 0.4, 0.0)
+
+    near_cell = (
+        teks_x[:, None] &
+        (np.abs(mark_x - cell_center_x) < cell_width * 1.5) &
+        (np.abs(mark_y - cell_center_y) < cell_height * 1.5)
+    )
+    di_dalam = di_dalam | near_cell
+
+    # Urutan penjumlahan sama dengan is_mark_in_cell
+    skor = (0.0 + skor_teks + skor_sumber + skor_api)[:, None] + skor_posisi
+    skor = skor + np.where(near_cell, 0.2, 0.0)
+    skor = np.minimum(skor, 1.0)
+
+    return MatriksSkor(
+        di_dalam, jarak_pusat,
+        skor_teks, skor_sumber, skor_api,
+        skor_posisi, skor,
+    )
+
+
+def skor_jawaban_per_soal(kumpulan_tanda, posisi_jawaban, pilihan_jawaban, jumlah_soal, soal=None):
+    """
+    Tentukan jawaban setiap soal dari tanda silang dengan skor tertinggi di dalam sel pilihannya.
+    Sama dengan perulangan soal -> pilihan -> tanda yang memilih skor tertinggi pertama (> 0).
+    soal (opsional) membatasi nomor soal yang dinilai; sel soal lain tidak masuk matriks skor.
+    Kembalikan (jawaban, skor) berupa list sepanjang jumlah_soal.
+    """
+    jawaban = ["-"] * jumlah_soal
+    skor = [0.0] * jumlah_soal
+
+    # Susun sel kandidat per soal sesuai urutan pilihan jawaban
+    kotak = []
+    tabel_kandidat = np.full((jumlah_soal, len(pilihan_jawaban)), -1, dtype=np.int64)
+    for nomor_soal in range(1, jumlah_soal + 1):
+        if nomor_soal not in posisi_jawaban or (soal is not None and nomor_soal not in soal):
+            continue
+        k = 0
+        for pilihan in pilihan_jawaban:
+            if pilihan in posisi_jawaban[nomor_soal]:
+                cell_kotak = posisi_jawaban[nomor_soal][pilihan]["kotak"]
+                kotak.append(cell_kotak if cell_kotak is not None else (np.nan,) * 4)
+                tabel_kandidat[nomor_soal - 1, k] = len(kotak) - 1
+                k += 1
+
+    if not kotak or len(kumpulan_tanda) == 0:
+        return jawaban, skor
+
+    matriks = hitung_matriks_skor(kumpulan_tanda, kotak)
+    hitung("uji_sel", len(kumpulan_tanda) * len(kotak))
+
+    # Skor efektif hanya untuk tanda di dalam sel; (soal, pilihan, tanda) diratakan per soal
+    efektif = np.where(matriks.di_dalam, matriks.skor, -1.0).T
+    efektif = np.vstack((efektif, np.full((1, efektif.shape[1]), -1.0)))
+    per_soal = efektif[tabel_kandidat].reshape(jumlah_soal, -1)
+
+    terbaik = per_soal.argmax(axis=1)
+    skor_terbaik = per_soal[np.arange(jumlah_soal), terbaik]
+    jumlah_tanda = efektif.shape[1]
+
+    for q in np.nonzero(skor_terbaik > 0.0)[0].tolist():
+        pilihan_soal = [pilihan for pilihan in pilihan_jawaban if pilihan in posisi_jawaban[q + 1]]
+        jawaban[q] = pilihan_soal[terbaik[q] // jumlah_tanda]
+        skor[q] = float(skor_terbaik[q])
+
+    return jawaban, skor
@@ -0,0 +1,127 @@
+"""
+Cache template lembar jawaban per struktur tabel.
+
+Dalam satu angkatan ujian, tata letak tabel jawaban tidak berubah, sehingga penurunan struktur tabel
+(pola vertikal/horizontal/grid atau pendekatan alternatif) cukup dilakukan sekali. Template menyimpan
+struktur yang diturunkan dan dikunci dengan tanda tangan tabel: skema ujian, jumlah baris, jumlah kolom,
+dan posisi (baris, kolom) semua sel tabel. Isi sel tidak ikut, karena huruf yang disilang siswa tidak
+terbaca OCR dan berbeda di setiap lembar; dengan begitu semua lembar dari formulir yang sama berbagi
+satu template. Lembar dengan template yang dikenal langsung dipetakan ke nomor soal dengan struktur itu
+dari sel pilihan yang terbaca di lembar tersebut, sehingga hasilnya sama dengan lembar yang
+strukturnya diturunkan ulang.
+
+Setiap template disimpan sebagai satu file JSON `<tanda_tangan>.json` yang ditulis secara atomik,
+sehingga beberapa worker atau proses dapat berbagi direktori template yang sama. Format file:
+  {"versi": 2, "tanda_tangan": "...", "row_count": 20, "column_count": 8, "struktur": "grid"}
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from instrumentasi import hitung
+
+VERSI_TEMPLATE = 2
+
+
+def tanda_tangan_tabel(table, posisi_sel, skema):
+    """
+    Tanda tangan (hex SHA-1) tabel jawaban dari skema ujian, ukuran tabel, dan posisi (baris, kolom)
+    semua sel tabel, tanpa isi sel.
+    """
+    bagian = [
+        f"v{VERSI_TEMPLATE};{skema.jumlah_soal}{''.join(skema.pilihan)};{table.row_count}x{table.column_count}"
+    ]
+    bagian.extend(f"{row},{col}" for row, col in sorted(set(posisi_sel)))
+    return hashlib.sha1(";".join(bagian).encode("utf-8")).hexdigest()
+
+
+class TemplateLembar:
+    """Struktur tabel jawaban (vertical, horizontal, grid, atau alternatif) untuk satu tanda tangan tabel."""
+
+    __slots__ = ("tanda_tangan", "row_count", "column_count", "struktur")
+
+    def __init__(self, tanda_tangan, row_count, column_count, struktur):
+        self.tanda_tangan = tanda_tangan
+        self.row_count = row_count
+        self.column_count = column_count
+        self.struktur = struktur
+
+    @classmethod
+    def dari_tabel(cls, tanda_tangan, table, struktur):
+        return cls(tanda_tangan, table.row_count, table.column_count, struktur)
+
+    @classmethod
+    def dari_dict(cls, data):
+        return cls(data["tanda_tangan"], data["row_count"], data["column_count"], data["struktur"])
+
+    def ke_dict(self):
+        return {
+            "versi": VERSI_TEMPLATE,
+            "tanda_tangan": self.tanda_tangan,
+            "row_count": self.row_count,
+            "column_count": self.column_count,
+            "struktur": self.struktur,
+        }
+
+
+class CacheTemplate:
+    """Template di memori yang dipersistenkan sebagai file JSON per tanda tangan di direktori bersama."""
+
+    def __init__(self, direktori):
+        self.direktori = direktori
+        self.hit = 0
+        self.miss = 0
+        self._template = {}
+        self._lock = threading.Lock()
+        os.makedirs(direktori, exist_ok=True)
+
+    def _path(self, tanda_tangan):
+        return os.path.join(self.direktori, tanda_tangan + ".json")
+
+    def ambil(self, tanda_tangan):
+        """Kembalikan TemplateLembar untuk tanda tangan ini (dari memori atau disk), atau None."""
+        with self._lock:
+            template = self._template.get(tanda_tangan)
+        if template is None:
+            try:
+                with open(self._path(tanda_tangan), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("versi") == VERSI_TEMPLATE:
+                    template = TemplateLembar.dari_dict(data)
+            except (OSError, ValueError, KeyError):
+                template = None
+
+        with self._lock:
+            if template is None:
+                self.miss += 1
+            else:
+                self.hit += 1
+                self._template[tanda_tangan] = template
+        hitung("template_hit" if template is not None else "template_miss")
+        return template
+
+    def simpan(self, template):
+        """Simpan template di memori dan tulis ke disk secara atomik."""
+        with self._lock:
+            self._template[template.tanda_tangan] = template
+        path = self._path(template.tanda_tangan)
+        path_sementara = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path_sementara, "w", encoding="utf-8") as f:
+            json.dump(template.ke_dict(), f)
+        os.replace(path_sementara, path)
+
+    def statistik(self):
+        return {"hit": self.hit, "miss": self.miss, "jumlah_template": len(self._template)}
+
+
+def cache_template_dari_lingkungan():
+    """
+    Buat cache template dari variabel lingkungan TEMPLATE_DIR (default ".cache_template").
+    Kembalikan None jika TEMPLATE_DIR dikosongkan (cache template dinonaktifkan).
+    """
+    template_dir = os.getenv("TEMPLATE_DIR", ".cache_template")
+    if not template_dir:
+        return None
+    return CacheTemplate(template_dir)